@@ -1,11 +1,15 @@
+import asyncio
 import logging
 from typing import Annotated
 
 from dotenv import load_dotenv
-from pydantic import Field
+from pydantic import BaseModel, Field
 from livekit.agents import (
     Agent,
     AgentSession,
+    AgentStateChangedEvent,
+    ChatContext,
+    ChatMessage,
     JobContext,
     JobProcess,
     MetricsCollectedEvent,
@@ -17,19 +21,57 @@ from livekit.agents import (
     function_tool,
     RunContext
 )
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation, assemblyai
+from livekit.plugins import murf, silero, google, noise_cancellation, assemblyai
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
-from catalog import list_products, search_products, get_product_by_id, format_products_list, format_product_summary
-from orders import create_order, get_last_order, format_order_summary
+import data_access
+from catalog import (
+    StaleCursorError,
+    format_product_details,
+    prewarm_catalog,
+    render_cache_stats,
+)
+from data_access import LoopLagMonitor
+from order_events import OrderEventPublisher
+from orders import (
+    Cart,
+    CartLine,
+    SessionOrders,
+    format_cart,
+    format_order_summary,
+    format_session_summary,
+    order_writer_stats,
+)
+from prefetch import DetailPrefetcher
+from response_budget import CHARS_PER_TOKEN, budgeted, compact_context, response_sizes
+from timing import PhaseTimer, latency
 
 logger = logging.getLogger("agent")
 
 load_dotenv(".env.local")
 
 
+class CartItem(BaseModel):
+    product_id: str = Field(description="EXACT product ID from search results (e.g., \"mug-003\")")
+    quantity: int = Field(default=1, description="Number of items")
+    size: str = Field(default="", description="Size option if applicable (S, M, L, XL)")
+    color: str = Field(default="", description="Color option if applicable")
+
+
 class Assistant(Agent):
-    def __init__(self) -> None:
+    def __init__(
+        self, session_id: str = "console", events: OrderEventPublisher | None = None
+    ) -> None:
+        # Orders placed in this session (room); summaries only look here
+        self.session_orders = SessionOrders(session_id)
+        # Items picked but not yet ordered; checkout turns them into one order
+        self.cart = Cart()
+        # Details of just-listed products, rendered before they are asked for
+        self.prefetcher = DetailPrefetcher()
+        # Cart and order updates for the frontend; None outside a room (console, tests)
+        self.events = events
+        # Cursor of the next page of the last browse or search, if any
+        self._next_cursor: str | None = None
         super().__init__(
             instructions="""You are a helpful e-commerce shopping assistant. Your role is to help customers browse products, get product details, and place orders.
 
@@ -51,13 +93,16 @@ GUIDELINES FOR INTERACTION:
 - Keep responses concise for voice interaction (2-4 sentences)
 - Always mention product names and prices clearly
 - When listing products, limit to 3-5 items at a time
+- If the customer wants to see more results, use the next_page tool
 - Confirm order details before placing an order
+- When the customer wants several products, add them all to the cart with ONE add_to_cart call, then use checkout to place a single order for everything
 - Use the tools available to browse, search, and create orders
 - If a customer asks about a product, use the search or browse tools
 - When placing an order, confirm the product, quantity, and any options (size, color)
 
 IMPORTANT - AFTER PLACING AN ORDER:
 - Always ask: "Would you like to order anything else, or are you done shopping?"
+- If items are still in the cart when they are done, confirm the cart and use the checkout tool first
 - If they say "I'm done", "that's all", "checkout", or similar:
   1. Use the get_order_summary tool to retrieve all their orders
   2. Read out the complete order summary to them
@@ -77,7 +122,20 @@ TONE:
 Remember: You are speaking to customers via voice. Keep it natural and conversational.""",
         )
 
+    async def on_user_turn_completed(
+        self, turn_ctx: ChatContext, new_message: ChatMessage
+    ) -> None:
+        # Only this turn's copy of the context is compacted; the history keeps full outputs
+        chars, saved = compact_context(turn_ctx.items)
+        response_sizes.record_turn(chars, saved)
+        logger.info(
+            f"Turn context: {len(turn_ctx.items)} items, {chars} chars "
+            f"(~{chars // CHARS_PER_TOKEN} tokens), {saved} chars summarized"
+        )
+
     @function_tool
+    @latency.time_async("tool.browse_products")
+    @budgeted
     async def browse_products(
         self,
         context: RunContext,
@@ -112,10 +170,14 @@ Remember: You are speaking to customers via voice. Keep it natural and conversat
         if color and color.strip():
             filters["color"] = color.strip()
         
-        products = list_products(filters if filters else None)
-        return format_products_list(products)
+        page = await data_access.render_product_list(filters if filters else None)
+        self._next_cursor = page.next_cursor
+        self.prefetcher.schedule(page.product_ids)
+        return page.text
     
     @function_tool
+    @latency.time_async("tool.search_products")
+    @budgeted
     async def search_products(
         self,
         context: RunContext,
@@ -133,10 +195,42 @@ Remember: You are speaking to customers via voice. Keep it natural and conversat
         """
         logger.info(f"Searching products: query={query}")
         
-        products = search_products(query)
-        return format_products_list(products)
+        page = await data_access.render_search(query)
+        self._next_cursor = page.next_cursor
+        self.prefetcher.schedule(page.product_ids)
+        return page.text
+
+    @function_tool
+    @latency.time_async("tool.next_page")
+    @budgeted
+    async def next_page(
+        self,
+        context: RunContext
+    ) -> str:
+        """Show the next page of the most recent browse or search results.
+
+        Use this tool when customers ask to see more products after browsing or searching.
+
+        Returns:
+            Formatted list of the next products
+        """
+        logger.info("Showing next page of products")
+
+        if self._next_cursor is None:
+            return "There are no more products to show. Would you like to search for something else?"
+
+        try:
+            page = await data_access.render_next_page(self._next_cursor)
+        except StaleCursorError:
+            self._next_cursor = None
+            return "Our catalog was just updated, so those results are out of date. Would you like me to search again?"
+        self._next_cursor = page.next_cursor
+        self.prefetcher.schedule(page.product_ids)
+        return page.text
     
     @function_tool
+    @latency.time_async("tool.get_product_details")
+    @budgeted
     async def get_product_details(
         self,
         context: RunContext,
@@ -154,27 +248,20 @@ Remember: You are speaking to customers via voice. Keep it natural and conversat
         """
         logger.info(f"Getting product details: product_id={product_id}")
         
-        product = get_product_by_id(product_id)
+        prefetched = await self.prefetcher.get(product_id)
+        if prefetched is not None:
+            return prefetched.text
+
+        product = await data_access.get_product_by_id(product_id)
         
         if not product:
             return f"Sorry, I couldn't find a product with ID {product_id}."
         
-        name = product.get("name", "Unknown")
-        price = product.get("price", 0)
-        currency = product.get("currency", "INR")
-        description = product.get("description", "")
-        attributes = product.get("attributes", {})
-        
-        result = f"{name} - {price} {currency}\n\n{description}\n\n"
-        
-        if attributes:
-            result += "Details:\n"
-            for key, value in attributes.items():
-                result += f"- {key.capitalize()}: {value}\n"
-        
-        return result
+        return format_product_details(product)
     
     @function_tool
+    @latency.time_async("tool.place_order")
+    @budgeted
     async def place_order(
         self,
         context: RunContext,
@@ -203,20 +290,19 @@ Remember: You are speaking to customers via voice. Keep it natural and conversat
         """
         logger.info(f"Placing order: product_id={product_id}, quantity={quantity}, size={size}, color={color}")
         
-        # Try to find product by ID first
-        product = get_product_by_id(product_id)
+        if quantity < 1:
+            return "The quantity has to be at least 1. How many would you like?"
+
+        # Resolve by exact ID first, then by (possibly misheard) product name
+        prefetched = await self.prefetcher.get(product_id)
+        product = prefetched.product if prefetched else await data_access.resolve_product(product_id)
         
-        # If not found by ID, try to search by name
         if not product:
-            # Try searching for the product by name
-            from catalog import search_products
-            search_results = search_products(product_id)
-            if search_results and len(search_results) > 0:
-                product = search_results[0]
-                product_id = product.get("id")
-                logger.info(f"Found product by name search: {product_id}")
-            else:
-                return f"Sorry, I couldn't find that product. Please try browsing or searching first to see available products."
+            return f"Sorry, I couldn't find that product. Please try browsing or searching first to see available products."
+
+        if product.get("id") != product_id:
+            product_id = product.get("id")
+            logger.info(f"Found product by name search: {product_id}")
         
         # Create line item
         line_item = {
@@ -230,11 +316,181 @@ Remember: You are speaking to customers via voice. Keep it natural and conversat
             line_item["color"] = color.strip()
         
         # Create order
-        order = create_order([line_item])
+        order = await data_access.create_order([line_item], self.session_orders)
+        if self.events is not None:
+            await self.events.order_placed(order, self.session_orders)
         
         return f"Order placed successfully!\n\n{format_order_summary(order)}\n\nWould you like to order anything else, or are you done shopping?"
     
+    async def _cart_changed(self) -> None:
+        if self.events is not None:
+            await self.events.cart_updated(self.cart)
+
+    async def _cart_lines(self, product: str) -> list[CartLine]:
+        """Cart lines for a product ID or (possibly misheard) product name."""
+        lines = self.cart.find(product)
+        if lines:
+            return lines
+        resolved = await data_access.resolve_product(product)
+        return self.cart.find(resolved["id"]) if resolved else []
+
+    @function_tool
+    @latency.time_async("tool.add_to_cart")
+    @budgeted
+    async def add_to_cart(
+        self,
+        context: RunContext,
+        items: list[CartItem]
+    ) -> str:
+        """Add one or more products to the customer's cart without ordering yet.
+
+        Put every product the customer asked for into a single call. Use the
+        exact product IDs from the browse_products or search_products results.
+
+        Args:
+            items: Products to add, each with product_id, quantity, and optional size and color
+
+        Returns:
+            What was added, and the cart contents
+        """
+        logger.info(f"Adding to cart: {items}")
+
+        products = await data_access.resolve_products([item.product_id for item in items])
+
+        missing = []
+        invalid = []
+        for item, product in zip(items, products):
+            if item.quantity < 1:
+                invalid.append(item.product_id)
+                continue
+            if not product:
+                missing.append(item.product_id)
+                continue
+            self.cart.add(
+                product,
+                item.quantity,
+                size=item.size.strip() or None,
+                color=item.color.strip() or None,
+            )
+
+        await self._cart_changed()
+        result = format_cart(self.cart)
+        if invalid:
+            result = f"Quantities have to be at least 1, so I didn't add: {', '.join(invalid)}.\n\n{result}"
+        if missing:
+            result = f"Sorry, I couldn't find: {', '.join(missing)}.\n\n{result}"
+        return result
+
     @function_tool
+    @latency.time_async("tool.update_cart_item")
+    @budgeted
+    async def update_cart_item(
+        self,
+        context: RunContext,
+        product_id: str,
+        quantity: int
+    ) -> str:
+        """Change the quantity of a product already in the cart.
+
+        Args:
+            product_id: Product ID or name of the cart item
+            quantity: New quantity; 0 removes the item
+
+        Returns:
+            The updated cart contents
+        """
+        logger.info(f"Updating cart: product_id={product_id}, quantity={quantity}")
+
+        if quantity < 0:
+            return f"The quantity can't be negative. Use 0 to remove the item.\n\n{format_cart(self.cart)}"
+
+        lines = await self._cart_lines(product_id)
+        if not lines:
+            return f"That product isn't in your cart.\n\n{format_cart(self.cart)}"
+        if len(lines) > 1:
+            return f"Your cart has that product in more than one size or color. Which one do you mean?\n\n{format_cart(self.cart)}"
+
+        self.cart.update(lines[0], quantity)
+        await self._cart_changed()
+        return format_cart(self.cart)
+
+    @function_tool
+    @latency.time_async("tool.remove_from_cart")
+    @budgeted
+    async def remove_from_cart(
+        self,
+        context: RunContext,
+        product_id: str
+    ) -> str:
+        """Remove a product from the cart (every size and color of it).
+
+        Args:
+            product_id: Product ID or name of the cart item
+
+        Returns:
+            The updated cart contents
+        """
+        logger.info(f"Removing from cart: product_id={product_id}")
+
+        lines = await self._cart_lines(product_id)
+        if not lines:
+            return f"That product isn't in your cart.\n\n{format_cart(self.cart)}"
+
+        for line in lines:
+            self.cart.remove(line)
+        await self._cart_changed()
+        return format_cart(self.cart)
+
+    @function_tool
+    @latency.time_async("tool.view_cart")
+    @budgeted
+    async def view_cart(
+        self,
+        context: RunContext
+    ) -> str:
+        """Show what is in the cart and its total.
+
+        Returns:
+            The cart contents
+        """
+        logger.info("Viewing cart")
+
+        return format_cart(self.cart)
+
+    @function_tool
+    @latency.time_async("tool.checkout")
+    @budgeted
+    async def checkout(
+        self,
+        context: RunContext
+    ) -> str:
+        """Place one order for everything in the cart.
+
+        Confirm the cart contents with the customer before calling this.
+
+        Returns:
+            Order confirmation with order ID and details
+        """
+        logger.info(f"Checking out {len(self.cart)} cart lines")
+
+        if not len(self.cart):
+            return "Your cart is empty. Would you like to browse our products?"
+
+        result = await data_access.checkout(self.cart, self.session_orders)
+        if result.unavailable:
+            names = ", ".join(line.product_name for line in result.unavailable)
+            one = len(result.unavailable) == 1
+            return f"Nothing was ordered: {names} {'is' if one else 'are'} no longer available. Should I remove {'it' if one else 'them'} from the cart and check out the rest?\n\n{format_cart(self.cart)}"
+        order = result.order
+        if self.events is not None:
+            await self.events.order_placed(order, self.session_orders)
+        await self._cart_changed()
+
+        return f"Order placed successfully!\n\n{format_order_summary(order)}\n\nWould you like to order anything else, or are you done shopping?"
+
+    @function_tool
+    @latency.time_async("tool.view_last_order")
+    @budgeted
     async def view_last_order(
         self,
         context: RunContext
@@ -248,7 +504,7 @@ Remember: You are speaking to customers via voice. Keep it natural and conversat
         """
         logger.info("Viewing last order")
         
-        order = get_last_order()
+        order = self.session_orders.last
         
         if not order:
             return "You haven't placed any orders yet. Would you like to browse our products?"
@@ -256,6 +512,8 @@ Remember: You are speaking to customers via voice. Keep it natural and conversat
         return format_order_summary(order)
     
     @function_tool
+    @latency.time_async("tool.get_order_summary")
+    @budgeted
     async def get_order_summary(
         self,
         context: RunContext
@@ -270,62 +528,25 @@ Remember: You are speaking to customers via voice. Keep it natural and conversat
         """
         logger.info("Getting complete order summary")
         
-        from orders import list_orders
-        orders = list_orders()
-        
-        if not orders:
-            return "You haven't placed any orders yet. Would you like to browse our products?"
-        
-        # Format all orders for voice
-        summary = f"Here's your complete order summary. You placed {len(orders)} order{'s' if len(orders) > 1 else ''}.\n\n"
-        
-        grand_total = 0
-        all_items = []
-        
-        for order in orders:
-            items = order.get("items", [])
-            for item in items:
-                all_items.append(item)
-                grand_total += item.get("unit_price", 0) * item.get("quantity", 1)
-        
-        # List all items
-        for item in all_items:
-            name = item.get("product_name", "Unknown")
-            quantity = item.get("quantity", 1)
-            unit_price = item.get("unit_price", 0)
-            total_price = unit_price * quantity
-            
-            summary += f"{quantity} {name}"
-            if quantity > 1:
-                summary += f" at {unit_price} rupees each"
-            summary += f" for {total_price} rupees"
-            
-            # Add size/color if present
-            if "size" in item:
-                summary += f", size {item['size']}"
-            if "color" in item:
-                summary += f", {item['color']} color"
-            
-            summary += ". "
-        
-        summary += f"\n\nYour grand total is {grand_total} rupees. Thank you for shopping with us!"
-        
-        return summary
+        # The frontend shows its order summary popup on this event
+        if self.events is not None:
+            await self.events.order_summary(self.session_orders)
+
+        return format_session_summary(self.session_orders)
 
 
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+    timer = PhaseTimer("prewarm")
+    with timer.phase("vad"):
+        proc.userdata["vad"] = silero.VAD.load()
+    # Map the compiled catalog so every job process on this node shares one
+    # copy, and build its indexes before the first session needs them
+    proc.userdata["catalog"] = prewarm_catalog(timer)
+    timer.log(logger)
 
 
-async def entrypoint(ctx: JobContext):
-    # Logging setup
-    # Add any other context you want in all log entries here
-    ctx.log_context_fields = {
-        "room": ctx.room.name,
-    }
-
-    # Set up a voice AI pipeline using OpenAI, Cartesia, AssemblyAI, and the LiveKit turn detector
-    session = AgentSession(
+def _create_session(ctx: JobContext) -> AgentSession:
+    return AgentSession(
         # Speech-to-text (STT) is your agent's ears, turning the user's speech into text that the LLM can understand
         # See all available models at https://docs.livekit.io/agents/models/stt/
         stt=assemblyai.STT(),
@@ -351,6 +572,20 @@ async def entrypoint(ctx: JobContext):
         preemptive_generation=True,
     )
 
+
+async def entrypoint(ctx: JobContext):
+    # Logging setup
+    # Add any other context you want in all log entries here
+    ctx.log_context_fields = {
+        "room": ctx.room.name,
+    }
+    # Time from job start to the greeting, per phase
+    startup = PhaseTimer("startup")
+
+    # Set up a voice AI pipeline using OpenAI, Cartesia, AssemblyAI, and the LiveKit turn detector
+    with startup.phase("session"):
+        session = _create_session(ctx)
+
     # To use a realtime model instead of a voice pipeline, use the following session setup instead.
     # (Note: This is for the OpenAI Realtime API. For other providers, see https://docs.livekit.io/agents/models/realtime/))
     # 1. Install livekit-agents[openai]
@@ -361,18 +596,37 @@ async def entrypoint(ctx: JobContext):
     #     llm=openai.realtime.RealtimeModel(voice="marin")
     # )
 
+    # Kept so its per-session caches can be reported at shutdown
+    assistant = Assistant(
+        session_id=ctx.room.name, events=OrderEventPublisher(ctx.room, ctx.room.name)
+    )
+
     # Metrics collection, to measure pipeline performance
     # For more information, see https://docs.livekit.io/agents/build/metrics/
     usage_collector = metrics.UsageCollector()
+    # Catalog and order I/O runs on a thread pool; warn if the loop still stalls
+    lag_monitor = LoopLagMonitor()
+    lag_monitor.start()
 
     @session.on("metrics_collected")
     def _on_metrics_collected(ev: MetricsCollectedEvent):
         metrics.log_metrics(ev.metrics)
         usage_collector.collect(ev.metrics)
+        # Our own tool and catalog/order timings, for whatever ran since the last event
+        latency.log(logger, updated_only=True)
 
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage: {summary}")
+        await lag_monitor.stop()
+        logger.info(f"Event loop lag: {lag_monitor.stats()}")
+        logger.info(f"Render cache: {render_cache_stats()}")
+        logger.info(f"Order group commit: {order_writer_stats()}")
+        await assistant.prefetcher.close()
+        logger.info(f"Detail prefetch: {assistant.prefetcher.stats()}")
+        logger.info(f"Order events: {assistant.events.stats()}")
+        logger.info(f"Response sizes: {response_sizes.stats()}")
+        latency.log(logger)
 
     ctx.add_shutdown_callback(log_usage)
 
@@ -385,23 +639,46 @@ async def entrypoint(ctx: JobContext):
     # await avatar.start(session, room=ctx.room)
 
     # Start the session, which initializes the voice pipeline and warms up the models
-    await session.start(
-        agent=Assistant(),
-        room=ctx.room,
-        room_input_options=RoomInputOptions(
-            # For telephony applications, use `BVCTelephony` for best results
-            noise_cancellation=noise_cancellation.BVC(),
-        ),
-    )
+    with startup.phase("start"):
+        await session.start(
+            agent=assistant,
+            room=ctx.room,
+            room_input_options=RoomInputOptions(
+                # For telephony applications, use `BVCTelephony` for best results
+                noise_cancellation=noise_cancellation.BVC(),
+            ),
+        )
 
     # Join the room and connect to the user
-    await ctx.connect()
+    with startup.phase("connect"):
+        await ctx.connect()
     
-    # Send initial greeting
-    await session.say(
-        "Welcome to Voice Commerce! I'm your AI shopping assistant. I can help you browse our products, find what you're looking for, and place orders. We have mugs, t-shirts, hoodies, and accessories. What would you like to shop for today?",
-        allow_interruptions=True
-    )
+    # The agent starts speaking once the greeting's first audio plays out
+    first_audio = asyncio.Event()
+
+    @session.on("agent_state_changed")
+    def _on_agent_state_changed(ev: AgentStateChangedEvent):
+        if ev.new_state == "speaking":
+            first_audio.set()
+
+    # Send initial greeting; the phase ends when the user starts hearing it
+    # (say() itself only schedules the speech), so startup does not include
+    # how long the greeting is
+    with startup.phase("greeting"):
+        greeting = session.say(
+            "Welcome to Voice Commerce! I'm your AI shopping assistant. I can help you browse our products, find what you're looking for, and place orders. We have mugs, t-shirts, hoodies, and accessories. What would you like to shop for today?",
+            allow_interruptions=True
+        )
+        playout = asyncio.ensure_future(greeting.wait_for_playout())
+        heard = asyncio.ensure_future(first_audio.wait())
+        # An interruption can end the greeting before any audio plays
+        await asyncio.wait({playout, heard}, return_when=asyncio.FIRST_COMPLETED)
+        heard.cancel()
+    startup.log(logger)
+
+    # Reported with the other latencies, not as part of startup
+    with latency.time("greeting.playout"):
+        await playout
 
 
 if __name__ == "__main__":
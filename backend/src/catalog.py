@@ -1,30 +1,482 @@
 """Product catalog management for e-commerce agent."""
 
+import base64
+import hashlib
 import json
 import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, replace
+from functools import cached_property
+from itertools import islice
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
+from catalog_mmap import open_shared_catalog
+from facets import FacetIndex, normalize_category
+from fuzzy_index import FuzzyIndex
+from product_store import CatalogColumns, ProductRecord, build_records
+from render_cache import RenderCache
+from response_budget import (
+    DETAIL_DESCRIPTION_CHARS,
+    LISTING_DESCRIPTION_CHARS,
+    compact_mode,
+    truncate,
+)
+from search_index import SearchIndex
+from semantic_index import SemanticIndex, numpy_available, vectors_path
+from sqlite_store import get_store, sqlite_enabled
+from timing import PhaseTimer, latency
+
 logger = logging.getLogger(__name__)
 
 CATALOG_FILE = Path(__file__).parent.parent / "data" / "products.json"
 
+# Minimum number of seconds between two stat() calls on the catalog file.
+# Lookups inside this window are served straight from the in-memory snapshot.
+CATALOG_CHECK_INTERVAL = 1.0
+
+# Products read out per page of a listing or search
+PAGE_SIZE = 5
+
+
+class CatalogIndexes:
+    """Indexes derived from one catalog's products, built on first use.
+
+    Shared by every snapshot of the same catalog content, so a snapshot that
+    only records a new mtime does not rebuild them.
+    """
+
+    def __init__(
+        self,
+        products: Sequence[ProductRecord],
+        columns: CatalogColumns,
+        vectors_file: Path | None = None,
+        content_hash: str = "",
+    ) -> None:
+        self._products = products
+        self._columns = columns
+        # Precomputed product vectors, used if built from this content
+        self._vectors_file = vectors_file
+        self._content_hash = content_hash
+        # Product summaries by response mode (compact or not)
+        self._summaries: dict[bool, Mapping[str, str]] = {}
+
+    @cached_property
+    def search(self) -> SearchIndex:
+        return SearchIndex(self._products)
+
+    @cached_property
+    def fuzzy(self) -> FuzzyIndex:
+        return FuzzyIndex(self._products)
+
+    @cached_property
+    def facets(self) -> FacetIndex:
+        return FacetIndex(self._columns)
+
+    @cached_property
+    def semantic(self) -> SemanticIndex | None:
+        """Product vectors for semantic search; None when NumPy is not installed."""
+        if not numpy_available():
+            logger.info("NumPy is not installed; semantic search is disabled")
+            return None
+        if self._vectors_file is not None:
+            index = SemanticIndex.load(self._vectors_file, self._content_hash)
+            if index is not None:
+                return index
+            logger.info("No precomputed product vectors; computing them in memory")
+        return SemanticIndex.build(self._products)
+
+    @property
+    def summaries(self) -> Mapping[str, str]:
+        """Spoken one-line summary of every product, by product ID.
+
+        Kept per response mode, as the mode decides how they are rendered.
+        """
+        compact = compact_mode()
+        summaries = self._summaries.get(compact)
+        if summaries is None:
+            summaries = self._summaries[compact] = MappingProxyType(
+                {product.get("id"): format_product_summary(product) for product in self._products}
+            )
+        return summaries
+
+    def build(self, semantic: bool = False) -> None:
+        """Build every index now instead of on the first query.
+
+        Args:
+            semantic: Also load (or compute) the product vectors, which are
+                otherwise only needed once a search falls back to them
+        """
+        _ = self.search, self.fuzzy, self.facets, self.summaries
+        if semantic:
+            _ = self.semantic
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable, process-wide view of the catalog file at one point in time.
+
+    Products are stored as compact, read-only ``ProductRecord`` mappings that
+    are shared by every caller.
+    """
+
+    path: Path
+    products: Sequence[ProductRecord]
+    by_id: Mapping[str, ProductRecord]
+    columns: CatalogColumns
+    indexes: CatalogIndexes
+    version: int
+    mtime_ns: int
+    size: int
+    content_hash: str
+    loaded_at: float
+
+    @property
+    def search_index(self) -> SearchIndex:
+        return self.indexes.search
+
+    @property
+    def fuzzy_index(self) -> FuzzyIndex:
+        return self.indexes.fuzzy
+
+    @property
+    def facets(self) -> FacetIndex:
+        return self.indexes.facets
+
+
+@dataclass
+class CatalogStats:
+    """Counters describing how the catalog snapshot is being served."""
+
+    hits: int = 0
+    checks: int = 0
+    reloads: int = 0
+    reload_errors: int = 0
+    last_reload_ms: float = 0.0
+    total_reload_ms: float = 0.0
+
+
+_snapshot: CatalogSnapshot | None = None
+_snapshot_lock = threading.Lock()
+_last_check = 0.0
+_stats = CatalogStats()
+# Rendered browse/search responses for the current snapshot
+_render_cache = RenderCache()
+# Compiled, memory-mapped catalog file used instead of parsing the JSON in
+# every process; see enable_shared_catalog()
+_shared_catalog_file: Path | None = None
+
+
+def _parse_catalog(raw: bytes) -> tuple[ProductRecord, ...]:
+    data = json.loads(raw)
+    return build_records(data.get("products", []))
+
+
+def _build_id_index(products: tuple[ProductRecord, ...]) -> Mapping[str, ProductRecord]:
+    by_id: dict[str, ProductRecord] = {}
+    for product in products:
+        product_id = product.get("id")
+        if product_id is None:
+            continue
+        if product_id in by_id:
+            # Keep the first occurrence, matching the old linear scan.
+            logger.warning(f"Duplicate product ID in catalog: {product_id}")
+            continue
+        by_id[product_id] = product
+    return MappingProxyType(by_id)
+
+
+def _empty_snapshot(path: Path) -> CatalogSnapshot:
+    version = _snapshot.version if _snapshot is not None else 0
+    columns = CatalogColumns(())
+    return CatalogSnapshot(
+        path=path,
+        products=(),
+        by_id=MappingProxyType({}),
+        columns=columns,
+        indexes=CatalogIndexes((), columns),
+        version=version,
+        mtime_ns=0,
+        size=0,
+        content_hash="",
+        loaded_at=time.time(),
+    )
+
+
+def _refresh_snapshot(force: bool = False) -> CatalogSnapshot:
+    """Re-validate the snapshot against the file and swap it if it changed.
+
+    Must be called with ``_snapshot_lock`` held.
+    """
+    global _snapshot, _last_check
+
+    if sqlite_enabled():
+        return _refresh_sqlite_snapshot(force=force)
+
+    path = CATALOG_FILE
+    current = _snapshot if _snapshot is not None and _snapshot.path == path else None
+    _last_check = time.monotonic()
+    _stats.checks += 1
 
-def load_catalog() -> list[dict[str, Any]]:
-    """Load the product catalog from JSON file."""
     try:
-        with open(CATALOG_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data.get("products", [])
+        stat = path.stat()
     except FileNotFoundError:
-        logger.error(f"Catalog file not found: {CATALOG_FILE}")
-        return []
-    except json.JSONDecodeError as e:
+        logger.error(f"Catalog file not found: {path}")
+        if current is None:
+            _snapshot = _empty_snapshot(path)
+        return _snapshot
+
+    if (
+        not force
+        and current is not None
+        and stat.st_mtime_ns == current.mtime_ns
+        and stat.st_size == current.size
+    ):
+        _stats.hits += 1
+        return current
+
+    started = time.perf_counter()
+    try:
+        raw = path.read_bytes()
+        content_hash = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        if not force and current is not None and content_hash == current.content_hash:
+            # Touched but unchanged: keep the parsed products, remember the new mtime.
+            _snapshot = replace(current, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            _stats.hits += 1
+            return _snapshot
+        mapped = None
+        if _shared_catalog_file is not None:
+            try:
+                mapped = open_shared_catalog(
+                    raw, bytes.fromhex(content_hash), _shared_catalog_file, _parse_catalog
+                )
+            except OSError as e:
+                logger.warning(f"Shared catalog unavailable, parsing JSON instead: {e}")
+        if mapped is not None:
+            products, by_id, columns = mapped.products, mapped.by_id, mapped.columns
+            indexes = CatalogIndexes(products, columns, vectors_path(path), content_hash)
+            # Facets only read the mapped integer columns; the text indexes
+            # and summaries need every product decoded, so they are left
+            # for first use
+            _ = indexes.facets
+        else:
+            products = _parse_catalog(raw)
+            by_id = _build_id_index(products)
+            columns = CatalogColumns(products)
+            indexes = CatalogIndexes(products, columns, vectors_path(path), content_hash)
+            indexes.build()
+    except (OSError, ValueError) as e:
+        _stats.reload_errors += 1
         logger.error(f"Error parsing catalog JSON: {e}")
-        return []
+        if current is None:
+            _snapshot = _empty_snapshot(path)
+        return _snapshot
+
+    return _swap_snapshot(
+        CatalogSnapshot(
+            path=path,
+            products=products,
+            by_id=by_id,
+            columns=columns,
+            indexes=indexes,
+            version=0,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            content_hash=content_hash,
+            loaded_at=time.time(),
+        ),
+        started,
+    )
+
+
+def _swap_snapshot(snapshot: CatalogSnapshot, started: float) -> CatalogSnapshot:
+    """Install a freshly loaded snapshot under the next version number."""
+    global _snapshot
+
+    version = _snapshot.version + 1 if _snapshot is not None else 1
+    _snapshot = replace(snapshot, version=version)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _stats.reloads += 1
+    _stats.last_reload_ms = elapsed_ms
+    _stats.total_reload_ms += elapsed_ms
+    logger.info(
+        f"Catalog loaded: version={version}, products={len(snapshot.products)}, "
+        f"took {elapsed_ms:.1f}ms"
+    )
+    return _snapshot
+
+
+def _refresh_sqlite_snapshot(force: bool = False) -> CatalogSnapshot:
+    """SQLite counterpart of ``_refresh_snapshot``, keyed on the catalog revision.
+
+    Must be called with ``_snapshot_lock`` held.
+    """
+    global _snapshot, _last_check
+
+    store = get_store()
+    current = _snapshot if _snapshot is not None and _snapshot.path == store.path else None
+    _last_check = time.monotonic()
+    _stats.checks += 1
+
+    started = time.perf_counter()
+    try:
+        revision = f"sqlite:{store.catalog_revision()}"
+        if not force and current is not None and current.content_hash == revision:
+            _stats.hits += 1
+            return current
+        products = build_records(store.all_products())
+    except sqlite3.Error as e:
+        _stats.reload_errors += 1
+        logger.error(f"Error loading catalog from SQLite: {e}")
+        if current is None:
+            _snapshot = _empty_snapshot(store.path)
+        return _snapshot
+
+    columns = CatalogColumns(products)
+    indexes = CatalogIndexes(products, columns)
+    indexes.build()
+    return _swap_snapshot(
+        CatalogSnapshot(
+            path=store.path,
+            products=products,
+            by_id=_build_id_index(products),
+            columns=columns,
+            indexes=indexes,
+            version=0,
+            mtime_ns=0,
+            size=0,
+            content_hash=revision,
+            loaded_at=time.time(),
+        ),
+        started,
+    )
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    """Return the current catalog snapshot, reloading it if the file changed.
+
+    The file is only stat()-ed once every ``CATALOG_CHECK_INTERVAL`` seconds;
+    it is re-read when its mtime or size moves and re-parsed only when its
+    content hash differs from the snapshot in memory. With the SQLite
+    backend the snapshot is reloaded when the catalog revision changes.
+    """
+    snapshot = _snapshot
+    source = get_store().path if sqlite_enabled() else CATALOG_FILE
+    if (
+        snapshot is not None
+        and snapshot.path == source
+        and time.monotonic() - _last_check < CATALOG_CHECK_INTERVAL
+    ):
+        _stats.hits += 1
+        return snapshot
+
+    with _snapshot_lock:
+        return _refresh_snapshot()
+
+
+def reload_catalog(force: bool = False) -> CatalogSnapshot:
+    """Check the catalog file now, bypassing ``CATALOG_CHECK_INTERVAL``.
+
+    Args:
+        force: Re-parse the file even if its mtime and hash are unchanged
+
+    Returns:
+        The (possibly new) catalog snapshot
+    """
+    with _snapshot_lock:
+        return _refresh_snapshot(force=force)
+
+
+def enable_shared_catalog(path: Path | None = None) -> CatalogSnapshot:
+    """Serve the catalog from a compiled, memory-mapped file.
+
+    Meant to be called from the worker's prewarm hook. The first process
+    to see a new catalog compiles it next to the JSON file; every other
+    process maps the same file read-only, so product data is shared through
+    the page cache instead of being parsed and held by each job process.
+
+    Args:
+        path: Compiled catalog file (defaults to CATALOG_FILE with a .bin suffix)
+
+    Returns:
+        The snapshot backed by the mapped file
+    """
+    global _shared_catalog_file
+    with _snapshot_lock:
+        _shared_catalog_file = path or CATALOG_FILE.with_suffix(".bin")
+        return _refresh_snapshot(force=True)
+
+
+def prewarm_catalog(timer: PhaseTimer | None = None) -> CatalogSnapshot:
+    """Load the shared catalog and build all of its indexes up front.
+
+    Meant for the worker's prewarm hook, so the first tool call of a
+    session does not pay for parsing and index building.
+
+    Args:
+        timer: Records the "catalog" and "indexes" phases when given
+    """
+    timer = timer or PhaseTimer("catalog")
+    with timer.phase("catalog"):
+        snapshot = enable_shared_catalog()
+    with timer.phase("indexes"):
+        snapshot.indexes.build(semantic=True)
+    return snapshot
+
+
+def catalog_stats() -> dict[str, Any]:
+    """Return snapshot hit/reload counters for logging and metrics."""
+    snapshot = _snapshot
+    lookups = _stats.hits + _stats.reloads
+    return {
+        "version": snapshot.version if snapshot is not None else 0,
+        "products": len(snapshot.products) if snapshot is not None else 0,
+        "shared": _shared_catalog_file is not None,
+        "hits": _stats.hits,
+        "checks": _stats.checks,
+        "reloads": _stats.reloads,
+        "reload_errors": _stats.reload_errors,
+        "hit_rate": _stats.hits / lookups if lookups else 0.0,
+        "last_reload_ms": _stats.last_reload_ms,
+        "avg_reload_ms": _stats.total_reload_ms / _stats.reloads if _stats.reloads else 0.0,
+    }
 
 
-def list_products(filters: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+def reset_catalog_cache() -> None:
+    """Drop the in-memory snapshot and counters (mainly for tests)."""
+    global _snapshot, _last_check, _stats, _shared_catalog_file
+    with _snapshot_lock:
+        _snapshot = None
+        _shared_catalog_file = None
+        _last_check = 0.0
+        _stats = CatalogStats()
+        _render_cache.clear()
+
+
+def load_catalog() -> list[ProductRecord]:
+    """Load the product catalog from the shared in-memory snapshot.
+
+    Products are read-only ``ProductRecord`` mappings; use ``dict(product)``
+    or ``product.to_dict()`` for a mutable copy.
+    """
+    return list(get_catalog_snapshot().products)
+
+
+def _filter_positions(snapshot: CatalogSnapshot, filters: dict[str, Any]) -> list[int]:
+    return snapshot.facets.filter(
+        category=filters.get("category") or None,
+        color=filters.get("color") or None,
+        min_price=filters.get("min_price"),
+        max_price=filters.get("max_price"),
+    )
+
+
+def list_products(filters: dict[str, Any] | None = None) -> list[ProductRecord]:
     """
     List products with optional filters.
     
@@ -34,65 +486,148 @@ def list_products(filters: dict[str, Any] | None = None) -> list[dict[str, Any]]
     - color: str (product color)
     - min_price: int (minimum price in INR)
     """
-    products = load_catalog()
+    if filters and sqlite_enabled():
+        rows = get_store().list_products(
+            category=filters.get("category") or None,
+            color=filters.get("color") or None,
+            min_price=filters.get("min_price"),
+            max_price=filters.get("max_price"),
+        )
+        return [ProductRecord(row) for row in rows]
+
+    snapshot = get_catalog_snapshot()
     
     if not filters:
-        return products
+        return list(snapshot.products)
     
-    filtered = products
-    
-    # Filter by category (case-insensitive, handle variations and plurals)
-    if "category" in filters and filters["category"]:
-        category = filters["category"].lower().strip().replace("-", "").replace(" ", "").rstrip("s")
-        filtered = [p for p in filtered if p.get("category", "").lower().strip().replace("-", "").replace(" ", "").rstrip("s") == category]
-    
-    # Filter by max price
-    if "max_price" in filters and filters["max_price"] is not None:
-        max_price = filters["max_price"]
-        filtered = [p for p in filtered if p.get("price", 0) <= max_price]
-    
-    # Filter by min price
-    if "min_price" in filters and filters["min_price"] is not None:
-        min_price = filters["min_price"]
-        filtered = [p for p in filtered if p.get("price", 0) >= min_price]
-    
-    # Filter by color
-    if "color" in filters and filters["color"]:
-        color = filters["color"].lower()
-        filtered = [
-            p for p in filtered
-            if color in p.get("attributes", {}).get("color", "").lower()
-        ]
+    return [snapshot.products[i] for i in _filter_positions(snapshot, filters)]
+
+
+def facet_counts(filters: dict[str, Any] | None = None) -> dict[str, Any]:
+    """
+    Count the products matching the filters, broken down by facet.
     
-    return filtered
+    Args:
+        filters: Same filters as list_products
 
+    Returns:
+        Dict with "total", per-"category" and per-"color" counts, and
+        "min_price"/"max_price" of the matching products
+    """
+    snapshot = get_catalog_snapshot()
+    positions = _filter_positions(snapshot, filters) if filters else None
+    return snapshot.facets.counts(positions)
+
+
+def _search_positions(snapshot: CatalogSnapshot, query: str, limit: int | None) -> list[int]:
+    if not query.strip():
+        size = len(snapshot.products)
+        return list(range(size if limit is None else min(limit, size)))
+
+    index = snapshot.search_index
+    if limit is None:
+        positions = index.search(query, match_all=True) or index.search(query, match_all=False)
+    else:
+        # Heap-based top-k that stops as soon as the best `limit` are certain
+        positions = index.top_k(query, limit, match_all=True) or index.top_k(
+            query, limit, match_all=False
+        )
+    return (
+        positions
+        or snapshot.fuzzy_index.match(query)[:limit]
+        or _semantic_positions(snapshot, query, PAGE_SIZE if limit is None else limit)
+    )
+
+
+def _semantic_positions(snapshot: CatalogSnapshot, query: str, limit: int) -> list[int]:
+    index = snapshot.indexes.semantic
+    return index.search(query, k=limit) if index is not None else []
+
+
+def semantic_search(query: str, limit: int = 5) -> list[ProductRecord]:
+    """
+    Find products related in meaning to the query, even without shared keywords.
+
+    Used by search_products when neither keywords nor fuzzy name matching
+    find anything. Returns an empty list if NumPy is not installed.
+
+    Args:
+        query: Free-text description such as "something warm for winter"
+        limit: Maximum number of products to return
+
+    Returns:
+        List of related products, most similar first
+    """
+    snapshot = get_catalog_snapshot()
+    return [snapshot.products[i] for i in _semantic_positions(snapshot, query, limit)]
 
-def search_products(query: str) -> list[dict[str, Any]]:
+
+def search_products(query: str, limit: int | None = None) -> list[ProductRecord]:
     """
-    Search products by name or description.
+    Search products by name, description, category or attributes.
+
+    Products containing every query word are returned first; if none do,
+    products matching any of the words are returned instead, and if still
+    nothing matches, products whose name is a close (misspelt or misheard)
+    match, and finally products related in meaning (see semantic_search).
+    Results are ranked by relevance.
     
     Args:
         query: Search query string
+        limit: Only return the best ``limit`` matches; ranks just those
+            instead of every match, so large catalogs stay fast
         
     Returns:
-        List of matching products
+        List of matching products, best match first
     """
-    products = load_catalog()
-    query_lower = query.lower()
-    
-    results = []
-    for product in products:
-        name = product.get("name", "").lower()
-        description = product.get("description", "").lower()
-        category = product.get("category", "").lower()
-        
-        if query_lower in name or query_lower in description or query_lower in category:
-            results.append(product)
-    
-    return results
+    snapshot = get_catalog_snapshot()
+    return [snapshot.products[i] for i in _search_positions(snapshot, query, limit)]
 
 
-def get_product_by_id(product_id: str) -> dict[str, Any] | None:
+def fuzzy_match_products(text: str, limit: int = 5) -> list[ProductRecord]:
+    """
+    Find products whose name or ID approximately matches spoken text.
+
+    Tolerates speech-to-text and spelling errors such as "hoody" or
+    "stainles steel mug".
+
+    Args:
+        text: Product name or ID as heard
+        limit: Maximum number of products to return
+
+    Returns:
+        List of matching products, closest match first
+    """
+    snapshot = get_catalog_snapshot()
+    return [snapshot.products[i] for i in snapshot.fuzzy_index.match(text, limit=limit)]
+
+
+def resolve_product(reference: str) -> ProductRecord | None:
+    """
+    Resolve a product ID or spoken product name to a single product.
+
+    Tries an exact ID lookup, then the ranked keyword search, then fuzzy
+    name matching, all against the same catalog snapshot.
+
+    Args:
+        reference: Product ID or name
+
+    Returns:
+        Best matching product dict or None if nothing is close enough
+    """
+    snapshot = get_catalog_snapshot()
+    product = snapshot.by_id.get(reference) or snapshot.by_id.get(reference.strip().lower())
+    if product:
+        return product
+
+    index = snapshot.search_index
+    positions = index.top_k(reference, 1, match_all=True) or snapshot.fuzzy_index.match(
+        reference, limit=1
+    )
+    return snapshot.products[positions[0]] if positions else None
+
+
+def get_product_by_id(product_id: str) -> ProductRecord | None:
     """
     Get a product by its ID.
     
@@ -102,45 +637,477 @@ def get_product_by_id(product_id: str) -> dict[str, Any] | None:
     Returns:
         Product dict or None if not found
     """
-    products = load_catalog()
-    
-    for product in products:
-        if product.get("id") == product_id:
-            return product
+    if sqlite_enabled():
+        row = get_store().get_product(product_id)
+        return ProductRecord(row) if row is not None else None
+    return get_catalog_snapshot().by_id.get(product_id)
+
+
+def get_products_by_ids(product_ids: Iterable[str]) -> dict[str, ProductRecord]:
+    """
+    Get several products by ID against a single catalog snapshot.
     
-    return None
+    Args:
+        product_ids: Product IDs to resolve (duplicates are allowed)
+
+    Returns:
+        Dict mapping each ID that exists in the catalog to its product
+    """
+    if sqlite_enabled():
+        rows = get_store().get_products(product_ids)
+        return {product_id: ProductRecord(row) for product_id, row in rows.items()}
 
+    by_id = get_catalog_snapshot().by_id
+    found = {}
+    for product_id in product_ids:
+        product = by_id.get(product_id)
+        if product is not None:
+            found[product_id] = product
+    return found
 
-def format_product_summary(product: dict[str, Any]) -> str:
-    """Format a product for voice output."""
+
+def format_product_summary(product: Mapping[str, Any]) -> str:
+    """Format a product for voice output (short description in compact mode)."""
     product_id = product.get("id", "unknown")
     name = product.get("name", "Unknown")
     price = product.get("price", 0)
     currency = product.get("currency", "INR")
     description = product.get("description", "")
+    if compact_mode():
+        description = truncate(description, LISTING_DESCRIPTION_CHARS)
     
     return f"{name} (ID: {product_id}) - {price} {currency}. {description}"
 
 
-def format_products_list(products: list[dict[str, Any]], max_items: int = 5) -> str:
-    """Format a list of products for voice output."""
+def format_product_details(product: Mapping[str, Any]) -> str:
+    """Format everything about one product for voice output.
+
+    In compact mode the headline carries the name, ID and price, the
+    description is shortened and the attributes share one line.
+    """
+    name = product.get("name", "Unknown")
+    price = product.get("price", 0)
+    currency = product.get("currency", "INR")
+    description = product.get("description", "")
+    attributes = product.get("attributes", {})
+
+    if compact_mode():
+        result = f"{name} (ID: {product.get('id', 'unknown')}) - {price} {currency}\n"
+        result += truncate(description, DETAIL_DESCRIPTION_CHARS)
+        if attributes:
+            result += "\nDetails: " + "; ".join(
+                f"{key}: {', '.join(map(str, value)) if isinstance(value, list) else value}"
+                for key, value in attributes.items()
+            )
+        return result
+
+    result = f"{name} - {price} {currency}\n\n{description}\n\n"
+
+    if attributes:
+        result += "Details:\n"
+        for key, value in attributes.items():
+            result += f"- {key.capitalize()}: {value}\n"
+
+    return result
+
+
+def format_products_list(
+    products: Sequence[Mapping[str, Any]],
+    max_items: int = 5,
+    summaries: Mapping[str, str] | None = None,
+) -> str:
+    """Format a list of products for voice output.
+
+    Args:
+        products: Products to list, in the order to read them out
+        max_items: Maximum number of products to read out
+        summaries: Precomputed summaries by product ID (see
+            ``CatalogIndexes.summaries``); others are formatted on the fly
+    """
     if not products:
         return "No products found matching your criteria."
     
     count = len(products)
     items_to_show = products[:max_items]
     
-    result = f"I found {count} product{'s' if count != 1 else ''}. "
+    parts = [f"I found {count} product{'s' if count != 1 else ''}. "]
     
     if count > max_items:
-        result += f"Here are the first {max_items}:\n\n"
+        parts.append(f"Here are the first {max_items}:\n\n")
     else:
-        result += "Here they are:\n\n"
+        parts.append("Here they are:\n\n")
     
     for i, product in enumerate(items_to_show, 1):
-        result += f"{i}. {format_product_summary(product)}\n"
+        summary = summaries.get(product.get("id")) if summaries is not None else None
+        parts.append(f"{i}. {summary or format_product_summary(product)}\n")
     
     if count > max_items:
-        result += f"\nThere are {count - max_items} more products. Would you like to see more or filter further?"
+        parts.append(f"\nThere are {count - max_items} more products. Would you like to see more or filter further?")
     
-    return result
+    return "".join(parts)
+
+
+def _filters_key(filters: dict[str, Any] | None) -> tuple:
+    # "T-Shirts"/"tshirt" and "Blue"/"blue" render the same listing
+    if not filters:
+        return ()
+    key = []
+    for name, value in sorted(filters.items()):
+        if not value and value != 0:
+            continue
+        if name == "category":
+            value = normalize_category(value)
+        elif isinstance(value, str):
+            value = value.lower()
+        key.append((name, value))
+    return tuple(key)
+
+
+@dataclass(frozen=True)
+class ProductPage:
+    """One page of a listing or search, with a cursor for the next one."""
+
+    products: tuple[ProductRecord, ...]
+    start: int
+    next_cursor: str | None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def _encode_cursor(state: dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+class StaleCursorError(ValueError):
+    """A page cursor from before the catalog was reloaded."""
+
+
+def _decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid page cursor: {cursor!r}") from e
+    if not isinstance(state, dict) or state.get("k") not in ("list", "search"):
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
+    return state
+
+
+def _check_cursor_version(state: dict[str, Any], snapshot: CatalogSnapshot) -> None:
+    # Positions and scores in a cursor only mean something in the catalog
+    # they came from; resuming in another would skip or repeat products
+    if state.get("v") != snapshot.content_hash:
+        raise StaleCursorError("The catalog changed since this page cursor was issued")
+
+
+def _iter_listing(
+    snapshot: CatalogSnapshot, filters: dict[str, Any] | None, after: int
+) -> Iterator[tuple[int, ProductRecord]]:
+    positions = (
+        snapshot.facets.iter_filter(
+            category=filters.get("category") or None,
+            color=filters.get("color") or None,
+            min_price=filters.get("min_price"),
+            max_price=filters.get("max_price"),
+            after=after,
+        )
+        if filters
+        else range(after + 1, len(snapshot.products))
+    )
+    for position in positions:
+        yield position, snapshot.products[position]
+
+
+def list_products_page(
+    filters: dict[str, Any] | None = None,
+    cursor: str | None = None,
+    page_size: int = PAGE_SIZE,
+) -> ProductPage:
+    """
+    One page of list_products, resumable with the page's ``next_cursor``.
+
+    Matches are produced lazily in catalog order and only ``page_size + 1``
+    are taken, so later pages cost only the products they skip to, and a
+    large category is never materialized.
+
+    Args:
+        filters: Same filters as list_products (ignored when resuming)
+        cursor: ``next_cursor`` of the previous page
+        page_size: Products per page
+
+    Raises:
+        StaleCursorError: If the catalog was reloaded since ``cursor`` was issued
+    """
+    snapshot = get_catalog_snapshot()
+    after, start = -1, 0
+    if cursor is not None:
+        state = _decode_cursor(cursor)
+        _check_cursor_version(state, snapshot)
+        filters, after, start = state.get("f"), state["a"], state["s"]
+
+    if filters and sqlite_enabled():
+        rows = get_store().page_products(
+            category=filters.get("category") or None,
+            color=filters.get("color") or None,
+            min_price=filters.get("min_price"),
+            max_price=filters.get("max_price"),
+            after=after,
+            limit=page_size + 1,
+        )
+        matches = [(position, ProductRecord(row)) for position, row in rows]
+    else:
+        matches = list(islice(_iter_listing(snapshot, filters, after), page_size + 1))
+
+    next_cursor = None
+    if len(matches) > page_size:
+        matches = matches[:page_size]
+        next_cursor = _encode_cursor(
+            {
+                "k": "list",
+                "v": snapshot.content_hash,
+                "f": filters or None,
+                "a": matches[-1][0],
+                "s": start + page_size,
+            }
+        )
+    return ProductPage(tuple(product for _, product in matches), start, next_cursor)
+
+
+def _search_page_matches(
+    snapshot: CatalogSnapshot, query: str, mode: str | None, state: dict[str, Any], count: int
+) -> tuple[str, list[tuple[int, float]]]:
+    """Next ``count`` (position, score) matches of a search, and its match mode.
+
+    The mode is fixed by the first page: "all" or "any" query words
+    (BM25F-ranked, resumed after the last product's score and position),
+    "order" for an empty query (catalog order, resumed after the last
+    position), or the short "fuzzy"/"semantic" fallback lists (resumed
+    by offset).
+    """
+    if mode is None:
+        if not query.strip():
+            mode = "order"
+        else:
+            for mode in ("all", "any", "fuzzy", "semantic"):
+                found = _search_page_matches(snapshot, query, mode, state, count)[1]
+                if found:
+                    return mode, found
+            return mode, []
+
+    if mode == "order":
+        after = state.get("a", -1)
+        end = min(after + 1 + count, len(snapshot.products))
+        return mode, [(position, 0.0) for position in range(after + 1, end)]
+    if mode in ("all", "any"):
+        after = (state["sc"], state["a"]) if "a" in state else None
+        return mode, snapshot.search_index.top_k_scored(
+            query, count, match_all=mode == "all", after=after
+        )
+    offset = state.get("s", 0)
+    if mode == "fuzzy":
+        positions = snapshot.fuzzy_index.match(query)[offset : offset + count]
+    else:
+        positions = _semantic_positions(snapshot, query, offset + count)[offset:]
+    return mode, [(position, 0.0) for position in positions]
+
+
+def search_products_page(
+    query: str = "", cursor: str | None = None, page_size: int = PAGE_SIZE
+) -> ProductPage:
+    """
+    One page of search_products, resumable with the page's ``next_cursor``.
+
+    Each page ranks only its own products (plus one, to know whether more
+    follow), continuing from where the previous page stopped, so deep
+    pages cost no more than the first.
+
+    Args:
+        query: Search query string (ignored when resuming)
+        cursor: ``next_cursor`` of the previous page
+        page_size: Products per page
+
+    Raises:
+        StaleCursorError: If the catalog was reloaded since ``cursor`` was issued
+    """
+    snapshot = get_catalog_snapshot()
+    state: dict[str, Any] = {}
+    mode = None
+    if cursor is not None:
+        state = _decode_cursor(cursor)
+        _check_cursor_version(state, snapshot)
+        query, mode = state["q"], state["m"]
+    start = state.get("s", 0)
+
+    mode, matches = _search_page_matches(snapshot, query, mode, state, page_size + 1)
+
+    next_cursor = None
+    if len(matches) > page_size:
+        matches = matches[:page_size]
+        position, score = matches[-1]
+        next_cursor = _encode_cursor(
+            {
+                "k": "search",
+                "v": snapshot.content_hash,
+                "q": query,
+                "m": mode,
+                "a": position,
+                "sc": score,
+                "s": start + page_size,
+            }
+        )
+    return ProductPage(tuple(snapshot.products[i] for i, _ in matches), start, next_cursor)
+
+
+def next_page(cursor: str, page_size: int = PAGE_SIZE) -> ProductPage:
+    """
+    Continue a listing or search from the ``next_cursor`` of its last page.
+
+    Raises:
+        ValueError: If the cursor is malformed
+        StaleCursorError: If the catalog was reloaded since the cursor was issued
+    """
+    if _decode_cursor(cursor)["k"] == "search":
+        return search_products_page(cursor=cursor, page_size=page_size)
+    return list_products_page(cursor=cursor, page_size=page_size)
+
+
+def format_products_page(page: ProductPage, summaries: Mapping[str, str] | None = None) -> str:
+    """Format one page of products for voice output, numbered across pages."""
+    if not page.products:
+        if page.start:
+            return "There are no more products matching your criteria."
+        return "No products found matching your criteria."
+
+    count = len(page.products)
+    if page.start:
+        parts = [f"Here are products {page.start + 1} to {page.start + count}:\n\n"]
+    elif page.has_more:
+        parts = [f"I found more than {count} products. Here are the first {count}:\n\n"]
+    else:
+        parts = [f"I found {count} product{'s' if count != 1 else ''}. Here they are:\n\n"]
+
+    for i, product in enumerate(page.products, page.start + 1):
+        summary = summaries.get(product.get("id")) if summaries is not None else None
+        parts.append(f"{i}. {summary or format_product_summary(product)}\n")
+
+    if page.has_more:
+        parts.append("\nThere are more products. Would you like to hear the next page or filter further?")
+
+    return "".join(parts)
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    """Spoken text for one page of products, and the cursor for the next page."""
+
+    text: str
+    next_cursor: str | None
+    # IDs of the products on the page, in the order they are read out
+    product_ids: tuple[str, ...] = ()
+
+
+def _version_key(snapshot: CatalogSnapshot) -> Hashable:
+    # Rendered text also depends on the response mode
+    return (snapshot.path, snapshot.version, snapshot.content_hash, compact_mode())
+
+
+def loaded_version() -> Hashable | None:
+    """Version of the snapshot currently loaded, without re-checking the file.
+
+    Cheap enough for the event loop; changes once any catalog call has
+    noticed (and loaded) a newer catalog.
+    """
+    snapshot = _snapshot
+    return _version_key(snapshot) if snapshot is not None else None
+
+
+def _render(key: Hashable, fetch: Callable[[], ProductPage]) -> RenderedPage:
+    with latency.time("catalog.load"):
+        snapshot = get_catalog_snapshot()
+
+    def render() -> RenderedPage:
+        with latency.time(f"catalog.{key[0]}"):
+            page = fetch()
+        with latency.time("catalog.format"):
+            text = format_products_page(page, snapshot.indexes.summaries)
+        return RenderedPage(text, page.next_cursor, tuple(p.get("id") for p in page.products))
+
+    return _render_cache.get_or_render(_version_key(snapshot), key, render)
+
+
+def render_product_list(
+    filters: dict[str, Any] | None = None, page_size: int = PAGE_SIZE
+) -> RenderedPage:
+    """
+    First page of a filtered catalog listing, served from the render cache.
+
+    Args:
+        filters: Same filters as list_products
+        page_size: Products per page
+    """
+    return _render(
+        ("list", _filters_key(filters), page_size),
+        lambda: list_products_page(filters, page_size=page_size),
+    )
+
+
+def render_search(query: str, page_size: int = PAGE_SIZE) -> RenderedPage:
+    """
+    First page of a product search, served from the render cache.
+
+    Args:
+        query: Search query string
+        page_size: Products per page
+    """
+    key = " ".join(query.lower().split())
+    return _render(
+        ("search", key, page_size), lambda: search_products_page(query, page_size=page_size)
+    )
+
+
+def render_next_page(cursor: str, page_size: int = PAGE_SIZE) -> RenderedPage:
+    """
+    Page following a rendered listing or search, served from the render cache.
+
+    Raises:
+        ValueError: If the cursor is malformed
+        StaleCursorError: If the catalog was reloaded since the cursor was issued
+    """
+    return _render(("page", cursor, page_size), lambda: next_page(cursor, page_size))
+
+
+@dataclass(frozen=True)
+class ProductDetails:
+    """A product, its spoken detail text, and the catalog version both came from."""
+
+    product: ProductRecord
+    text: str
+    version: Hashable
+
+
+def render_product_details(product_ids: Iterable[str]) -> dict[str, ProductDetails]:
+    """
+    Detail responses for several products, from one catalog snapshot.
+
+    Args:
+        product_ids: Product IDs; unknown IDs are left out of the result
+    """
+    with latency.time("catalog.load"):
+        snapshot = get_catalog_snapshot()
+    version = _version_key(snapshot)
+    details = {}
+    with latency.time("catalog.details"):
+        for product_id in product_ids:
+            product = snapshot.by_id.get(product_id)
+            if product is not None:
+                details[product_id] = ProductDetails(
+                    product, format_product_details(product), version
+                )
+    return details
+
+
+def render_cache_stats() -> dict[str, Any]:
+    """Return hit/miss counters of the rendered-response cache."""
+    return _render_cache.stats()
@@ -0,0 +1,285 @@
+"""Binary, memory-mappable catalog shared by every job process on a node.
+
+``compile_catalog`` turns the parsed catalog into a single file holding the
+encoded products, a sorted ID index and the filter columns. Job processes
+``mmap`` that file read-only, so its pages live once in the OS page cache
+instead of once per process, and a product is only decoded when it is read.
+
+File layout (sections are 8-byte aligned and in native byte order, since the
+file is a per-node cache that is never copied between machines)::
+
+    header   magic, format version, product count, meta length, source hash
+    meta     JSON: string tables for the columns and section offsets
+    sections record_offsets u64[n+1], records (JSON per product),
+             id_offsets u64[n+1], ids (UTF-8), id_order u32[n] (positions
+             sorted by ID), prices f64[n], category_codes u32[n],
+             color_codes u32[n]
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from product_store import CatalogColumns, ProductRecord
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VCCATLG\0"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sIIQ16s")
+
+# Decoded products kept per process, so hot products are not re-parsed
+DECODE_CACHE_SIZE = 4096
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _offsets(chunks: Sequence[bytes]) -> bytes:
+    offsets = array("Q", [0])
+    for chunk in chunks:
+        offsets.append(offsets[-1] + len(chunk))
+    return offsets.tobytes()
+
+
+def compile_catalog(
+    products: Sequence[Mapping[str, Any]], source_hash: bytes, path: Path
+) -> None:
+    """Write ``products`` to ``path`` in the mappable format.
+
+    The file is written to a temporary name and renamed into place, so
+    processes mapping the previous version are never exposed to a partial file.
+
+    Args:
+        products: Parsed catalog products
+        source_hash: 16-byte digest of the JSON the products came from
+        path: Destination file
+    """
+    records = [
+        json.dumps(dict(product), ensure_ascii=False, separators=(",", ":")).encode()
+        for product in products
+    ]
+    ids = [str(product.get("id", "")).encode() for product in products]
+    id_order = sorted(range(len(ids)), key=lambda i: (ids[i], i))
+    columns = CatalogColumns(products)
+
+    count = len(products)
+    sections = {
+        "record_offsets": _offsets(records),
+        "records": b"".join(records),
+        "id_offsets": _offsets(ids),
+        "ids": b"".join(ids),
+        "id_order": array("I", id_order).tobytes(),
+        "prices": columns.prices.tobytes(),
+        "category_codes": columns.category_codes.tobytes(),
+        "color_codes": columns.color_codes.tobytes(),
+    }
+
+    # Offsets depend on the meta length, which depends on the offsets: lay
+    # the sections out relative to the end of the meta block
+    layout = {}
+    relative = 0
+    for name, data in sections.items():
+        layout[name] = [relative, len(data)]
+        relative = _align(relative + len(data))
+    meta = {
+        "categories": columns.categories,
+        "category_labels": columns.category_labels,
+        "colors": columns.colors,
+        "unique_ids": len(set(ids)),
+        "sections": layout,
+    }
+    meta_bytes = json.dumps(meta).encode()
+    body_start = _align(HEADER.size + len(meta_bytes))
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, count, len(meta_bytes), source_hash))
+        f.write(meta_bytes)
+        for name, data in sections.items():
+            f.seek(body_start + layout[name][0])
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    logger.info(f"Compiled catalog: {count} products -> {path}")
+
+
+def read_source_hash(path: Path) -> bytes | None:
+    """Return the source hash stored in a compiled catalog, or None if unusable."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, version, _, _, source_hash = HEADER.unpack(header)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    return source_hash
+
+
+class MappedColumns:
+    """``CatalogColumns`` interface backed by views into the mapped file."""
+
+    def __init__(
+        self,
+        prices: memoryview,
+        category_codes: memoryview,
+        color_codes: memoryview,
+        meta: dict[str, Any],
+    ) -> None:
+        self.prices = prices
+        self.category_codes = category_codes
+        self.color_codes = color_codes
+        self.categories: list[str] = meta["categories"]
+        self.category_labels: list[str] = meta["category_labels"]
+        self.colors: list[str] = meta["colors"]
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+
+class MappedProducts(Sequence[ProductRecord]):
+    """Sequence of products decoded on access from the mapped records section."""
+
+    def __init__(self, offsets: memoryview, records: memoryview) -> None:
+        self._offsets = offsets
+        self._records = records
+        self._decode = lru_cache(maxsize=DECODE_CACHE_SIZE)(self._decode_uncached)
+
+    def _decode_uncached(self, position: int) -> ProductRecord:
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return ProductRecord(json.loads(bytes(self._records[start:end])))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("product index out of range")
+        return self._decode(index)
+
+
+class MappedIdIndex(Mapping[str, ProductRecord]):
+    """Product ID lookup by binary search over the mapped, sorted ID table."""
+
+    def __init__(
+        self,
+        products: MappedProducts,
+        offsets: memoryview,
+        ids: memoryview,
+        order: memoryview,
+        unique_ids: int,
+    ) -> None:
+        self._products = products
+        self._offsets = offsets
+        self._ids = ids
+        self._order = order
+        self._unique_ids = unique_ids
+
+    def _id_at(self, position: int) -> bytes:
+        return bytes(self._ids[self._offsets[position] : self._offsets[position + 1]])
+
+    def _find(self, product_id: str) -> int | None:
+        key = product_id.encode()
+        low, high = 0, len(self._order)
+        while low < high:
+            mid = (low + high) // 2
+            if self._id_at(self._order[mid]) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(self._order) and self._id_at(self._order[low]) == key:
+            return self._order[low]
+        return None
+
+    def __getitem__(self, product_id: str) -> ProductRecord:
+        position = self._find(product_id) if isinstance(product_id, str) else None
+        if position is None:
+            raise KeyError(product_id)
+        return self._products[position]
+
+    def __contains__(self, product_id: object) -> bool:
+        return isinstance(product_id, str) and self._find(product_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        seen = set()
+        for position in range(len(self._order)):
+            product_id = self._id_at(position).decode()
+            if product_id not in seen:
+                seen.add(product_id)
+                yield product_id
+
+    def __len__(self) -> int:
+        return self._unique_ids
+
+
+class MappedCatalog:
+    """Read-only view over a compiled catalog file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        magic, version, count, meta_length, self.source_hash = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a compiled catalog (format {FORMAT_VERSION}): {path}")
+        meta = json.loads(bytes(buffer[HEADER.size : HEADER.size + meta_length]))
+        body_start = _align(HEADER.size + meta_length)
+
+        def section(name: str, fmt: str | None = None) -> memoryview:
+            offset, length = meta["sections"][name]
+            view = buffer[body_start + offset : body_start + offset + length]
+            return view.cast(fmt) if fmt else view
+
+        self.products = MappedProducts(section("record_offsets", "Q"), section("records"))
+        self.by_id = MappedIdIndex(
+            self.products,
+            section("id_offsets", "Q"),
+            section("ids"),
+            section("id_order", "I"),
+            meta["unique_ids"],
+        )
+        self.columns = MappedColumns(
+            section("prices", "d"),
+            section("category_codes", "I"),
+            section("color_codes", "I"),
+            meta,
+        )
+        if len(self.products) != count:
+            raise ValueError(f"Corrupt compiled catalog: {path}")
+
+
+def open_shared_catalog(
+    source: bytes, source_hash: bytes, path: Path, parse
+) -> MappedCatalog:
+    """Map the compiled catalog for ``source``, compiling it first if needed.
+
+    Processes that find an up-to-date file (same source hash) just map it;
+    otherwise the source is parsed with ``parse`` and compiled in place.
+
+    Args:
+        source: Raw catalog JSON
+        source_hash: 16-byte digest of ``source``
+        path: Compiled catalog file shared by all processes on the node
+        parse: Callable turning ``source`` into a sequence of products
+    """
+    if read_source_hash(path) != source_hash:
+        compile_catalog(parse(source), source_hash, path)
+    return MappedCatalog(path)
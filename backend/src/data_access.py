@@ -0,0 +1,194 @@
+"""Async access to the catalog and orders for the agent's tools.
+
+The catalog and order functions read files (or SQLite), parse JSON and
+fsync writes synchronously. Called straight from an ``async`` tool they
+would stall the event loop that also streams STT/TTS audio, so the
+wrappers here run them on a small, bounded thread pool instead.
+
+Orders are only built on the pool. They are then queued for the next
+group commit from the event loop, which awaits the commit without holding
+a pool thread, so a slow flush does not hold up catalog calls and a batch
+is not capped at the pool size.
+
+Configured through the environment (read when the pool is first used):
+
+    DATA_ACCESS_WORKERS   threads in the pool (default 4)
+    LOOP_LAG_BUDGET_MS    longest acceptable event-loop stall (default 50)
+"""
+
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+import catalog
+import orders
+from timing import latency
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_LAG_BUDGET_MS = 50.0
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def lag_budget() -> float:
+    """Longest acceptable event-loop stall, in seconds (LOOP_LAG_BUDGET_MS)."""
+    return float(os.getenv("LOOP_LAG_BUDGET_MS", DEFAULT_LAG_BUDGET_MS)) / 1000
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide pool used for catalog and order I/O."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = int(os.getenv("DATA_ACCESS_WORKERS", DEFAULT_WORKERS))
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, workers), thread_name_prefix="data-access"
+                )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the data-access pool and await its result.
+
+    At most ``DATA_ACCESS_WORKERS`` calls run at once; further calls queue
+    in the pool rather than spawning threads.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+# Catalog
+
+
+async def get_product_by_id(product_id: str) -> Any | None:
+    return await run_blocking(catalog.get_product_by_id, product_id)
+
+
+async def resolve_product(reference: str) -> Any | None:
+    return await run_blocking(catalog.resolve_product, reference)
+
+
+async def resolve_products(references: Sequence[str]) -> list[Any | None]:
+    """Resolve several product IDs or names in one trip to the pool."""
+    return await run_blocking(lambda: [catalog.resolve_product(ref) for ref in references])
+
+
+async def render_product_list(filters: dict[str, Any] | None = None) -> catalog.RenderedPage:
+    return await run_blocking(catalog.render_product_list, filters)
+
+
+async def render_search(query: str) -> catalog.RenderedPage:
+    return await run_blocking(catalog.render_search, query)
+
+
+async def render_next_page(cursor: str) -> catalog.RenderedPage:
+    return await run_blocking(catalog.render_next_page, cursor)
+
+
+async def render_product_details(product_ids: Sequence[str]) -> dict[str, catalog.ProductDetails]:
+    return await run_blocking(catalog.render_product_details, list(product_ids))
+
+
+# Orders
+
+
+async def write_order(order: dict[str, Any]) -> None:
+    """Persist an order; awaits its group commit instead of blocking a pool thread."""
+    with latency.time("orders.persist"):
+        future = orders.submit_order(order)
+        if future is not None:
+            await asyncio.wrap_future(future)
+        else:
+            await run_blocking(orders.write_order, order)
+
+
+async def create_order(
+    line_items: Sequence[dict[str, Any]], session: orders.SessionOrders | None = None
+) -> dict[str, Any]:
+    order = await run_blocking(orders.build_order, list(line_items), session)
+    await write_order(order)
+    orders.record_order(order, session)
+    return order
+
+
+async def checkout(
+    cart: orders.Cart, session: orders.SessionOrders | None = None
+) -> orders.CheckoutResult:
+    result = await run_blocking(orders.build_checkout, cart, session)
+    if result.order is not None:
+        await write_order(result.order)
+        orders.complete_checkout(cart, result, session)
+    return result
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a periodic timer.
+
+    A timer that should fire every ``interval`` seconds but fires later
+    means something held the loop for the difference. Every lag goes into
+    the ``event_loop.lag`` latency histogram; lags above ``budget`` are
+    also counted and logged.
+    """
+
+    def __init__(self, interval: float = 0.01, budget: float | None = None) -> None:
+        self.interval = interval
+        self.budget = lag_budget() if budget is None else budget
+        self.max_lag = 0.0
+        self.samples = 0
+        self.over_budget = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self.samples += 1
+            self.max_lag = max(self.max_lag, lag)
+            latency.record("event_loop.lag", lag * 1000)
+            if lag > self.budget:
+                self.over_budget += 1
+                logger.warning(
+                    f"Event loop blocked for {lag * 1000:.1f}ms "
+                    f"(budget {self.budget * 1000:.0f}ms)"
+                )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "over_budget": self.over_budget,
+            "budget_ms": round(self.budget * 1000, 2),
+        }
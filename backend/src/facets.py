@@ -0,0 +1,192 @@
+"""Precomputed facet indexes (category, color, price) for catalog filtering."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from heapq import merge
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from product_store import CatalogColumns
+
+
+class _Sized:
+    # Stand-in with just a length, for a candidate list that is only built
+    # if it turns out to be the smallest
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+
+def normalize_category(category: str) -> str:
+    """Normalize a category so "T-Shirts", "t shirt" and "tshirt" compare equal."""
+    return category.lower().strip().replace("-", "").replace(" ", "").rstrip("s")
+
+
+def product_category(product: Mapping[str, Any]) -> str:
+    """A product's category label; "" when it is missing or null."""
+    return product.get("category") or ""
+
+
+def product_color(product: Mapping[str, Any]) -> str:
+    """A product's lowercased color; "" when it (or its attributes) is missing or null."""
+    attributes = product.get("attributes") or {}
+    return str(attributes.get("color") or "").lower()
+
+
+def _price(value: float) -> float | int:
+    # Prices are stored as doubles; whole ones are reported as written
+    return int(value) if value.is_integer() else value
+
+
+class FacetIndex:
+    """Category, color and price lookups built once per catalog snapshot.
+
+    Works on the snapshot's ``CatalogColumns``: per-code posting arrays
+    for category and color, and a price-sorted array for range queries.
+    A filter starts from the smallest posting list and checks the other
+    predicates against the integer columns, so it never scans the catalog.
+    """
+
+    def __init__(self, columns: "CatalogColumns") -> None:
+        self._columns = columns
+        self._size = len(columns)
+
+        category_postings: list[list[int]] = [[] for _ in columns.categories]
+        color_postings: list[list[int]] = [[] for _ in columns.colors]
+        for position in range(self._size):
+            category_postings[columns.category_codes[position]].append(position)
+            color_postings[columns.color_codes[position]].append(position)
+        self._category_postings = [array("I", p) for p in category_postings]
+        self._color_postings = [array("I", p) for p in color_postings]
+        self._category_codes = {key: code for code, key in enumerate(columns.categories)}
+
+        prices = columns.prices
+        by_price = sorted(range(self._size), key=prices.__getitem__)
+        self._sorted_prices = array("d", (prices[i] for i in by_price))
+        self._sorted_positions = array("I", by_price)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _matching_colors(self, color: str) -> set[int]:
+        # Substring match over the color vocabulary ("blue" -> "navy blue"),
+        # which is tiny compared to the catalog
+        color = color.lower()
+        return {code for code, value in enumerate(self._columns.colors) if color in value}
+
+    def _price_range(self, min_price: int | None, max_price: int | None) -> range:
+        low = 0 if min_price is None else bisect_left(self._sorted_prices, min_price)
+        high = (
+            self._size if max_price is None else bisect_right(self._sorted_prices, max_price)
+        )
+        return range(low, max(low, high))
+
+    def filter(
+        self,
+        category: str | None = None,
+        color: str | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+    ) -> list[int]:
+        """Return catalog positions matching every given filter, in catalog order."""
+        return list(self.iter_filter(category, color, min_price, max_price))
+
+    def iter_filter(
+        self,
+        category: str | None = None,
+        color: str | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        after: int = -1,
+    ) -> Iterator[int]:
+        """Lazily yield matching catalog positions greater than ``after``, in order.
+
+        Nothing past the last position the caller consumes is checked, so
+        taking one page of a large category costs about one page of work.
+        """
+        columns = self._columns
+        candidates: list[Sequence[int]] = []
+
+        category_code = None
+        if category:
+            category_code = self._category_codes.get(normalize_category(category))
+            if category_code is None:
+                return
+            candidates.append(self._category_postings[category_code])
+
+        color_codes = None
+        merged_colors = None
+        if color:
+            color_codes = self._matching_colors(color)
+            if not color_codes:
+                return
+            if len(color_codes) == 1:
+                candidates.append(self._color_postings[next(iter(color_codes))])
+            else:
+                # Several colors match: merge their (sorted) postings lazily
+                merged_colors = [self._color_postings[c] for c in color_codes]
+                candidates.append(_Sized(sum(map(len, merged_colors))))
+
+        has_price = min_price is not None or max_price is not None
+        if has_price:
+            price_slice = self._price_range(min_price, max_price)
+            if not candidates or len(price_slice) < min(map(len, candidates)):
+                candidates.append(sorted(self._sorted_positions[i] for i in price_slice))
+
+        # Walk the smallest candidate list and check the remaining predicates
+        # against the columns
+        if not candidates:
+            walk: Iterable[int] = range(after + 1, self._size)
+        else:
+            smallest = min(candidates, key=len)
+            if isinstance(smallest, _Sized):
+                walk = merge(*(islice(p, bisect_right(p, after), None) for p in merged_colors))
+            else:
+                walk = islice(smallest, bisect_right(smallest, after), None)
+        low = float("-inf") if min_price is None else min_price
+        high = float("inf") if max_price is None else max_price
+        prices = columns.prices
+        for position in walk:
+            if (
+                (category_code is None or columns.category_codes[position] == category_code)
+                and (color_codes is None or columns.color_codes[position] in color_codes)
+                and (not has_price or low <= prices[position] <= high)
+            ):
+                yield position
+
+    def counts(self, positions: Sequence[int] | None = None) -> dict[str, Any]:
+        """Count products per category and color, plus the price range.
+
+        Args:
+            positions: Restrict the counts to these catalog positions
+                (e.g. the result of ``filter``); defaults to the whole catalog.
+        """
+        columns = self._columns
+        if positions is None:
+            positions = range(self._size)
+
+        category_counts = Counter(columns.category_codes[i] for i in positions)
+        color_counts = Counter(columns.color_codes[i] for i in positions)
+        prices = [columns.prices[i] for i in positions]
+
+        categories: dict[str, int] = {}
+        for code, count in category_counts.items():
+            label = columns.category_labels[code]
+            categories[label] = categories.get(label, 0) + count
+
+        return {
+            "total": len(prices),
+            "category": categories,
+            "color": {
+                columns.colors[code]: count
+                for code, count in color_counts.items()
+                if columns.colors[code]
+            },
+            "min_price": _price(min(prices)) if prices else None,
+            "max_price": _price(max(prices)) if prices else None,
+        }
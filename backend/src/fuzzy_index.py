@@ -0,0 +1,162 @@
+"""Typo- and ASR-tolerant matching of spoken product names and IDs."""
+
+from collections.abc import Sequence
+from typing import Any
+
+from search_index import STOPWORDS, tokenize
+
+# Terms shorter than this must match exactly; longer terms may be off by one
+# edit, and terms of LONG_TERM_LENGTH or more by two.
+SHORT_TERM_LENGTH = 4
+LONG_TERM_LENGTH = 6
+
+# Products must match at least this fraction of the query's words
+MIN_COVERAGE = 0.5
+
+
+def allowed_distance(term: str) -> int:
+    """Return how many edits a query term may be away from an indexed term."""
+    if len(term) < SHORT_TERM_LENGTH or any(ch.isdigit() for ch in term):
+        # IDs like "001" vs "002" must never be treated as typos of each other
+        return 0
+    if len(term) < LONG_TERM_LENGTH:
+        return 1
+    return 2
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Levenshtein distance between ``a`` and ``b``, capped at ``max_distance + 1``.
+
+    Only the diagonal band of width ``2 * max_distance + 1`` is computed and
+    the scan stops as soon as every cell in a row exceeds the bound.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    over = max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        current[0] = i
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + cost,
+            )
+        if min(current[low : high + 1], default=over) > max_distance:
+            return over
+        previous = current
+    return min(previous[len(b)], over)
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """Trigram index over the words of every product name and ID.
+
+    A query word is matched to indexed words that share enough trigrams to
+    possibly be within ``allowed_distance`` edits, and only those candidates
+    are checked with the (bounded) edit distance.
+    """
+
+    def __init__(self, products: Sequence[dict[str, Any]]) -> None:
+        term_products: dict[str, set[int]] = {}
+        for position, product in enumerate(products):
+            text = f"{product.get('name', '')} {product.get('id', '')}"
+            for term in tokenize(text):
+                positions = term_products.get(term)
+                if positions is None:
+                    term_products[term] = {position}
+                else:
+                    positions.add(position)
+        self._term_products = term_products
+
+        trigram_terms: dict[str, list[str]] = {}
+        for term in term_products:
+            for gram in trigrams(term):
+                terms = trigram_terms.get(gram)
+                if terms is None:
+                    trigram_terms[gram] = [term]
+                else:
+                    terms.append(term)
+        self._trigram_terms = trigram_terms
+
+    def match_term(self, term: str) -> dict[str, int]:
+        """Return indexed terms within the allowed edit distance of ``term``."""
+        if term in self._term_products:
+            return {term: 0}
+        max_distance = allowed_distance(term)
+        if max_distance == 0:
+            return {}
+
+        grams = trigrams(term)
+        # q-gram lemma: every edit destroys at most three trigrams
+        min_shared = max(1, len(grams) - 3 * max_distance)
+        shared: dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._trigram_terms.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        matches = {}
+        for candidate, count in shared.items():
+            if count < min_shared:
+                continue
+            distance = bounded_edit_distance(term, candidate, max_distance)
+            if distance <= max_distance:
+                matches[candidate] = distance
+        return matches
+
+    def _join_split_words(self, terms: list[str]) -> list[str]:
+        # ASR often splits compounds: "base ball cap" -> "baseball cap"
+        joined: list[str] = []
+        i = 0
+        while i < len(terms):
+            if i + 1 < len(terms) and terms[i] + terms[i + 1] in self._term_products:
+                joined.append(terms[i] + terms[i + 1])
+                i += 2
+            else:
+                joined.append(terms[i])
+                i += 1
+        return joined
+
+    def match(self, text: str, limit: int = 5) -> list[int]:
+        """Return product positions whose name/ID best matches ``text``.
+
+        Products are ranked by the fraction of query words they match, then
+        by how close those matches are. Products matching fewer than
+        ``MIN_COVERAGE`` of the words are dropped.
+        """
+        terms = [term for term in dict.fromkeys(tokenize(text)) if term not in STOPWORDS]
+        terms = self._join_split_words(terms)
+        if not terms:
+            return []
+
+        matched: dict[int, int] = {}
+        closeness: dict[int, float] = {}
+        for term in terms:
+            best: dict[int, float] = {}
+            for candidate, distance in self.match_term(term).items():
+                similarity = 1 - distance / (len(candidate) + 1)
+                for position in self._term_products[candidate]:
+                    if similarity > best.get(position, 0.0):
+                        best[position] = similarity
+            for position, similarity in best.items():
+                matched[position] = matched.get(position, 0) + 1
+                closeness[position] = closeness.get(position, 0.0) + similarity
+
+        ranked = [
+            position
+            for position, count in matched.items()
+            if count / len(terms) >= MIN_COVERAGE
+        ]
+        ranked.sort(key=lambda position: (-matched[position], -closeness[position], position))
+        return ranked[:limit]
@@ -0,0 +1,110 @@
+"""Group commit: many writers, one write and one fsync per batch."""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Largest batch committed at once
+DEFAULT_MAX_BATCH = 64
+# How long the first item of a batch waits for others to join it. With 0,
+# a batch is whatever queued up while the previous one was being written.
+DEFAULT_INTERVAL = 0.0
+
+T = TypeVar("T")
+
+
+class GroupCommitQueue(Generic[T]):
+    """Write-behind queue that commits items in batches on a background thread.
+
+    Writers call ``write`` (or ``submit`` and wait on the future); a single
+    flusher thread takes up to ``max_batch`` queued items, waiting at most
+    ``interval`` seconds after the first for more to arrive, and hands them
+    to ``commit`` in one call. Every writer in the batch is released once
+    ``commit`` returns, so an acknowledged item is as durable as ``commit``
+    makes it; if ``commit`` raises, every writer in the batch gets the error.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[list[T]], None],
+        max_batch: int = DEFAULT_MAX_BATCH,
+        interval: float = DEFAULT_INTERVAL,
+        name: str = "group-commit",
+    ) -> None:
+        self.max_batch = max(1, max_batch)
+        self.interval = max(0.0, interval)
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self._commit = commit
+        self._pending: deque[tuple[T, Future]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: T) -> "Future[None]":
+        """Queue ``item``; the future completes when its batch has committed."""
+        future: Future[None] = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Group commit queue is closed")
+            self._pending.append((item, future))
+            self._cond.notify()
+        return future
+
+    def write(self, item: T, timeout: float | None = None) -> None:
+        """Queue ``item`` and block until its batch has committed."""
+        self.submit(item).result(timeout)
+
+    def _next_batch(self) -> list[tuple[T, Future]] | None:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None  # closed and drained
+            if self.interval:
+                deadline = time.monotonic() + self.interval
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            count = min(len(self._pending), self.max_batch)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self) -> None:
+        while (batch := self._next_batch()) is not None:
+            try:
+                self._commit([item for item, _ in batch])
+            except BaseException as e:
+                logger.error(f"Group commit of {len(batch)} items failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for _, future in batch:
+                future.set_result(None)
+
+    def close(self) -> None:
+        """Commit everything still queued, then stop the flusher thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "mean_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
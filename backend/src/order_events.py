@@ -0,0 +1,162 @@
+"""Structured cart and order events for the frontend, over the LiveKit data channel.
+
+The UI used to find orders by scanning every transcript message for
+"Order placed successfully", which is linear in the conversation and
+breaks whenever the wording changes. Instead, the agent publishes small
+JSON events on the ``order-events`` topic:
+
+    {"v": 1, "seq": 7, "session": "room-1", "type": "order_placed",
+     "order": {...}, "totals": {...}}
+
+Types:
+
+- ``cart``: the whole cart (it is small), after any change to it
+- ``order_placed``: one new order, plus the session's running totals
+- ``order_summary``: the session's totals and its latest orders (at most
+  ``SUMMARY_ORDERS``; the UI has the earlier ones from their
+  ``order_placed`` events); the UI shows its summary, and can also use it
+  to resynchronise
+
+``seq`` increases by one per event of a session, so the UI can drop
+duplicates and stale events and notice a gap (the next ``cart`` or
+``order_summary`` snapshot repairs it).
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Protocol
+
+from orders import Cart, SessionOrders
+
+logger = logging.getLogger(__name__)
+
+ORDER_EVENTS_TOPIC = "order-events"
+EVENT_VERSION = 1
+
+# Most orders one order_summary event carries, so it stays well inside the
+# size of a reliable data packet (about 15 KiB) however long the session
+SUMMARY_ORDERS = 10
+
+
+class _Room(Protocol):
+    # What we use of livekit.rtc.Room (and what tests mock)
+    @property
+    def local_participant(self) -> Any: ...
+
+
+def _item_payload(item: dict[str, Any]) -> dict[str, Any]:
+    quantity = item.get("quantity", 1)
+    payload = {
+        "product_id": item.get("product_id"),
+        "name": item.get("product_name", "Unknown"),
+        "quantity": quantity,
+        "unit_price": item.get("unit_price", 0),
+        "line_total": item.get("line_total", item.get("unit_price", 0) * quantity),
+    }
+    for key in ("size", "color"):
+        if item.get(key) is not None:
+            payload[key] = item[key]
+    return payload
+
+
+def order_payload(order: dict[str, Any]) -> dict[str, Any]:
+    """The fields of an order the UI needs."""
+    return {
+        "id": order.get("id"),
+        "status": order.get("status"),
+        "items": [_item_payload(item) for item in order.get("items", [])],
+        "total": order.get("total", 0),
+        "currency": order.get("currency", "INR"),
+        "created_at": order.get("created_at"),
+    }
+
+
+def cart_payload(cart: Cart) -> dict[str, Any]:
+    lines = cart.lines
+    return {
+        "items": [
+            _item_payload(
+                {
+                    "product_id": line.product_id,
+                    "product_name": line.product_name,
+                    "quantity": line.quantity,
+                    "unit_price": line.unit_price,
+                    "line_total": line.total,
+                    "size": line.size,
+                    "color": line.color,
+                }
+            )
+            for line in lines
+        ],
+        "item_count": cart.item_count,
+        "total": cart.total,
+        "currency": lines[0].currency if lines else "INR",
+    }
+
+
+def totals_payload(session: SessionOrders) -> dict[str, Any]:
+    return {
+        "order_count": len(session),
+        "item_count": session.item_count,
+        "total": session.total,
+        "currency": session.currency,
+    }
+
+
+class OrderEventPublisher:
+    """Publishes one session's cart and order events, numbered in order.
+
+    Publishing never fails a tool call: errors are logged and counted, and
+    the skipped sequence number tells the UI it missed something.
+    """
+
+    def __init__(self, room: _Room, session_id: str, topic: str = ORDER_EVENTS_TOPIC) -> None:
+        self.session_id = session_id
+        self.topic = topic
+        self.seq = 0
+        self.published = 0
+        self.failed = 0
+        self._room = room
+        # Events go out in sequence order even when tools run concurrently
+        self._lock = asyncio.Lock()
+
+    async def publish(self, event_type: str, **fields: Any) -> dict[str, Any]:
+        async with self._lock:
+            self.seq += 1
+            event = {
+                "v": EVENT_VERSION,
+                "seq": self.seq,
+                "session": self.session_id,
+                "type": event_type,
+                **fields,
+            }
+            data = json.dumps(event, ensure_ascii=False, separators=(",", ":")).encode()
+            try:
+                await self._room.local_participant.publish_data(
+                    data, reliable=True, topic=self.topic
+                )
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Publishing {event_type} event {self.seq} failed: {e}")
+            else:
+                self.published += 1
+            return event
+
+    async def cart_updated(self, cart: Cart) -> dict[str, Any]:
+        return await self.publish("cart", cart=cart_payload(cart))
+
+    async def order_placed(self, order: dict[str, Any], session: SessionOrders) -> dict[str, Any]:
+        return await self.publish(
+            "order_placed", order=order_payload(order), totals=totals_payload(session)
+        )
+
+    async def order_summary(self, session: SessionOrders) -> dict[str, Any]:
+        return await self.publish(
+            "order_summary",
+            orders=[order_payload(order) for order in session.orders[-SUMMARY_ORDERS:]],
+            totals=totals_payload(session),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {"seq": self.seq, "published": self.published, "failed": self.failed}
@@ -0,0 +1,311 @@
+"""Append-only order journal with periodic compaction into a snapshot."""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, single process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# fsync after every append, at most once per FSYNC_INTERVAL seconds, or never
+# (leave flushing to the OS)
+FSYNC_POLICIES = ("always", "interval", "never")
+FSYNC_INTERVAL = 1.0
+
+
+def _fsync_directory(path: Path) -> None:
+    # Make a rename durable; not supported on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_snapshot(path: Path, orders: list[dict[str, Any]]) -> None:
+    """Atomically replace the snapshot file with ``orders``."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"orders": orders}, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_directory(path.parent)
+
+
+class OrderJournal:
+    """In-memory order index backed by a snapshot file plus a JSON-lines journal.
+
+    New orders are appended to the journal (one line each), so writing an
+    order costs O(1) regardless of history size. Every ``compact_every``
+    appends the full history is written to the snapshot atomically and the
+    journal is replaced by an empty one. On startup the index is rebuilt
+    from the snapshot and the journal; a torn last line left by a crash is
+    discarded.
+
+    Several processes may share the same files: writers serialize on an
+    exclusive ``flock`` of a sidecar lock file, readers take it shared, and
+    every access first tails whatever other processes appended since (or
+    reloads everything if another process compacted the journal).
+    """
+
+    def __init__(
+        self,
+        snapshot_path: Path,
+        journal_path: Path | None = None,
+        fsync: str = "always",
+        compact_every: int = 1000,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or snapshot_path.with_suffix(".journal.jsonl")
+        self.lock_path = snapshot_path.with_suffix(".lock")
+        self.fsync = fsync
+        self.compact_every = compact_every
+
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._orders: list[dict[str, Any]] = []
+        self._by_id: dict[str, dict[str, Any]] = {}
+        self._journal_entries = 0
+        # Bytes of the current journal file already indexed, and its inode
+        self._offset = 0
+        self._journal_inode: int | None = None
+        self._last_fsync = 0.0
+        self._journal_file = None
+
+        # The lock file stays open until close(), unless loading fails
+        with ExitStack() as stack:
+            self._lock_file = stack.enter_context(open(self.lock_path, "a+b"))
+            with self._file_lock(exclusive=True):
+                self._reload(repair=True)
+            stack.pop_all()
+        logger.info(f"Loaded {len(self._orders)} orders ({self._journal_entries} from journal)")
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        with self._lock:
+            if fcntl is None or self._lock_depth:
+                # Nested use keeps the outer lock (re-flocking would convert it)
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth = 1
+            try:
+                yield
+            finally:
+                self._lock_depth = 0
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _index(self, order: dict[str, Any]) -> None:
+        self._orders.append(order)
+        order_id = order.get("id")
+        if order_id is not None:
+            self._by_id.setdefault(order_id, order)
+
+    def _load_snapshot(self) -> None:
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"Orders file not found: {self.snapshot_path}")
+            return
+        except json.JSONDecodeError as e:
+            logger.error(f"Error parsing orders JSON: {e}")
+            return
+        for order in data.get("orders", []):
+            self._index(order)
+
+    def _reload(self, repair: bool) -> None:
+        self._orders = []
+        self._by_id = {}
+        self._journal_entries = 0
+        self._offset = 0
+        self._load_snapshot()
+        self._journal_inode = None
+        # Orders already in the snapshot were journaled before a crash
+        # interrupted compaction
+        self._tail_journal(repair=repair, skip_ids=set(self._by_id))
+
+    def _tail_journal(self, repair: bool, skip_ids: set[str] | None = None) -> None:
+        """Index journal lines appended since ``self._offset``.
+
+        With ``repair`` (exclusive lock held) a torn trailing line is cut off
+        so the next append starts on a clean line.
+        """
+        try:
+            with open(self.journal_path, "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                if self._journal_inode is not None and inode != self._journal_inode:
+                    # Another process compacted and replaced the journal
+                    self._reload(repair=repair)
+                    return
+                self._journal_inode = inode
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        consumed = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                order = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if not skip_ids or order.get("id") not in skip_ids:
+                self._index(order)
+            self._journal_entries += 1
+            consumed += len(line)
+        self._offset += consumed
+
+        if repair and consumed < len(data):
+            logger.warning(
+                f"Discarding {len(data) - consumed} bytes of torn order journal: {self.journal_path}"
+            )
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(self._offset)
+                os.fsync(f.fileno())
+
+    def _open_journal(self):
+        if self._journal_file is not None:
+            try:
+                current = os.stat(self.journal_path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current != os.fstat(self._journal_file.fileno()).st_ino:
+                self._journal_file.close()
+                self._journal_file = None
+        if self._journal_file is None:
+            # Kept open for appends until close() or the journal is replaced
+            with ExitStack() as stack:
+                journal_file = stack.enter_context(open(self.journal_path, "ab"))
+                self._journal_inode = os.fstat(journal_file.fileno()).st_ino
+                stack.pop_all()
+            self._journal_file = journal_file
+        return self._journal_file
+
+    def _sync(self, force: bool = False) -> None:
+        if self.fsync == "never" and not force:
+            return
+        now = time.monotonic()
+        if force or self.fsync == "always" or now - self._last_fsync >= FSYNC_INTERVAL:
+            os.fsync(self._open_journal().fileno())
+            self._last_fsync = now
+
+    def refresh(self) -> None:
+        """Pick up orders written by other processes since the last access."""
+        with self._file_lock(exclusive=False):
+            self._tail_journal(repair=False)
+
+    @property
+    def orders(self) -> list[dict[str, Any]]:
+        """All orders, oldest first (shared; do not mutate)."""
+        self.refresh()
+        return self._orders
+
+    def get(self, order_id: str) -> dict[str, Any] | None:
+        order = self._by_id.get(order_id)
+        if order is None:
+            self.refresh()
+            order = self._by_id.get(order_id)
+        return order
+
+    def append(self, order: dict[str, Any]) -> None:
+        """Durably (per the fsync policy) record one new order."""
+        self.append_many([order])
+
+    def append_many(self, orders: list[dict[str, Any]]) -> None:
+        """Durably record several new orders with one write and one fsync."""
+        if not orders:
+            return
+        data = b"".join(
+            (json.dumps(order, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+            for order in orders
+        )
+        with self._file_lock(exclusive=True):
+            self._tail_journal(repair=True)
+            journal = self._open_journal()
+            journal.write(data)
+            journal.flush()
+            self._sync()
+            self._offset += len(data)
+            for order in orders:
+                self._index(order)
+            self._journal_entries += len(orders)
+            if self.compact_every and self._journal_entries >= self.compact_every:
+                self._compact()
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot and start an empty journal."""
+        with self._file_lock(exclusive=True):
+            self._tail_journal(repair=True)
+            self._compact()
+
+    def _compact(self) -> None:
+        write_snapshot(self.snapshot_path, self._orders)
+        self._reset_journal()
+        logger.info(f"Compacted order journal into snapshot: {len(self._orders)} orders")
+
+    def replace_all(self, orders: list[dict[str, Any]]) -> None:
+        """Replace the whole order history (snapshot rewrite, journal cleared)."""
+        with self._file_lock(exclusive=True):
+            write_snapshot(self.snapshot_path, orders)
+            self._reset_journal()
+            self._orders = []
+            self._by_id = {}
+            for order in orders:
+                self._index(order)
+
+    def _reset_journal(self) -> None:
+        # Swap in a new (empty) file rather than truncating in place, so other
+        # processes notice the inode change and reload from the snapshot
+        tmp_path = self.journal_path.with_name(f"{self.journal_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+        _fsync_directory(self.journal_path.parent)
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        self._open_journal()
+        self._offset = 0
+        self._journal_entries = 0
+
+    def flush(self) -> None:
+        """fsync any appends not yet synced under the "interval"/"never" policies."""
+        with self._lock:
+            if self._journal_file is not None:
+                self._sync(force=True)
+
+    def close(self) -> None:
+        with self._lock, ExitStack() as stack:
+            # Closed even if the final fsync fails
+            stack.callback(self._lock_file.close)
+            if self._journal_file is not None:
+                stack.callback(self._close_journal)
+                self._sync(force=True)
+
+    def _close_journal(self) -> None:
+        self._journal_file.close()
+        self._journal_file = None
@@ -1,50 +1,398 @@
 """Order management for e-commerce agent."""
 
-import json
+import hashlib
+import itertools
 import logging
+import os
+import socket
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import Future
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from catalog import get_product_by_id
+from catalog import get_products_by_ids
+from group_commit import DEFAULT_INTERVAL, DEFAULT_MAX_BATCH, GroupCommitQueue
+from order_journal import OrderJournal
+from response_budget import compact_mode
+from sqlite_store import get_store, sqlite_enabled
+from timing import latency
 
 logger = logging.getLogger(__name__)
 
 ORDERS_FILE = Path(__file__).parent.parent / "data" / "orders.json"
 
+_journal: OrderJournal | None = None
+_journal_lock = threading.Lock()
+
+_writer: GroupCommitQueue[dict[str, Any]] | None = None
+_writer_pid = 0
+
+_id_lock = threading.Lock()
+_sequence = itertools.count(1)
+_last_timestamp = ""
+_node: tuple[int, str] | None = None
+
+
+def get_order_journal() -> OrderJournal:
+    """Return the process-wide order journal for ORDERS_FILE.
+
+    The journal is opened on first use, so its settings are read after
+    ``.env.local`` has been loaded:
+
+    - ORDERS_FSYNC_POLICY: "always" (default), "interval" or "never"
+    - ORDERS_COMPACT_EVERY: journal entries between compactions (default 1000)
+    """
+    global _journal
+    journal = _journal
+    if journal is not None and journal.snapshot_path == ORDERS_FILE:
+        return journal
+    with _journal_lock:
+        if _journal is None or _journal.snapshot_path != ORDERS_FILE:
+            if _journal is not None:
+                _journal.close()
+            _journal = OrderJournal(
+                ORDERS_FILE,
+                fsync=os.getenv("ORDERS_FSYNC_POLICY", "always"),
+                compact_every=int(os.getenv("ORDERS_COMPACT_EVERY", "1000")),
+            )
+        return _journal
+
+
+def _persist_orders(batch: list[dict[str, Any]]) -> None:
+    # One write and one fsync (or one SQLite transaction) for the whole batch
+    with latency.time("orders.commit"):
+        if sqlite_enabled():
+            get_store().insert_orders(batch)
+        else:
+            get_order_journal().append_many(batch)
+
+
+def get_order_writer() -> GroupCommitQueue[dict[str, Any]] | None:
+    """Return the process-wide group-commit queue, or None when disabled.
+
+    Orders created in this process are queued and written in batches by
+    one background thread; ``create_order`` still waits for its batch to be
+    durable. LiveKit runs each job in its own process, so a batch holds the
+    orders one session placed concurrently (e.g. parallel tool calls), not
+    orders from other sessions. Configured like the journal, on first use:
+
+    - ORDERS_GROUP_COMMIT: "1" (default) or "0" to write each order inline
+    - ORDERS_COMMIT_BATCH: most orders per batch (default 64)
+    - ORDERS_COMMIT_INTERVAL_MS: how long a batch waits for more orders
+      (default 0: whatever queued during the previous write)
+    """
+    global _writer, _writer_pid
+    if os.getenv("ORDERS_GROUP_COMMIT", "1") == "0":
+        return None
+    # A forked child inherits the queue but not its flusher thread
+    if _writer is not None and _writer_pid == os.getpid():
+        return _writer
+    with _journal_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            _writer = GroupCommitQueue(
+                _persist_orders,
+                max_batch=int(os.getenv("ORDERS_COMMIT_BATCH", DEFAULT_MAX_BATCH)),
+                interval=float(os.getenv("ORDERS_COMMIT_INTERVAL_MS", DEFAULT_INTERVAL)) / 1000,
+                name="order-writer",
+            )
+            _writer_pid = os.getpid()
+        return _writer
+
+
+def order_writer_stats() -> dict[str, Any] | None:
+    """Batch counters of the group-commit queue, if it has been started."""
+    writer = _writer
+    return writer.stats() if writer is not None else None
+
+
+def close_order_journal() -> None:
+    """Commit queued orders and close the order journal (e.g. on shutdown or in tests)."""
+    global _journal, _writer
+    writer = _writer
+    if writer is not None and _writer_pid == os.getpid():
+        writer.close()
+    _writer = None
+    with _journal_lock:
+        if _journal is not None:
+            _journal.close()
+            _journal = None
+
 
 def load_orders() -> list[dict[str, Any]]:
-    """Load orders from JSON file."""
-    try:
-        with open(ORDERS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data.get("orders", [])
-    except FileNotFoundError:
-        logger.warning(f"Orders file not found: {ORDERS_FILE}")
-        return []
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parsing orders JSON: {e}")
-        return []
+    """Load all orders from the configured storage backend."""
+    if sqlite_enabled():
+        return get_store().list_orders()
+    return list(get_order_journal().orders)
 
 
 def save_orders(orders: list[dict[str, Any]]) -> bool:
-    """Save orders to JSON file."""
+    """Replace the whole order history with ``orders``."""
     try:
-        with open(ORDERS_FILE, "w", encoding="utf-8") as f:
-            json.dump({"orders": orders}, f, indent=2, ensure_ascii=False)
+        if sqlite_enabled():
+            get_store().replace_orders(orders)
+        else:
+            get_order_journal().replace_all(orders)
         return True
     except Exception as e:
         logger.error(f"Error saving orders: {e}")
         return False
 
 
+@dataclass
+class LedgerLine:
+    """Everything ordered in a session for one product and option combination."""
+
+    product_id: str
+    product_name: str
+    unit_price: int
+    size: str | None = None
+    color: str | None = None
+    quantity: int = 0
+    total: int = 0
+
+
+class SessionOrders:
+    """Orders placed during one agent session (room), oldest first.
+
+    ``create_order`` appends to it as orders are placed, so a session's
+    summary never has to read the order history of every customer. It also
+    keeps a running ledger: the grand total and item count, and one
+    ``LedgerLine`` per distinct product/size/color, all updated in
+    O(items of the new order).
+    """
+
+    def __init__(self, session_id: str) -> None:
+        self.session_id = session_id
+        self._orders: list[dict[str, Any]] = []
+        self._lines: dict[tuple, LedgerLine] = {}
+        self.total = 0
+        self.item_count = 0
+        self.currency = "INR"
+        self._lock = threading.Lock()
+
+    def add(self, order: dict[str, Any]) -> None:
+        with self._lock:
+            self._orders.append(order)
+            self.currency = order.get("currency", self.currency)
+            for item in order.get("items", []):
+                quantity = item.get("quantity", 1)
+                unit_price = item.get("unit_price", 0)
+                key = (item.get("product_id"), item.get("size"), item.get("color"), unit_price)
+                line = self._lines.get(key)
+                if line is None:
+                    line = self._lines[key] = LedgerLine(
+                        product_id=item.get("product_id"),
+                        product_name=item.get("product_name", "Unknown"),
+                        unit_price=unit_price,
+                        size=item.get("size"),
+                        color=item.get("color"),
+                    )
+                line_total = item.get("line_total", unit_price * quantity)
+                line.quantity += quantity
+                line.total += line_total
+                self.item_count += quantity
+                self.total += line_total
+
+    @property
+    def orders(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return list(self._orders)
+
+    @property
+    def lines(self) -> list[LedgerLine]:
+        """Ledger lines in the order their product was first ordered."""
+        with self._lock:
+            return list(self._lines.values())
+
+    @property
+    def last(self) -> dict[str, Any] | None:
+        with self._lock:
+            return self._orders[-1] if self._orders else None
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+
+@dataclass
+class CartLine:
+    """One product and option combination waiting in the cart."""
+
+    product_id: str
+    product_name: str
+    unit_price: int
+    quantity: int = 1
+    size: str | None = None
+    color: str | None = None
+    currency: str = "INR"
+
+    @property
+    def total(self) -> int:
+        return self.unit_price * self.quantity
+
+    def line_item(self) -> dict[str, Any]:
+        """The line item ``create_order`` expects for this line."""
+        item: dict[str, Any] = {"product_id": self.product_id, "quantity": self.quantity}
+        if self.size is not None:
+            item["size"] = self.size
+        if self.color is not None:
+            item["color"] = self.color
+        return item
+
+
+class Cart:
+    """Products a customer has picked but not yet ordered, for one session.
+
+    Lines are keyed by product, size and color, so adding the same product
+    twice raises its quantity instead of adding a second line. Nothing is
+    written anywhere until ``checkout`` turns the whole cart into one order.
+    """
+
+    def __init__(self) -> None:
+        self._lines: dict[tuple, CartLine] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        product: dict[str, Any],
+        quantity: int = 1,
+        size: str | None = None,
+        color: str | None = None,
+    ) -> CartLine:
+        """Add ``quantity`` of a product to its line.
+
+        Raises:
+            ValueError: If ``quantity`` is less than 1
+        """
+        if quantity < 1:
+            raise ValueError(f"Quantity must be at least 1, not {quantity}")
+        key = (product.get("id"), size, color)
+        with self._lock:
+            line = self._lines.get(key)
+            if line is None:
+                line = self._lines[key] = CartLine(
+                    product_id=product.get("id"),
+                    product_name=product.get("name", "Unknown"),
+                    unit_price=product.get("price", 0),
+                    quantity=0,
+                    size=size,
+                    color=color,
+                    currency=product.get("currency", "INR"),
+                )
+            line.quantity += quantity
+            return line
+
+    def find(self, reference: str) -> list[CartLine]:
+        """Lines whose product ID or name matches ``reference`` (case-insensitive)."""
+        reference = reference.strip().lower()
+        with self._lock:
+            return [
+                line
+                for line in self._lines.values()
+                if reference in (line.product_id.lower(), line.product_name.lower())
+            ]
+
+    def update(self, line: CartLine, quantity: int) -> None:
+        """Set a line's quantity; zero removes it.
+
+        Raises:
+            ValueError: If ``quantity`` is negative
+        """
+        if quantity < 0:
+            raise ValueError(f"Quantity must not be negative, not {quantity}")
+        if quantity == 0:
+            self.remove(line)
+            return
+        with self._lock:
+            line.quantity = quantity
+
+    def remove(self, line: CartLine) -> None:
+        with self._lock:
+            self._lines.pop((line.product_id, line.size, line.color), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lines.clear()
+
+    @property
+    def lines(self) -> list[CartLine]:
+        """Cart lines in the order they were first added."""
+        with self._lock:
+            return list(self._lines.values())
+
+    @property
+    def total(self) -> int:
+        return sum(line.total for line in self.lines)
+
+    @property
+    def item_count(self) -> int:
+        return sum(line.quantity for line in self.lines)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+
+def _node_id() -> str:
+    """Short identifier of this host and process, stable for the process' lifetime."""
+    global _node
+    pid = os.getpid()
+    if _node is None or _node[0] != pid:
+        seed = f"{socket.gethostname()}:{pid}:{time.time_ns()}".encode()
+        _node = (pid, hashlib.blake2b(seed, digest_size=3).hexdigest())
+    return _node[1]
+
+
 def generate_order_id() -> str:
-    """Generate a unique order ID."""
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    return f"ORD-{timestamp}"
+    """Generate a unique order ID.
+
+    Format: ORD-<YYYYMMDDHHMMSS>-<node>-<sequence>, where node identifies the
+    host and process and sequence increases monotonically within the process,
+    so IDs never collide within a second or across worker processes.
+    """
+    global _last_timestamp
+    with _id_lock:
+        # Never let the timestamp part go backwards if the wall clock does
+        timestamp = max(datetime.now().strftime("%Y%m%d%H%M%S"), _last_timestamp)
+        _last_timestamp = timestamp
+        sequence = next(_sequence)
+    return f"ORD-{timestamp}-{_node_id()}-{sequence:04d}"
 
 
-def create_order(line_items: list[dict[str, Any]]) -> dict[str, Any]:
+def submit_order(order: dict[str, Any]) -> Future[None] | None:
+    """Queue an order for the next group commit, without waiting for it.
+
+    Returns the future completing once the order is durable, or None when
+    group commit is disabled and the caller must ``write_order`` it.
+    """
+    writer = get_order_writer()
+    return writer.submit(order) if writer is not None else None
+
+
+def write_order(order: dict[str, Any]) -> None:
+    """Persist an order, blocking until it is durable."""
+    with latency.time("orders.persist"):
+        future = submit_order(order)
+        if future is not None:
+            future.result()
+        else:
+            _persist_orders([order])
+
+
+def record_order(order: dict[str, Any], session: SessionOrders | None = None) -> None:
+    """Add a persisted order to its session's index."""
+    if session is not None:
+        session.add(order)
+    logger.info(f"Order created: {order['id']}, Total: {order['total']} {order['currency']}")
+
+
+def create_order(
+    line_items: list[dict[str, Any]],
+    session: SessionOrders | None = None,
+    products: Mapping[str, Any] | None = None,
+) -> dict[str, Any]:
     """
     Create a new order.
     
@@ -58,11 +406,15 @@ def create_order(line_items: list[dict[str, Any]]) -> dict[str, Any]:
                     "color": "black"  # optional
                 }
             ]
+        session: Session the order is placed in; the order is tagged with
+            its ID and added to its index once persisted
+        products: The line items' products by ID, if the caller already
+            resolved them with get_products_by_ids
     
     Returns:
         Order dict with structure:
         {
-            "id": "ORD-20251130153000",
+            "id": "ORD-20251130153000-3fa2c1-0001",
             "items": [...],
             "total": 598,
             "currency": "INR",
@@ -70,17 +422,42 @@ def create_order(line_items: list[dict[str, Any]]) -> dict[str, Any]:
             "created_at": "2025-11-30T15:30:00Z"
         }
     """
+    order = build_order(line_items, session, products)
+    write_order(order)
+    record_order(order, session)
+    return order
+
+
+def build_order(
+    line_items: list[dict[str, Any]],
+    session: SessionOrders | None = None,
+    products: Mapping[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Resolve line items into a new order, without persisting it (see create_order).
+
+    Raises:
+        ValueError: If a line item's quantity is less than 1
+    """
+    for item in line_items:
+        if item.get("quantity", 1) < 1:
+            raise ValueError(f"Quantity must be at least 1, not {item['quantity']}")
+
     order_id = generate_order_id()
     order_items = []
     total = 0
     currency = "INR"
     
+    # Resolve every line item against one catalog snapshot
+    if products is None:
+        with latency.time("orders.resolve"):
+            products = get_products_by_ids(item.get("product_id") for item in line_items)
+
     for item in line_items:
         product_id = item.get("product_id")
         quantity = item.get("quantity", 1)
         
         # Get product details
-        product = get_product_by_id(product_id)
+        product = products.get(product_id)
         if not product:
             logger.warning(f"Product not found: {product_id}")
             continue
@@ -94,6 +471,7 @@ def create_order(line_items: list[dict[str, Any]]) -> dict[str, Any]:
             "product_name": product.get("name", "Unknown"),
             "quantity": quantity,
             "unit_price": unit_price,
+            "line_total": item_total,
             "currency": product.get("currency", "INR"),
         }
         
@@ -114,20 +492,77 @@ def create_order(line_items: list[dict[str, Any]]) -> dict[str, Any]:
         "status": "CONFIRMED",
         "created_at": datetime.now().isoformat()
     }
-    
-    # Save to file
-    orders = load_orders()
-    orders.append(order)
-    save_orders(orders)
-    
-    logger.info(f"Order created: {order_id}, Total: {total} {currency}")
-    
+    if session is not None:
+        order["session_id"] = session.session_id
     return order
 
 
+@dataclass(frozen=True)
+class CheckoutResult:
+    """The order a checkout placed, or the cart lines that prevented it."""
+
+    order: dict[str, Any] | None
+    # Lines whose product is no longer in the catalog
+    unavailable: tuple[CartLine, ...] = ()
+    # Lines the order was built from
+    lines: tuple[CartLine, ...] = ()
+
+
+def checkout(cart: Cart, session: SessionOrders | None = None) -> CheckoutResult:
+    """
+    Place one order for everything in the cart and remove it from the cart.
+
+    All line items are resolved against the catalog in one batch and the
+    order is persisted with a single write, however many items it has.
+    If any line's product no longer exists, nothing is ordered and the
+    cart is left as it was, so the customer is never charged for part of
+    what they confirmed.
+
+    Args:
+        cart: Cart to check out
+        session: Session the order is placed in (see create_order)
+
+    Returns:
+        The order, or no order and the unavailable lines (none if the cart
+        was empty)
+    """
+    result = build_checkout(cart, session)
+    if result.order is not None:
+        write_order(result.order)
+        complete_checkout(cart, result, session)
+    return result
+
+
+def build_checkout(cart: Cart, session: SessionOrders | None = None) -> CheckoutResult:
+    """Resolve the cart into an order, without persisting it or changing the cart."""
+    lines = tuple(cart.lines)
+    if not lines:
+        return CheckoutResult(None)
+    with latency.time("orders.resolve"):
+        products = get_products_by_ids(line.product_id for line in lines)
+    unavailable = tuple(line for line in lines if line.product_id not in products)
+    if unavailable:
+        return CheckoutResult(None, unavailable)
+    order = build_order([line.line_item() for line in lines], session, products)
+    return CheckoutResult(order, lines=lines)
+
+
+def complete_checkout(
+    cart: Cart, result: CheckoutResult, session: SessionOrders | None = None
+) -> None:
+    """Record a persisted checkout order and take its lines out of the cart."""
+    record_order(result.order, session)
+    # Only what was ordered: lines added meanwhile stay in the cart
+    for line in result.lines:
+        cart.remove(line)
+
+
 def get_last_order() -> dict[str, Any] | None:
     """Get the most recent order."""
-    orders = load_orders()
+    if sqlite_enabled():
+        return get_store().last_order()
+
+    orders = get_order_journal().orders
     
     if not orders:
         return None
@@ -138,13 +573,9 @@ def get_last_order() -> dict[str, Any] | None:
 
 def get_order_by_id(order_id: str) -> dict[str, Any] | None:
     """Get an order by its ID."""
-    orders = load_orders()
-    
-    for order in orders:
-        if order.get("id") == order_id:
-            return order
-    
-    return None
+    if sqlite_enabled():
+        return get_store().get_order(order_id)
+    return get_order_journal().get(order_id)
 
 
 def list_orders() -> list[dict[str, Any]]:
@@ -153,22 +584,36 @@ def list_orders() -> list[dict[str, Any]]:
 
 
 def format_order_summary(order: dict[str, Any]) -> str:
-    """Format an order for voice output."""
+    """Format an order for voice output (one line per item in compact mode)."""
     order_id = order.get("id", "Unknown")
     items = order.get("items", [])
     total = order.get("total", 0)
     currency = order.get("currency", "INR")
     status = order.get("status", "UNKNOWN")
     
+    if compact_mode():
+        result = f"Order {order_id} ({status}), total {total} {currency}:"
+        for item in items:
+            quantity = item.get("quantity", 1)
+            line_total = item.get("line_total", item.get("unit_price", 0) * quantity)
+            result += f"\n- {item.get('product_name', 'Unknown')} x {quantity} = {line_total} {currency}"
+            size = item.get("size")
+            color = item.get("color")
+            if size is not None and color is not None:
+                result += f" ({size}, {color})"
+            elif size is not None or color is not None:
+                result += f" ({size if color is None else color})"
+        return result
+
     result = f"Order {order_id} - Status: {status}\n\n"
     result += "Items:\n"
     
     for item in items:
         name = item.get("product_name", "Unknown")
         quantity = item.get("quantity", 1)
-        unit_price = item.get("unit_price", 0)
+        line_total = item.get("line_total", item.get("unit_price", 0) * quantity)
         
-        result += f"- {name} x {quantity} = {unit_price * quantity} {currency}"
+        result += f"- {name} x {quantity} = {line_total} {currency}"
         
         # Add size/color if present
         if "size" in item:
@@ -181,3 +626,55 @@ def format_order_summary(order: dict[str, Any]) -> str:
     result += f"\nTotal: {total} {currency}"
     
     return result
+
+
+def format_session_summary(session: SessionOrders) -> str:
+    """Format everything ordered in a session for voice output.
+
+    Reads the session's running ledger, so the cost depends on the number
+    of distinct products ordered, not on the number of orders.
+    """
+    order_count = len(session)
+    if not order_count:
+        return "You haven't placed any orders yet. Would you like to browse our products?"
+
+    parts = [
+        f"Here's your complete order summary. You placed {order_count} order{'s' if order_count > 1 else ''}.\n\n"
+    ]
+
+    for line in session.lines:
+        part = f"{line.quantity} {line.product_name}"
+        if line.quantity > 1:
+            part += f" at {line.unit_price} rupees each"
+        part += f" for {line.total} rupees"
+
+        # Add size/color if present
+        if line.size is not None:
+            part += f", size {line.size}"
+        if line.color is not None:
+            part += f", {line.color} color"
+
+        parts.append(part + ". ")
+
+    parts.append(f"\n\nYour grand total is {session.total} rupees. Thank you for shopping with us!")
+
+    return "".join(parts)
+
+
+def format_cart(cart: Cart) -> str:
+    """Format the cart contents for voice output."""
+    lines = cart.lines
+    if not lines:
+        return "Your cart is empty."
+
+    parts = [f"Your cart has {cart.item_count} item{'s' if cart.item_count > 1 else ''}:\n"]
+    for line in lines:
+        part = f"- {line.product_name} (ID: {line.product_id}) x {line.quantity} = {line.total} {line.currency}"
+        if line.size is not None:
+            part += f" (Size: {line.size})"
+        if line.color is not None:
+            part += f" (Color: {line.color})"
+        parts.append(part + "\n")
+    parts.append(f"\nCart total: {cart.total} {lines[0].currency}")
+
+    return "".join(parts)
@@ -0,0 +1,124 @@
+"""Speculative, per-session prefetch of product detail responses.
+
+After a listing is read out, the customer's next request is usually about
+one of the products on it ("tell me about the second one", "order the
+black hoodie"). The prefetcher renders those products' detail responses
+in the background while the agent is still speaking, so the follow-up
+tool call is answered from memory instead of a trip to the data-access
+pool.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any
+
+import catalog
+import data_access
+from catalog import ProductDetails
+
+logger = logging.getLogger(__name__)
+
+# Products prefetched after one listing (its first ones, as read out)
+PREFETCH_PER_LISTING = 5
+# Prefetched detail responses kept per session
+PREFETCH_CACHE_SIZE = 20
+
+
+class DetailPrefetcher:
+    """Per-session cache of speculatively rendered product details.
+
+    Speculative work is capped: at most ``per_listing`` products per
+    listing, at most ``maxsize`` cached responses, and one prefetch in
+    flight per session (a newer listing cancels the previous prefetch).
+    Entries are dropped once the catalog they were rendered from is
+    replaced.
+    """
+
+    def __init__(
+        self, per_listing: int = PREFETCH_PER_LISTING, maxsize: int = PREFETCH_CACHE_SIZE
+    ) -> None:
+        self.per_listing = per_listing
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, ProductDetails] = OrderedDict()
+        self._used: set[str] = set()
+        self._task: asyncio.Task | None = None
+        self._pending: frozenset[str] = frozenset()
+        self.prefetched = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.cancelled = 0
+
+    def schedule(self, product_ids: Sequence[str]) -> None:
+        """Start rendering details for the first products of a listing."""
+        wanted = [pid for pid in product_ids[: self.per_listing] if pid not in self._entries]
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            self.cancelled += 1
+        self._task = None
+        self._pending = frozenset(wanted)
+        if wanted:
+            self._task = asyncio.get_running_loop().create_task(self._prefetch(wanted))
+
+    async def _prefetch(self, product_ids: list[str]) -> None:
+        try:
+            details = await data_access.render_product_details(product_ids)
+        except Exception as e:  # speculative: never let it surface
+            logger.warning(f"Prefetching product details failed: {e}")
+            return
+        for product_id, entry in details.items():
+            self._entries[product_id] = entry
+            self._entries.move_to_end(product_id)
+            self.prefetched += 1
+        while len(self._entries) > self.maxsize:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, product_id: str) -> None:
+        del self._entries[product_id]
+        if product_id not in self._used:
+            self.wasted += 1
+        self._used.discard(product_id)
+
+    async def get(self, product_id: str) -> ProductDetails | None:
+        """Prefetched details for ``product_id``, or None (a miss).
+
+        If the product's prefetch is still running, waits for it: that is
+        never slower than starting the same work from scratch.
+        """
+        task = self._task
+        if task is not None and not task.done() and product_id in self._pending:
+            # Unlike awaiting the task, neither cancels the other
+            await asyncio.wait({task})
+        entry = self._entries.get(product_id)
+        if entry is not None and entry.version != catalog.loaded_version():
+            self._evict(product_id)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(product_id)
+        self._used.add(product_id)
+        self.hits += 1
+        return entry
+
+    async def close(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "prefetched": self.prefetched,
+            "hits": self.hits,
+            "misses": self.misses,
+            "wasted": self.wasted,
+            "cancelled": self.cancelled,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,158 @@
+"""Compact in-memory representation of the product catalog."""
+
+import sys
+from array import array
+from collections.abc import Iterator, Mapping, Sequence
+from types import MappingProxyType
+from typing import Any
+
+from facets import normalize_category, product_category, product_color
+
+_MISSING: Any = object()
+
+# Top-level product fields stored in dedicated slots; anything else a catalog
+# entry carries is kept as (key, value) pairs
+_FIELDS = ("id", "name", "description", "price", "currency", "category", "attributes")
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _freeze(value: Any) -> Any:
+    # Lists become tuples and dicts read-only proxies, so a value handed out
+    # by one record cannot be changed under another caller
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return _intern(value)
+
+
+def _thaw(value: Any) -> Any:
+    # A fresh, mutable copy of a frozen value, as it was in the catalog JSON
+    if type(value) is tuple:
+        return [_thaw(item) for item in value]
+    if type(value) is MappingProxyType:
+        return {key: _thaw(item) for key, item in value.items()}
+    return value
+
+
+class ProductRecord(Mapping[str, Any]):
+    """Read-only, slot-based product that behaves like the original product dict.
+
+    Repeated strings (IDs, categories, currencies, attribute keys and
+    values) are interned, and ``attributes`` is stored as a tuple of pairs.
+    List and dict values (``sizes``, ``keywords``, ...) are stored frozen,
+    and ``record["attributes"]`` and such values are returned as fresh
+    copies, so callers cannot mutate the shared catalog.
+    """
+
+    __slots__ = ("_attributes", "_extra", *_FIELDS[:-1])
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        self.id = _intern(data.get("id", _MISSING))
+        self.name = data.get("name", _MISSING)
+        self.description = data.get("description", _MISSING)
+        self.price = data.get("price", _MISSING)
+        self.currency = _intern(data.get("currency", _MISSING))
+        self.category = _intern(data.get("category", _MISSING))
+
+        attributes = data.get("attributes", _MISSING)
+        if isinstance(attributes, Mapping):
+            self._attributes = tuple(
+                (sys.intern(key), _freeze(value)) for key, value in attributes.items()
+            )
+        else:
+            self._attributes = attributes
+
+        extra = tuple((key, _freeze(value)) for key, value in data.items() if key not in _FIELDS)
+        self._extra = extra or None
+
+    def _value(self, key: str) -> Any:
+        if key == "attributes":
+            if isinstance(self._attributes, tuple):
+                return {key: _thaw(value) for key, value in self._attributes}
+            return self._attributes
+        if key in _FIELDS:
+            return getattr(self, key)
+        if self._extra is not None:
+            for extra_key, value in self._extra:
+                if extra_key == key:
+                    return _thaw(value)
+        return _MISSING
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._value(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._value(key)
+        return default if value is _MISSING else value
+
+    def __iter__(self) -> Iterator[str]:
+        for key in _FIELDS:
+            if self._value(key) is not _MISSING:
+                yield key
+        if self._extra is not None:
+            for key, _ in self._extra:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"ProductRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a plain, independent dict copy of the product."""
+        return dict(self.items())
+
+
+class CatalogColumns:
+    """Array-backed columns for the fields used by filters.
+
+    Category and color are stored as small integer codes into per-snapshot
+    string tables, prices as a double array (exact for whole prices, and
+    fractional ones are kept rather than truncated).
+    """
+
+    def __init__(self, products: Sequence[Mapping[str, Any]]) -> None:
+        self.prices = array("d")
+        self.category_codes = array("I")
+        self.color_codes = array("I")
+        # code -> normalized category key / first label seen / lowercased color
+        self.categories: list[str] = []
+        self.category_labels: list[str] = []
+        self.colors: list[str] = []
+
+        category_lookup: dict[str, int] = {}
+        color_lookup: dict[str, int] = {}
+        for product in products:
+            label = product_category(product)
+            key = normalize_category(label)
+            code = category_lookup.get(key)
+            if code is None:
+                code = category_lookup[key] = len(self.categories)
+                self.categories.append(sys.intern(key))
+                self.category_labels.append(sys.intern(label))
+            self.category_codes.append(code)
+
+            color = product_color(product)
+            code = color_lookup.get(color)
+            if code is None:
+                code = color_lookup[color] = len(self.colors)
+                self.colors.append(sys.intern(color))
+            self.color_codes.append(code)
+
+            self.prices.append(product.get("price") or 0)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+
+def build_records(products: Sequence[Mapping[str, Any]]) -> tuple[ProductRecord, ...]:
+    """Convert parsed catalog dicts into compact product records."""
+    return tuple(ProductRecord(product) for product in products)
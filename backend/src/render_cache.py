@@ -0,0 +1,76 @@
+"""LRU cache for rendered tool responses, tied to the catalog version."""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, TypeVar
+
+# Rendered responses kept per process
+RENDER_CACHE_SIZE = 256
+
+T = TypeVar("T")
+
+
+class RenderCache:
+    """Least-recently-used cache of rendered responses for one catalog version.
+
+    Every lookup names the catalog version it renders from; the first
+    lookup for a newer version drops everything rendered from the old one,
+    so callers never see text for products that changed.
+    """
+
+    def __init__(self, maxsize: int = RENDER_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._version: Hashable = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_render(self, version: Hashable, key: Hashable, render: Callable[[], T]) -> T:
+        """Return the cached response for ``key``, rendering and storing it on a miss."""
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = version
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return response
+            self.misses += 1
+
+        # Render outside the lock; two threads missing on the same key
+        # render it twice, which is harmless
+        response = render()
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = response
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
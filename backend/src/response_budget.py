@@ -0,0 +1,227 @@
+"""Size budgets for tool responses and the chat context sent to the LLM.
+
+Every tool response stays in the chat context and is sent to the LLM again
+on each later turn, so long responses cost prompt tokens, time-to-first-
+token and money for the rest of the conversation. In the default
+"compact" mode (RESPONSE_MODE=compact):
+
+- products are rendered name, ID and price first, with short descriptions
+- each tool's response is cut to a character budget, at a line boundary
+- tool outputs older than the last few are summarized in the context the
+  LLM sees for a turn
+
+RESPONSE_MODE=full restores the untrimmed responses. Either way the sizes
+of responses and of each turn's context are recorded.
+"""
+
+import copy
+import functools
+import logging
+import os
+import threading
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token for English text, for estimates in logs only
+CHARS_PER_TOKEN = 4
+
+# Description length in listings and in product details
+LISTING_DESCRIPTION_CHARS = 80
+DETAIL_DESCRIPTION_CHARS = 200
+
+# Most characters each tool may return; others get DEFAULT_BUDGET
+TOOL_BUDGETS = {
+    "browse_products": 800,
+    "search_products": 800,
+    "next_page": 800,
+    "get_product_details": 500,
+    "add_to_cart": 700,
+    "update_cart_item": 700,
+    "remove_from_cart": 700,
+    "view_cart": 700,
+    "place_order": 700,
+    "checkout": 1000,
+    "view_last_order": 700,
+    "get_order_summary": 1200,
+}
+DEFAULT_BUDGET = 600
+
+# Tool outputs kept verbatim in the context; older ones are summarized
+KEEP_FULL_TOOL_OUTPUTS = 2
+SUMMARY_CHARS = 160
+
+
+@functools.lru_cache(maxsize=1)
+def compact_mode() -> bool:
+    """Whether RESPONSE_MODE selects compact rendering (the default).
+
+    Read once, on first use (after ``.env.local`` has been loaded): every
+    product, order and tool response is formatted through here.
+    ``compact_mode.cache_clear()`` makes the next call read it again.
+    """
+    return os.getenv("RESPONSE_MODE", "compact").strip().lower() != "full"
+
+
+def truncate(text: str, limit: int) -> str:
+    """Cut ``text`` to at most ``limit`` characters at a word boundary."""
+    if len(text) <= limit:
+        return text
+    cut = text[: max(0, limit - 1)]
+    if " " in cut:
+        cut = cut[: cut.rindex(" ")]
+    return cut.rstrip(" ,.;:-") + "…"
+
+
+def fit(text: str, budget: int) -> str:
+    """Keep whole lines of ``text`` within ``budget`` characters.
+
+    Lines come in priority order (headline first), so the tail is what
+    gets dropped; a closing note says how much, so the LLM can offer it.
+    """
+    if len(text) <= budget:
+        return text
+    kept: list[str] = []
+    size = 0
+    lines = text.splitlines()
+    for line in lines:
+        if size + len(line) + 1 > budget - 40:
+            break
+        kept.append(line)
+        size += len(line) + 1
+    if not kept:
+        return truncate(text, budget)
+    omitted = sum(1 for line in lines[len(kept) :] if line.strip())
+    return "\n".join(kept).rstrip() + f"\n(…{omitted} more lines not shown)"
+
+
+def summarize_tool_output(text: str, limit: int = SUMMARY_CHARS) -> str:
+    """Short stand-in for an older tool output in the chat context."""
+    if len(text) <= limit:
+        return text
+    flat = " ".join(line.strip() for line in text.splitlines() if line.strip())
+    return f"[earlier result, summarized] {truncate(flat, limit)}"
+
+
+class SizeStats:
+    """Count, total and largest size of one kind of rendered text."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, chars: int) -> None:
+        self.count += 1
+        self.total += chars
+        self.max = max(self.max, chars)
+
+    def stats(self) -> dict[str, Any]:
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean_chars": round(mean, 1),
+            "max_chars": self.max,
+            "mean_tokens": round(mean / CHARS_PER_TOKEN, 1),
+        }
+
+
+class ResponseSizes:
+    """Sizes of tool responses as sent, characters trimmed, and context size per turn."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.tools: dict[str, SizeStats] = {}
+        self.prompt = SizeStats()
+        self.trimmed_chars = 0
+        self.summarized_chars = 0
+
+    def record_tool(self, tool: str, rendered: int, sent: int) -> None:
+        with self._lock:
+            self.tools.setdefault(tool, SizeStats()).record(sent)
+            self.trimmed_chars += rendered - sent
+
+    def record_turn(self, prompt_chars: int, summarized: int) -> None:
+        with self._lock:
+            self.prompt.record(prompt_chars)
+            self.summarized_chars += summarized
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "tools": {tool: s.stats() for tool, s in sorted(self.tools.items())},
+                "prompt": self.prompt.stats(),
+                "trimmed_chars": self.trimmed_chars,
+                "summarized_chars": self.summarized_chars,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self.tools.clear()
+            self.prompt = SizeStats()
+            self.trimmed_chars = self.summarized_chars = 0
+
+
+# Process-wide sizes, logged with the other usage stats at shutdown
+response_sizes = ResponseSizes()
+
+
+def budgeted(func: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """Decorator fitting a tool's response to its budget and recording its size.
+
+    The tool is named after the function; like ``LatencyRecorder.time_async``
+    the wrapper keeps the signature, so it can sit under ``@function_tool()``.
+    """
+    tool = func.__name__
+    budget = TOOL_BUDGETS.get(tool, DEFAULT_BUDGET)
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> str:
+        text = await func(*args, **kwargs)
+        sent = fit(text, budget) if compact_mode() else text
+        response_sizes.record_tool(tool, len(text), len(sent))
+        return sent
+
+    return wrapper
+
+
+def _item_chars(item: Any) -> int:
+    kind = getattr(item, "type", None)
+    if kind == "function_call_output":
+        return len(getattr(item, "output", "") or "")
+    if kind == "function_call":
+        return len(getattr(item, "name", "") or "") + len(getattr(item, "arguments", "") or "")
+    content = getattr(item, "content", None)
+    if isinstance(content, str):
+        return len(content)
+    if isinstance(content, Iterable):
+        return sum(len(part) for part in content if isinstance(part, str))
+    return 0
+
+
+def compact_context(
+    items: list[Any], keep_last: int = KEEP_FULL_TOOL_OUTPUTS
+) -> tuple[int, int]:
+    """Summarize all but the last ``keep_last`` tool outputs in ``items``.
+
+    Works on a turn's copy of the chat context: summarized outputs are
+    replaced by copies, so the agent's own history keeps the originals.
+
+    Returns:
+        (characters of the context afterwards, characters saved)
+    """
+    outputs = [
+        i for i, item in enumerate(items) if getattr(item, "type", None) == "function_call_output"
+    ]
+    saved = 0
+    if compact_mode():
+        for i in outputs[: max(0, len(outputs) - keep_last)]:
+            output = items[i].output or ""
+            summary = summarize_tool_output(output)
+            if len(summary) < len(output):
+                item = copy.copy(items[i])
+                item.output = summary
+                items[i] = item
+                saved += len(output) - len(summary)
+    return sum(_item_chars(item) for item in items), saved
@@ -0,0 +1,330 @@
+"""Inverted index for ranked full-text product search."""
+
+import heapq
+import math
+import re
+from bisect import bisect_left
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any
+
+# Relative importance of a term hit in each product field (BM25F weights)
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "category": 2.0,
+    "description": 1.0,
+    "attributes": 0.5,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# A query term that is not in the vocabulary is expanded to at most this many
+# vocabulary terms it is a prefix of ("hood" -> "hoody", "hooded", ...)
+MAX_PREFIX_EXPANSIONS = 20
+MIN_PREFIX_LENGTH = 3
+
+# Dropped from queries (never from documents) so "a gift for a coffee lover"
+# still requires the meaningful words to match
+STOPWORDS = frozenset(
+    {
+        "a", "an", "and", "any", "for", "i", "in", "is", "me", "my", "of",
+        "on", "or", "please", "show", "some", "something", "the", "to",
+        "want", "with",
+    }
+)
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+def normalize_term(token: str) -> str:
+    """Fold simple plural and spelling variants onto one term.
+
+    "mugs" -> "mug", "accessories" -> "accessory", "hoodie"/"hoodies" -> "hoody".
+    The same rules run on documents and queries, so they only need to be
+    consistent, not linguistically correct.
+    """
+    if len(token) > 4 and token.endswith("ies"):
+        token = token[:-3] + "y"
+    elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        token = token[:-1]
+    if len(token) > 4 and token.endswith("ie"):
+        token = token[:-2] + "y"
+    return token
+
+
+@lru_cache(maxsize=65536)
+def _word_terms(word: str) -> tuple[str, ...]:
+    # Catalogs repeat a small vocabulary, so most words are normalized once
+    parts = word.split("-")
+    if len(parts) == 1:
+        return (normalize_term(word),)
+    return (*(normalize_term(part) for part in parts), normalize_term("".join(parts)))
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into normalized terms.
+
+    Hyphenated words are indexed both as their parts and joined, so
+    "T-Shirt" matches "t shirt", "t-shirt" and "tshirt".
+    """
+    terms: list[str] = []
+    for word in _WORD_RE.findall(text.lower()):
+        terms.extend(_word_terms(word))
+    return terms
+
+
+def _field_text(product: dict[str, Any], field: str) -> str:
+    if field == "attributes":
+        values = []
+        for value in (product.get("attributes") or {}).values():
+            if isinstance(value, str):
+                values.append(value)
+        return " ".join(values)
+    return str(product.get(field) or "")
+
+
+class SearchIndex:
+    """Term -> postings index over a fixed tuple of products.
+
+    Field-weighted, length-normalised term frequencies (BM25F) are folded
+    into a single impact per (term, product) at build time, so a query only
+    touches the postings of its own terms and never scans the catalog.
+    """
+
+    def __init__(self, products: Sequence[dict[str, Any]]) -> None:
+        self._size = len(products)
+
+        field_terms: dict[str, list[list[str]]] = {}
+        avg_length: dict[str, float] = {}
+        for field in FIELD_WEIGHTS:
+            terms = [tokenize(_field_text(product, field)) for product in products]
+            field_terms[field] = terms
+            total = sum(len(doc_terms) for doc_terms in terms)
+            avg_length[field] = total / len(terms) if terms and total else 1.0
+
+        weighted_tf: dict[str, dict[int, float]] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            scale = BM25_B / avg_length[field]
+            for doc, doc_terms in enumerate(field_terms[field]):
+                if not doc_terms:
+                    continue
+                doc_weight = weight / (1 - BM25_B + scale * len(doc_terms))
+                for term in doc_terms:
+                    postings = weighted_tf.get(term)
+                    if postings is None:
+                        postings = weighted_tf[term] = {}
+                    postings[doc] = postings.get(doc, 0.0) + doc_weight
+
+        # Precompute idf * saturated tf so scoring is a sum of lookups
+        self._postings: dict[str, dict[int, float]] = {}
+        for term, postings in weighted_tf.items():
+            df = len(postings)
+            idf = math.log(1 + (self._size - df + 0.5) / (df + 0.5))
+            self._postings[term] = {
+                doc: idf * tf * (BM25_K1 + 1) / (tf + BM25_K1)
+                for doc, tf in postings.items()
+            }
+        self._vocabulary = sorted(self._postings)
+        # term -> its postings' docs ordered by impact (highest first), built
+        # on first use by top_k
+        self._impact_orders: dict[str, tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vocabulary(self) -> Sequence[str]:
+        """Sorted list of every indexed term."""
+        return self._vocabulary
+
+    def _expand_prefix(self, term: str) -> dict[int, float]:
+        if len(term) < MIN_PREFIX_LENGTH:
+            return {}
+        merged: dict[int, float] = {}
+        start = bisect_left(self._vocabulary, term)
+        end = min(start + MAX_PREFIX_EXPANSIONS, len(self._vocabulary))
+        for candidate in self._vocabulary[start:end]:
+            if not candidate.startswith(term):
+                break
+            for doc, impact in self._postings[candidate].items():
+                if impact > merged.get(doc, 0.0):
+                    merged[doc] = impact
+        return merged
+
+    def _term_postings(self, term: str) -> dict[int, float]:
+        postings = self._postings.get(term)
+        if postings is None:
+            postings = self._expand_prefix(term)
+        return postings
+
+    def query_terms(self, query: str) -> list[str]:
+        """Return the de-duplicated terms a query is matched on."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        meaningful = [term for term in terms if term not in STOPWORDS]
+        return meaningful or terms
+
+    def score(self, query: str, match_all: bool = True) -> dict[int, float]:
+        """Score every product matching the query.
+
+        Args:
+            query: Free-text query
+            match_all: Require every query term (AND); otherwise any term (OR)
+
+        Returns:
+            Dict mapping product position to BM25F score
+        """
+        term_postings = [self._term_postings(term) for term in self.query_terms(query)]
+        if not term_postings:
+            return {}
+
+        if match_all:
+            if not all(term_postings):
+                return {}
+            # Intersect starting from the rarest term to keep the candidate set small
+            term_postings.sort(key=len)
+            scores = dict(term_postings[0])
+            for postings in term_postings[1:]:
+                scores = {
+                    doc: score + postings[doc]
+                    for doc, score in scores.items()
+                    if doc in postings
+                }
+                if not scores:
+                    break
+            return scores
+
+        merged: dict[int, float] = {}
+        for postings in term_postings:
+            for doc, impact in postings.items():
+                merged[doc] = merged.get(doc, 0.0) + impact
+        return merged
+
+    def search(self, query: str, match_all: bool = True) -> list[int]:
+        """Return matching product positions, best match first."""
+        scores = self.score(query, match_all=match_all)
+        return sorted(scores, key=lambda doc: (-scores[doc], doc))
+
+    def _impact_order(self, term: str, postings: dict[int, float]) -> Sequence[int]:
+        order = self._impact_orders.get(term)
+        if order is None:
+            order = tuple(sorted(postings, key=lambda doc: (-postings[doc], doc)))
+            if term in self._postings:
+                # Prefix expansions are not cached; their merged postings
+                # are rebuilt per query anyway
+                self._impact_orders[term] = order
+        return order
+
+    def top_k(self, query: str, k: int, match_all: bool = True) -> list[int]:
+        """Return the ``k`` best matching positions, best match first.
+
+        Same result as ``search(query, match_all)[:k]``, but computed with
+        the threshold algorithm: each term's postings are walked in impact
+        order, in step, and every product met is scored in full into a
+        k-sized heap. The walk stops once no product that has not been met
+        yet could still beat the k-th best, so the work depends on ``k``
+        and on how clearly the best matches stand out, not on how many
+        products match.
+        """
+        return [doc for doc, _ in self.top_k_scored(query, k, match_all)]
+
+    def top_k_scored(
+        self,
+        query: str,
+        k: int,
+        match_all: bool = True,
+        after: tuple[float, int] | None = None,
+    ) -> list[tuple[int, float]]:
+        """Like ``top_k``, with scores, optionally continuing a ranking.
+
+        With ``after=(score, position)`` of the last product already
+        returned, returns the ``k`` products ranked right after it. Every
+        impact is positive, so a product ranked after it has no impact above
+        ``score`` in any term (and only a higher position at an impact equal
+        to it): each term's walk starts there instead of at the top, and a
+        page deep in the ranking costs about as much as the first one.
+        """
+        if k <= 0:
+            return []
+        terms = [(term, self._term_postings(term)) for term in self.query_terms(query)]
+        if not terms or (match_all and not all(postings for _, postings in terms)):
+            return []
+        if match_all:
+            # Add up scores in the same order as score(), so equal inputs
+            # give bit-identical scores and the same tie-breaks
+            terms.sort(key=lambda item: len(item[1]))
+        term_postings = [postings for _, postings in terms]
+        orders = [self._impact_order(term, postings) for term, postings in terms]
+        if after is None:
+            starts = [0] * len(orders)
+        else:
+            starts = [
+                _first_after(order, postings, after)
+                for order, postings in zip(orders, term_postings)
+            ]
+
+        # Min-heap of the best k as (score, -doc): the root is the entry the
+        # next better match replaces
+        heap: list[tuple[float, int]] = []
+        seen: set[int] = set()
+        depth = 0
+        longest = max(len(order) - start for order, start in zip(orders, starts))
+        while depth < longest:
+            for order, start in zip(orders, starts):
+                if start + depth >= len(order):
+                    continue
+                doc = order[start + depth]
+                if doc in seen:
+                    continue
+                seen.add(doc)
+                if match_all:
+                    if not all(doc in postings for postings in term_postings):
+                        continue
+                    score = sum(postings[doc] for postings in term_postings)
+                else:
+                    score = sum(postings.get(doc, 0.0) for postings in term_postings)
+                if after is not None and (-score, doc) <= (-after[0], after[1]):
+                    continue  # at or before the product the ranking continues from
+                entry = (score, -doc)
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+            depth += 1
+
+            # Best score any product not met yet could have: it sits at or
+            # below the current depth of every list it appears in
+            if match_all:
+                if any(start + depth >= len(order) for order, start in zip(orders, starts)):
+                    break  # an exhausted term list leaves nothing new to match
+                bound = sum(
+                    postings[order[start + depth]]
+                    for postings, order, start in zip(term_postings, orders, starts)
+                )
+            else:
+                bound = sum(
+                    postings[order[start + depth]]
+                    for postings, order, start in zip(term_postings, orders, starts)
+                    if start + depth < len(order)
+                )
+            # Strictly greater: an unseen product with an equal score and a
+            # lower position would still rank ahead
+            if len(heap) == k and heap[0][0] > bound:
+                break
+
+        return [(-doc, score) for score, doc in sorted(heap, reverse=True)]
+
+
+def _first_after(
+    order: Sequence[int], postings: dict[int, float], after: tuple[float, int]
+) -> int:
+    # ``order`` is sorted by (-impact, position), like the ranking itself
+    score, position = after
+    low, high = 0, len(order)
+    while low < high:
+        mid = (low + high) // 2
+        if (-postings[order[mid]], order[mid]) <= (-score, position):
+            low = mid + 1
+        else:
+            high = mid
+    return low
@@ -0,0 +1,238 @@
+"""Hashed TF-IDF product vectors for semantic fallback search.
+
+Every product is turned into a fixed-size, L2-normalised vector: its words,
+their character trigrams and its optional ``keywords`` (words shoppers use
+for it that its text does not contain, kept with the catalog data) are
+hashed into ``VECTOR_DIM`` buckets and weighted by inverse document
+frequency. A query is vectorised the same way and matched with one
+matrix-vector product, so "something warm for winter" can still find a
+hoodie whose keywords say "warm" and "winter" when no searchable field
+does. Everything runs locally; no model download, network or GPU.
+
+Needs NumPy (the optional ``semantic`` extra; without it semantic search
+is disabled). Vectors are computed offline and stored next to the catalog
+with::
+
+    uv run src/semantic_index.py build
+
+When that file is missing or stale they are computed on first use instead.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import zlib
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: semantic search is disabled
+    np = None
+
+from search_index import FIELD_WEIGHTS, STOPWORDS, _field_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+VECTOR_DIM = 256
+FORMAT_VERSION = 2
+
+# Character trigrams let "hoody"/"hooded" or "bottles"/"bottle" share most
+# of their weight; they count less than whole words
+TRIGRAM_WEIGHT = 0.3
+
+# Products scoring below this cosine similarity are not returned
+MIN_SIMILARITY = 0.1
+
+# Weight of a product's ``keywords``: curated, so they count like its category
+KEYWORD_WEIGHT = 2.0
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+@lru_cache(maxsize=65536)
+def _hashed(feature: str) -> tuple[int, float]:
+    # Stable across processes (unlike hash()); the sign bit spreads collisions
+    # around zero instead of letting them pile up
+    value = zlib.crc32(feature.encode())
+    return value % VECTOR_DIM, 1.0 if value & 0x80000000 else -1.0
+
+
+@lru_cache(maxsize=65536)
+def _term_features(term: str) -> tuple[tuple[int, float], ...]:
+    """Hashed (bucket, signed weight) features of one normalised term."""
+    features = [_hashed(f"w:{term}")]
+    padded = f"#{term}#"
+    for i in range(len(padded) - 2):
+        bucket, sign = _hashed(f"c:{padded[i : i + 3]}")
+        features.append((bucket, sign * TRIGRAM_WEIGHT))
+    return tuple(features)
+
+
+def _accumulate(
+    counts: dict[int, float], terms: Sequence[str], weight: float, trigrams: bool = True
+) -> None:
+    for term in terms:
+        features = _term_features(term) if trigrams else _term_features(term)[:1]
+        for bucket, value in features:
+            counts[bucket] = counts.get(bucket, 0.0) + weight * value
+
+
+def _product_counts(product: Any) -> dict[int, float]:
+    counts: dict[int, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        _accumulate(counts, tokenize(_field_text(product, field)), weight)
+    keywords = product.get("keywords")
+    if isinstance(keywords, (list, tuple)):
+        terms = [term for keyword in keywords for term in tokenize(str(keyword))]
+        # Whole words only: their spelling says nothing about the product
+        _accumulate(counts, terms, KEYWORD_WEIGHT, trigrams=False)
+    return counts
+
+
+def _query_counts(query: str) -> dict[int, float]:
+    terms = tokenize(query)
+    meaningful = [term for term in terms if term not in STOPWORDS] or terms
+    counts: dict[int, float] = {}
+    _accumulate(counts, meaningful, 1.0)
+    return counts
+
+
+def catalog_hash(raw: bytes) -> str:
+    """Digest of the catalog JSON, matching the catalog snapshot's content hash."""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class SemanticIndex:
+    """Product vectors stored bucket-major, plus per-bucket IDF weights.
+
+    ``vectors`` is a ``(VECTOR_DIM, products)`` ``float32`` matrix whose
+    columns are the L2-normalised product vectors. A query only has weight
+    in a few dozen buckets, so scoring multiplies just those rows (each
+    contiguous) instead of streaming the whole matrix through memory.
+    """
+
+    def __init__(self, vectors: "np.ndarray", idf: "np.ndarray") -> None:
+        if np is None:
+            raise RuntimeError("Semantic search needs NumPy: install the 'semantic' extra")
+        self.vectors = vectors
+        self.idf = idf
+
+    def __len__(self) -> int:
+        return self.vectors.shape[1]
+
+    @classmethod
+    def build(cls, products: Sequence[Any]) -> "SemanticIndex":
+        """Vectorise every product (the offline step; linear in catalog text)."""
+        if np is None:
+            raise RuntimeError("Semantic search needs NumPy: install the 'semantic' extra")
+        matrix = np.zeros((len(products), VECTOR_DIM), dtype=np.float32)
+        df = np.zeros(VECTOR_DIM, dtype=np.float64)
+        for row, product in enumerate(products):
+            counts = _product_counts(product)
+            if counts:
+                buckets = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+                matrix[row, buckets] = np.fromiter(counts.values(), dtype=np.float32)
+                df[buckets] += 1
+        idf = (np.log((1 + len(products)) / (1 + df)) + 1).astype(np.float32)
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return cls(np.ascontiguousarray(matrix.T), idf)
+
+    def save(self, path: Path, source_hash: str) -> None:
+        """Store the vectors with the hash of the catalog they were built from."""
+        tmp_path = path.with_name(f"{path.name}.tmp.npz")
+        meta = {"version": FORMAT_VERSION, "dim": VECTOR_DIM, "source": source_hash}
+        np.savez(tmp_path, vectors=self.vectors, idf=self.idf, meta=np.array(json.dumps(meta)))
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, source_hash: str) -> "SemanticIndex | None":
+        """Load stored vectors, or None if missing, unreadable or stale."""
+        if np is None:
+            return None
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta != {"version": FORMAT_VERSION, "dim": VECTOR_DIM, "source": source_hash}:
+                    return None
+                return cls(data["vectors"], data["idf"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring product vectors {path}: {e}")
+            return None
+
+    def vectorize(self, queries: Sequence[str]) -> "np.ndarray":
+        """Normalised query vectors, one row per query."""
+        vectors = np.zeros((len(queries), VECTOR_DIM), dtype=np.float32)
+        for row, query in enumerate(queries):
+            counts = _query_counts(query)
+            if counts:
+                buckets = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+                vectors[row, buckets] = np.fromiter(counts.values(), dtype=np.float32)
+        vectors *= self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def search_batch(
+        self, queries: Sequence[str], k: int = 5, min_similarity: float = MIN_SIMILARITY
+    ) -> list[list[int]]:
+        """Top ``k`` product positions for each query, most similar first.
+
+        All queries are scored with a single matrix product over the buckets
+        any of them uses; the best ``k`` per query are picked with
+        ``argpartition`` and only those are sorted.
+        """
+        if not len(self) or k <= 0:
+            return [[] for _ in queries]
+        query_vectors = self.vectorize(queries)
+        buckets = np.flatnonzero(query_vectors.any(axis=0))
+        if not len(buckets):
+            return [[] for _ in queries]
+        scores = query_vectors[:, buckets] @ self.vectors[buckets]
+        k = min(k, scores.shape[1])
+        results = []
+        for row in scores:
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.lexsort((top, -row[top]))]
+            results.append([int(i) for i in top if row[i] >= min_similarity])
+        return results
+
+    def search(self, query: str, k: int = 5, min_similarity: float = MIN_SIMILARITY) -> list[int]:
+        """Top ``k`` product positions for one query, most similar first."""
+        return self.search_batch([query], k, min_similarity)[0]
+
+
+def vectors_path(catalog_file: Path) -> Path:
+    """Where the vectors for a catalog file are stored."""
+    return catalog_file.with_suffix(".vectors.npz")
+
+
+def main() -> None:
+    from catalog import CATALOG_FILE
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    builder = sub.add_parser("build", help="compute and store vectors for the catalog")
+    builder.add_argument("--products", type=Path, default=CATALOG_FILE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    raw = args.products.read_bytes()
+    products = json.loads(raw).get("products", [])
+    index = SemanticIndex.build(products)
+    path = vectors_path(args.products)
+    index.save(path, catalog_hash(raw))
+    print(f"Stored {len(index)} product vectors ({VECTOR_DIM} dims) in {path}")
+
+
+if __name__ == "__main__":
+    main()
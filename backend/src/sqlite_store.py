@@ -0,0 +1,327 @@
+"""Optional SQLite storage backend for the catalog and orders.
+
+Enabled with ``STORAGE_BACKEND=sqlite``; the database lives at
+``SQLITE_DB_PATH`` (default ``data/store.db``). Populate it once from the
+JSON files with::
+
+    uv run src/sqlite_store.py import
+
+``SQLITE_SYNCHRONOUS`` sets how hard a commit waits for the disk: ``FULL``
+(default) syncs the WAL on every commit, so an acknowledged order survives
+a power loss. ``NORMAL`` only syncs at checkpoints: faster, and the
+database stays consistent, but the last acknowledged orders can be lost
+after a power loss or OS crash (not after a crash of the agent alone).
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from facets import normalize_category, product_category, product_color
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+DEFAULT_DB_FILE = DATA_DIR / "store.db"
+POOL_SIZE = 4
+SYNCHRONOUS_MODES = ("FULL", "NORMAL")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    price INTEGER NOT NULL,
+    category_key TEXT NOT NULL,
+    color TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_category_price ON products (category_key, price);
+CREATE INDEX IF NOT EXISTS products_price ON products (price);
+CREATE INDEX IF NOT EXISTS products_color ON products (color);
+CREATE INDEX IF NOT EXISTS products_position ON products (position);
+CREATE TABLE IF NOT EXISTS orders (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_id ON orders (id);
+"""
+
+
+def sqlite_enabled() -> bool:
+    """Whether STORAGE_BACKEND selects SQLite (read on every call, after dotenv)."""
+    return os.getenv("STORAGE_BACKEND", "json").strip().lower() == "sqlite"
+
+
+def _product_row(position: int, product: Mapping[str, Any]) -> tuple:
+    return (
+        product.get("id"),
+        position,
+        product.get("price", 0),
+        normalize_category(product_category(product)),
+        product_color(product),
+        json.dumps(dict(product), ensure_ascii=False),
+    )
+
+
+class SQLiteStore:
+    """Pooled connections to one SQLite database in WAL mode.
+
+    WAL lets any number of readers run alongside the single writer, so
+    concurrent sessions only serialize on order inserts.
+    """
+
+    def __init__(self, path: Path, pool_size: int = POOL_SIZE, synchronous: str = "FULL") -> None:
+        synchronous = synchronous.upper()
+        if synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Unknown synchronous mode: {synchronous}")
+        self.path = path
+        self.synchronous = synchronous
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._pool_size = pool_size
+        self._create_lock = threading.Lock()
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection; blocks when all ``pool_size`` are in use."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._create_lock:
+                create = self._created < self._pool_size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+    # Catalog
+
+    def catalog_revision(self) -> int:
+        """Counter bumped on every catalog import, used to invalidate snapshots."""
+        with self.connection() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'catalog_revision'").fetchone()
+        return int(row[0]) if row else 0
+
+    def replace_products(self, products: Sequence[Mapping[str, Any]]) -> None:
+        rows = [_product_row(position, product) for position, product in enumerate(products)]
+        with self.connection() as conn, conn:
+            conn.execute("DELETE FROM products")
+            conn.executemany("INSERT OR IGNORE INTO products VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.execute(
+                "INSERT INTO meta VALUES ('catalog_revision', '1') ON CONFLICT(key) "
+                "DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+
+    def all_products(self) -> list[dict[str, Any]]:
+        with self.connection() as conn:
+            rows = conn.execute("SELECT data FROM products ORDER BY position").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def get_product(self, product_id: str) -> dict[str, Any] | None:
+        with self.connection() as conn:
+            row = conn.execute("SELECT data FROM products WHERE id = ?", (product_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_products(self, product_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        ids = list(dict.fromkeys(i for i in product_ids if i is not None))
+        if not ids:
+            return {}
+        placeholders = ", ".join("?" * len(ids))
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT id, data FROM products WHERE id IN ({placeholders})", ids
+            ).fetchall()
+        return {product_id: json.loads(data) for product_id, data in rows}
+
+    def list_products(
+        self,
+        category: str | None = None,
+        color: str | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+    ) -> list[dict[str, Any]]:
+        rows = self.page_products(category, color, min_price, max_price)
+        return [product for _, product in rows]
+
+    def page_products(
+        self,
+        category: str | None = None,
+        color: str | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        after: int = -1,
+        limit: int | None = None,
+    ) -> list[tuple[int, dict[str, Any]]]:
+        """Matching (catalog position, product) pairs after position ``after``."""
+        clauses = ["position > ?"]
+        params: list[Any] = [after]
+        if category:
+            clauses.append("category_key = ?")
+            params.append(normalize_category(category))
+        if min_price is not None:
+            clauses.append("price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("price <= ?")
+            params.append(max_price)
+        if color:
+            clauses.append("instr(color, ?) > 0")
+            params.append(color.lower())
+        sql = f"SELECT position, data FROM products WHERE {' AND '.join(clauses)} ORDER BY position"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [(position, json.loads(data)) for position, data in rows]
+
+    # Orders
+
+    def insert_order(self, order: dict[str, Any]) -> None:
+        self.insert_orders([order])
+
+    def insert_orders(self, orders: Sequence[dict[str, Any]]) -> None:
+        """Insert several orders in one transaction (one commit, one sync)."""
+        with self.connection() as conn, conn:
+            conn.executemany(
+                "INSERT INTO orders (id, created_at, data) VALUES (?, ?, ?)",
+                [
+                    (order.get("id"), order.get("created_at"), json.dumps(order, ensure_ascii=False))
+                    for order in orders
+                ],
+            )
+
+    def replace_orders(self, orders: Sequence[dict[str, Any]]) -> None:
+        with self.connection() as conn, conn:
+            conn.execute("DELETE FROM orders")
+            conn.executemany(
+                "INSERT INTO orders (id, created_at, data) VALUES (?, ?, ?)",
+                [
+                    (order.get("id"), order.get("created_at"), json.dumps(order, ensure_ascii=False))
+                    for order in orders
+                ],
+            )
+
+    def get_order(self, order_id: str) -> dict[str, Any] | None:
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT data FROM orders WHERE id = ? ORDER BY seq LIMIT 1", (order_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def last_order(self) -> dict[str, Any] | None:
+        with self.connection() as conn:
+            row = conn.execute("SELECT data FROM orders ORDER BY seq DESC LIMIT 1").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_orders(self) -> list[dict[str, Any]]:
+        with self.connection() as conn:
+            rows = conn.execute("SELECT data FROM orders ORDER BY seq").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+
+_store: SQLiteStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SQLiteStore:
+    """Return the process-wide store for SQLITE_DB_PATH and SQLITE_SYNCHRONOUS."""
+    global _store
+    path = Path(os.getenv("SQLITE_DB_PATH", str(DEFAULT_DB_FILE)))
+    store = _store
+    if store is not None and store.path == path:
+        return store
+    with _store_lock:
+        if _store is None or _store.path != path:
+            if _store is not None:
+                _store.close()
+            _store = SQLiteStore(path, synchronous=os.getenv("SQLITE_SYNCHRONOUS", "FULL"))
+        return _store
+
+
+def close_store() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+
+
+def import_json(products_file: Path, orders_file: Path, store: SQLiteStore) -> tuple[int, int]:
+    """Load the JSON catalog and order history (including the journal) into ``store``.
+
+    Returns:
+        Number of products and orders imported
+    """
+    from order_journal import OrderJournal
+
+    with open(products_file, encoding="utf-8") as f:
+        products = json.load(f).get("products", [])
+    store.replace_products(products)
+
+    journal = OrderJournal(orders_file)
+    try:
+        orders = list(journal.orders)
+    finally:
+        journal.close()
+    store.replace_orders(orders)
+
+    logger.info(f"Imported {len(products)} products and {len(orders)} orders into {store.path}")
+    return len(products), len(orders)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    importer = sub.add_parser("import", help="import the JSON catalog and orders")
+    importer.add_argument("--products", type=Path, default=DATA_DIR / "products.json")
+    importer.add_argument("--orders", type=Path, default=DATA_DIR / "orders.json")
+    importer.add_argument(
+        "--db", type=Path, default=Path(os.getenv("SQLITE_DB_PATH", str(DEFAULT_DB_FILE)))
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    store = SQLiteStore(args.db)
+    try:
+        products, orders = import_json(args.products, args.orders, store)
+    finally:
+        store.close()
+    print(f"Imported {products} products and {orders} orders into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
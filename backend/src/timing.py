@@ -0,0 +1,182 @@
+"""Wall-clock timing: startup phases and per-operation latency histograms."""
+
+import bisect
+import functools
+import logging
+import math
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class PhaseTimer:
+    """Record how long each named phase of a startup sequence takes.
+
+    Usage::
+
+        timer = PhaseTimer("prewarm")
+        with timer.phase("vad"):
+            ...
+        timer.log(logger)  # prewarm: vad=120.3ms total=120.4ms
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.phases: dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter() - started) * 1000
+
+    @property
+    def total_ms(self) -> float:
+        """Milliseconds since the timer was created."""
+        return (time.perf_counter() - self._started) * 1000
+
+    def summary(self) -> str:
+        phases = " ".join(f"{name}={ms:.1f}ms" for name, ms in self.phases.items())
+        return f"{self.name}: {phases} total={self.total_ms:.1f}ms"
+
+    def log(self, logger: logging.Logger) -> None:
+        logger.info(self.summary())
+
+
+# Histogram bucket upper bounds in milliseconds: 0.01ms to ~2min, each 20%
+# wider than the last, so a percentile is off by at most that much
+BUCKET_GROWTH = 1.2
+BUCKET_BOUNDS = tuple(
+    0.01 * BUCKET_GROWTH**i for i in range(int(math.log(1.2e7, BUCKET_GROWTH)) + 1)
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds).
+
+    Recording is a bisect and a few additions, and memory does not grow
+    with the number of samples, so it can stay on in production.
+    Percentiles are reported as the upper bound of the bucket they fall in,
+    clamped to the largest sample seen.
+    """
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms: float) -> None:
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p: float) -> float:
+        """Latency below which ``p`` percent of samples fall (0 when empty)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(BUCKET_BOUNDS[i], self.max) if i < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(self.max, 2),
+            "mean_ms": round(self.total / self.count, 2) if self.count else 0.0,
+        }
+
+
+class LatencyRecorder:
+    """Named latency histograms, safe to record into from any thread.
+
+    Names are dotted by layer, e.g. ``tool.search_products``,
+    ``catalog.format`` or ``orders.persist``.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._updated: set[str] = set()
+
+    def record(self, name: str, ms: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.record(ms)
+            self._updated.add(name)
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        """Record the duration of the ``with`` block under ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    def time_async(
+        self, name: str
+    ) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+        """Decorator recording every call of a coroutine function under ``name``.
+
+        The wrapper keeps the function's signature and docstring, so it can
+        sit under ``@function_tool()``.
+        """
+
+        def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> T:
+                with self.time(name):
+                    return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def stats(self, names: set[str] | None = None) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                name: histogram.stats()
+                for name, histogram in sorted(self._histograms.items())
+                if names is None or name in names
+            }
+
+    def log(self, logger: logging.Logger, updated_only: bool = False) -> None:
+        """Log one line per histogram.
+
+        Args:
+            updated_only: Only histograms recorded into since the last call
+                that passed it, so periodic logging skips idle ones
+        """
+        with self._lock:
+            names = set(self._updated) if updated_only else None
+            self._updated.clear()
+        for name, stats in self.stats(names).items():
+            logger.info(f"Latency {name}: {stats}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._updated.clear()
+
+
+# Process-wide recorder for tool calls and the catalog/order work under them
+latency = LatencyRecorder()
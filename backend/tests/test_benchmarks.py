@@ -0,0 +1,333 @@
+"""Offline benchmarks for the catalog and order hot paths.
+
+Every benchmark runs against synthetic catalogs and order histories
+generated here, so nothing needs the network or a model. They are slow
+and machine-dependent, so they only run when asked for::
+
+    RUN_BENCHMARKS=1 uv run pytest tests/test_benchmarks.py -s
+
+Each benchmark reports its median time per call, throughput and peak
+allocated memory, and fails if it is more than BENCHMARK_TOLERANCE times
+slower (or hungrier) than the stored baseline in benchmark_baseline.json.
+
+    BENCHMARK_SIZES       catalog sizes to run (default 1000,10000,100000)
+    BENCHMARK_TOLERANCE   allowed slowdown factor (default 2.0)
+    BENCHMARK_UPDATE=1    store this run's results as the new baseline
+"""
+
+import itertools
+import json
+import os
+import random
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import catalog
+import orders
+from group_commit import GroupCommitQueue
+from order_journal import OrderJournal, write_snapshot
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("RUN_BENCHMARKS") != "1", reason="benchmarks run with RUN_BENCHMARKS=1"
+)
+
+BASELINE_FILE = Path(__file__).parent / "benchmark_baseline.json"
+SIZES = [int(n) for n in os.getenv("BENCHMARK_SIZES", "1000,10000,100000").split(",")]
+TOLERANCE = float(os.getenv("BENCHMARK_TOLERANCE", "2.0"))
+UPDATE_BASELINE = os.getenv("BENCHMARK_UPDATE") == "1"
+
+# Time spent measuring each benchmark, after one warm-up call
+MIN_TIME = 0.2
+MIN_ROUNDS = 3
+# Peak memory below this is noise (allocator and tracemalloc overhead)
+MIN_TRACKED_KIB = 64
+
+# category: (product names, colors)
+CATEGORIES = {
+    "mug": (
+        ["Ceramic Coffee Mug", "Travel Mug", "Espresso Cup"],
+        ["white", "black", "silver"],
+    ),
+    "tshirt": (
+        ["Cotton T-Shirt", "Graphic Tee", "V-Neck Shirt"],
+        ["white", "black", "navy blue"],
+    ),
+    "hoodie": (
+        ["Fleece Hoodie", "Zip Hoodie", "Pullover Sweatshirt"],
+        ["grey", "black", "beige"],
+    ),
+    "accessory": (
+        ["Canvas Tote Bag", "Water Bottle", "Baseball Cap"],
+        ["beige", "transparent", "black"],
+    ),
+}
+ADJECTIVES = [
+    "Premium", "Classic", "Trendy", "Eco", "Deluxe", "Vintage",
+    "Modern", "Sporty", "Urban", "Cozy", "Rugged",
+]
+DESCRIPTIONS = [
+    "Classic everyday essential made to last",
+    "Comfortable fleece lining keeps you warm in winter",
+    "Insulated steel keeps drinks hot for hours",
+    "Soft breathable cotton for summer days",
+    "Eco-friendly reusable design for shopping and travel",
+]
+
+FILTER_VALUES = {"category": "hoodie", "color": "black", "min_price": 500, "max_price": 2500}
+FILTER_COMBINATIONS = [
+    combo
+    for n in range(len(FILTER_VALUES) + 1)
+    for combo in itertools.combinations(FILTER_VALUES, n)
+]
+
+_results: dict[str, dict[str, float]] = {}
+
+
+def make_products(n: int, seed: int = 0) -> list[dict[str, Any]]:
+    """Deterministic synthetic catalog of ``n`` products."""
+    rng = random.Random(seed)
+    categories = sorted(CATEGORIES)
+    products = []
+    for i in range(n):
+        category = categories[i % len(categories)]
+        names, colors = CATEGORIES[category]
+        product: dict[str, Any] = {
+            "id": f"{category}-{i:06d}",
+            "name": f"{rng.choice(ADJECTIVES)} {rng.choice(names)} {i % 997}",
+            "description": rng.choice(DESCRIPTIONS),
+            "price": rng.randint(99, 4999),
+            "currency": "INR",
+            "category": category,
+            "attributes": {"color": rng.choice(colors)},
+        }
+        if category in ("tshirt", "hoodie"):
+            product["attributes"]["sizes"] = ["S", "M", "L", "XL"]
+        products.append(product)
+    return products
+
+
+def make_orders(products: list[dict[str, Any]], n: int, seed: int = 0) -> list[dict[str, Any]]:
+    """Deterministic order history of ``n`` orders over ``products``."""
+    rng = random.Random(seed)
+    history = []
+    for i in range(n):
+        items = []
+        for product in rng.sample(products, min(len(products), rng.randint(1, 3))):
+            quantity = rng.randint(1, 3)
+            items.append({
+                "product_id": product["id"],
+                "product_name": product["name"],
+                "quantity": quantity,
+                "unit_price": product["price"],
+                "line_total": product["price"] * quantity,
+                "currency": "INR",
+            })
+        history.append({
+            "id": f"ORD-20250101000000-bench-{i:06d}",
+            "items": items,
+            "total": sum(item["line_total"] for item in items),
+            "currency": "INR",
+            "status": "CONFIRMED",
+            "created_at": "2025-01-01T00:00:00",
+        })
+    return history
+
+
+def measure(func: Callable[[], Any]) -> dict[str, float]:
+    """Median seconds per call, calls per second and peak KiB allocated."""
+    func()  # warm-up: lazy indexes, caches, first file open
+
+    # Batch enough calls per round that timer resolution does not matter
+    started = time.perf_counter()
+    func()
+    single = max(time.perf_counter() - started, 1e-7)
+    per_round = max(1, int(0.005 / single))
+
+    timings = []
+    deadline = time.perf_counter() + MIN_TIME
+    while len(timings) < MIN_ROUNDS or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        for _ in range(per_round):
+            func()
+        timings.append((time.perf_counter() - started) / per_round)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {"median_us": median * 1e6, "ops_per_sec": 1 / median, "peak_kib": peak / 1024}
+
+
+def _load_baseline() -> dict[str, dict[str, float]]:
+    try:
+        return json.loads(BASELINE_FILE.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def check(name: str, func: Callable[[], Any]) -> None:
+    """Measure ``func`` and compare it with its stored baseline."""
+    result = measure(func)
+    _results[name] = result
+    print(
+        f"\n{name:<56} {result['median_us']:>10.1f} us  "
+        f"{result['ops_per_sec']:>10.0f} ops/s  {result['peak_kib']:>9.1f} KiB"
+    )
+    if UPDATE_BASELINE:
+        return
+    baseline = _load_baseline().get(name)
+    if baseline is None:
+        return
+    assert result["median_us"] <= baseline["median_us"] * TOLERANCE, (
+        f"{name} took {result['median_us']:.1f}us, "
+        f"baseline {baseline['median_us']:.1f}us (tolerance {TOLERANCE}x)"
+    )
+    memory_limit = max(baseline["peak_kib"] * TOLERANCE, MIN_TRACKED_KIB)
+    assert result["peak_kib"] <= memory_limit, (
+        f"{name} peaked at {result['peak_kib']:.1f}KiB, "
+        f"baseline {baseline['peak_kib']:.1f}KiB (tolerance {TOLERANCE}x)"
+    )
+
+
+@pytest.fixture(scope="module", autouse=True)
+def store_baseline():
+    yield
+    if UPDATE_BASELINE and _results:
+        baseline = _load_baseline()
+        for name, result in _results.items():
+            baseline[name] = {key: round(value, 2) for key, value in result.items()}
+        BASELINE_FILE.write_text(
+            json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda n: f"{n // 1000}k")
+def bench_store(request, tmp_path_factory):
+    size = request.param
+    tmp_path = tmp_path_factory.mktemp(f"bench-{size}")
+    products = make_products(size)
+    catalog_file = tmp_path / "products.json"
+    catalog_file.write_text(json.dumps({"products": products}), encoding="utf-8")
+    orders_file = tmp_path / "orders.json"
+    write_snapshot(orders_file, make_orders(products, max(10, size // 10)))
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.delenv("STORAGE_BACKEND", raising=False)
+        mp.setattr(catalog, "CATALOG_FILE", catalog_file)
+        mp.setattr(orders, "ORDERS_FILE", orders_file)
+        catalog.reset_catalog_cache()
+        catalog.get_catalog_snapshot().indexes.build()
+        yield size, products
+        orders.close_order_journal()
+        catalog.reset_catalog_cache()
+
+
+def test_load_catalog(bench_store) -> None:
+    size, _ = bench_store
+
+    check(f"{size}/reload_catalog", lambda: catalog.reload_catalog(force=True))
+
+
+@pytest.mark.parametrize("combo", FILTER_COMBINATIONS, ids=lambda c: "+".join(c) or "none")
+def test_list_products(bench_store, combo) -> None:
+    size, _ = bench_store
+    filters = {key: FILTER_VALUES[key] for key in combo}
+
+    name = "+".join(combo) or "none"
+    check(f"{size}/list_products[{name}]", lambda: catalog.list_products(filters))
+
+
+@pytest.mark.parametrize(
+    "query", ["fleece hoodie", "black travel mug", "premium", "hoody", "something warm for winter"]
+)
+def test_search_products(bench_store, query) -> None:
+    size, _ = bench_store
+
+    check(f"{size}/search_products[{query}]", lambda: catalog.search_products(query))
+    check(f"{size}/search_products_top5[{query}]", lambda: catalog.search_products(query, limit=5))
+
+
+def test_get_product_by_id(bench_store) -> None:
+    size, products = bench_store
+    ids = itertools.cycle([p["id"] for p in products[:: max(1, size // 100)]])
+
+    check(f"{size}/get_product_by_id", lambda: catalog.get_product_by_id(next(ids)))
+
+
+def test_resolve_product(bench_store) -> None:
+    size, products = bench_store
+    names = itertools.cycle([p["name"].lower() for p in products[:: max(1, size // 20)]])
+
+    check(f"{size}/resolve_product", lambda: catalog.resolve_product(next(names)))
+
+
+def test_create_order(bench_store) -> None:
+    size, products = bench_store
+    items = [{"product_id": products[0]["id"], "quantity": 2}, {"product_id": products[-1]["id"]}]
+
+    check(f"{size}/create_order", lambda: orders.create_order(items))
+
+
+def test_checkout(bench_store) -> None:
+    size, products = bench_store
+    picks = products[:: max(1, size // 5)][:5]
+
+    def checkout() -> None:
+        cart = orders.Cart()
+        for product in picks:
+            cart.add(product, 1)
+        orders.checkout(cart)
+
+    check(f"{size}/checkout_5_items", checkout)
+
+
+@pytest.mark.parametrize("group_commit", [False, True], ids=["inline", "group"])
+def test_concurrent_order_writes(tmp_path, group_commit) -> None:
+    """Orders per second from 8 concurrent writers, fsync on every commit."""
+    writers, burst_size = 8, 200
+    journal = OrderJournal(tmp_path / "orders.json", fsync="always", compact_every=0)
+    queue = GroupCommitQueue(journal.append_many) if group_commit else None
+    write = queue.write if queue is not None else journal.append
+    history = make_orders(make_products(100), burst_size)
+    name = f"order_writes[{'group' if group_commit else 'inline'}]_{burst_size}_orders"
+
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        check(name, lambda: list(pool.map(write, history)))
+    if queue is not None:
+        queue.close()
+        print(queue.stats())
+    journal.close()
+    print(f"{burst_size * _results[name]['ops_per_sec']:.0f} orders/s")
+
+
+def test_get_last_order(bench_store) -> None:
+    size, _ = bench_store
+
+    check(f"{size}/get_last_order", orders.get_last_order)
+
+
+def test_formatting(bench_store) -> None:
+    size, _ = bench_store
+    snapshot = catalog.get_catalog_snapshot()
+    listing = catalog.list_products({"category": "mug"})
+    page = catalog.list_products_page({"category": "mug"})
+    order = orders.get_last_order()
+
+    check(f"{size}/format_products_list", lambda: catalog.format_products_list(listing))
+    check(
+        f"{size}/format_products_page",
+        lambda: catalog.format_products_page(page, snapshot.indexes.summaries),
+    )
+    check(f"{size}/format_order_summary", lambda: orders.format_order_summary(order))
+    check(f"{size}/render_product_list", lambda: catalog.render_product_list({"category": "mug"}))
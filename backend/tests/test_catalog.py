@@ -0,0 +1,432 @@
+import json
+import os
+
+import pytest
+
+import catalog
+from render_cache import RenderCache
+from timing import PhaseTimer, latency
+
+PRODUCTS = [
+    {
+        "id": "mug-001",
+        "name": "Ceramic Coffee Mug",
+        "description": "Classic white ceramic mug",
+        "price": 299,
+        "currency": "INR",
+        "category": "mug",
+        "attributes": {"color": "white"},
+    },
+    {
+        "id": "hoodie-001",
+        "name": "Black Hoodie",
+        "description": "Comfortable fleece hoodie",
+        "price": 1299,
+        "currency": "INR",
+        "category": "hoodie",
+        "attributes": {"color": "black", "sizes": ["S", "M", "L"]},
+    },
+]
+
+
+def _write_catalog(path, products) -> None:
+    path.write_text(json.dumps({"products": products}), encoding="utf-8")
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    path = tmp_path / "products.json"
+    _write_catalog(path, PRODUCTS)
+    monkeypatch.setattr(catalog, "CATALOG_FILE", path)
+    catalog.reset_catalog_cache()
+    yield path
+    catalog.reset_catalog_cache()
+
+
+def test_snapshot_is_shared_between_calls(catalog_file) -> None:
+    first = catalog.get_catalog_snapshot()
+    second = catalog.get_catalog_snapshot()
+
+    assert first is second
+    assert [p["id"] for p in catalog.load_catalog()] == ["mug-001", "hoodie-001"]
+    assert catalog.catalog_stats()["reloads"] == 1
+
+
+def test_snapshot_reloads_when_file_changes(catalog_file) -> None:
+    first = catalog.get_catalog_snapshot()
+
+    _write_catalog(catalog_file, PRODUCTS[:1])
+    stat = catalog_file.stat()
+    os.utime(catalog_file, ns=(stat.st_atime_ns, first.mtime_ns + 1_000_000_000))
+    second = catalog.reload_catalog()
+
+    assert second is not first
+    assert second.version == first.version + 1
+    assert [p["id"] for p in second.products] == ["mug-001"]
+
+
+def test_touch_without_changes_keeps_parsed_products(catalog_file) -> None:
+    first = catalog.get_catalog_snapshot()
+
+    stat = catalog_file.stat()
+    os.utime(catalog_file, ns=(stat.st_atime_ns, first.mtime_ns + 1_000_000_000))
+    second = catalog.reload_catalog()
+
+    assert second.version == first.version
+    assert second.products is first.products
+    assert catalog.catalog_stats()["reloads"] == 1
+
+
+def test_invalid_file_keeps_last_good_snapshot(catalog_file) -> None:
+    first = catalog.get_catalog_snapshot()
+
+    catalog_file.write_text("{not json", encoding="utf-8")
+    second = catalog.reload_catalog(force=True)
+
+    assert second is first
+    assert catalog.catalog_stats()["reload_errors"] == 1
+
+
+def test_get_product_by_id_uses_index(catalog_file) -> None:
+    assert catalog.get_product_by_id("hoodie-001")["name"] == "Black Hoodie"
+    assert catalog.get_product_by_id("missing-001") is None
+
+
+def test_get_products_by_ids_skips_unknown_ids(catalog_file) -> None:
+    found = catalog.get_products_by_ids(["hoodie-001", "missing-001", "mug-001"])
+
+    assert set(found) == {"hoodie-001", "mug-001"}
+    assert found["mug-001"]["price"] == 299
+
+
+def test_search_matches_all_words_in_any_order(catalog_file) -> None:
+    assert [p["id"] for p in catalog.search_products("hoodie black")] == ["hoodie-001"]
+    assert [p["id"] for p in catalog.search_products("Hoodies")] == ["hoodie-001"]
+
+
+def test_search_falls_back_to_any_word(catalog_file) -> None:
+    results = catalog.search_products("white hoodie")
+
+    assert {p["id"] for p in results} == {"mug-001", "hoodie-001"}
+
+
+def test_search_ranks_name_matches_first() -> None:
+    from search_index import SearchIndex
+
+    index = SearchIndex(
+        [
+            {"name": "Travel Bag", "description": "Fits a mug", "category": "accessory"},
+            {"name": "Coffee Mug", "description": "Ceramic", "category": "mug"},
+        ]
+    )
+
+    assert index.search("mug") == [1, 0]
+    assert index.search("travel coffee") == []
+    assert set(index.search("travel coffee", match_all=False)) == {0, 1}
+
+
+@pytest.mark.parametrize("match_all", [True, False])
+def test_top_k_matches_full_ranking(match_all) -> None:
+    import random
+
+    from search_index import SearchIndex
+
+    words = [
+        "coffee", "mug", "ceramic", "travel", "steel", "black",
+        "white", "hoodie", "cotton", "shirt", "blue", "tea",
+    ]
+    rng = random.Random(7)
+    index = SearchIndex(
+        [
+            {
+                "name": " ".join(rng.sample(words, 3)),
+                "description": " ".join(rng.choices(words, k=rng.randint(2, 12))),
+                "category": rng.choice(["mug", "tshirt", "hoodie"]),
+            }
+            for _ in range(500)
+        ]
+    )
+
+    for query in ["coffee mug", "black hoodie", "blue cotton shirt", "ceramic", "zzz"]:
+        ranking = index.search(query, match_all=match_all)
+        for k in (1, 5, 20):
+            assert index.top_k(query, k, match_all=match_all) == ranking[:k]
+
+        # Continuing after the last product of each page walks the same ranking
+        pages: list[int] = []
+        after = None
+        while page := index.top_k_scored(query, 7, match_all=match_all, after=after):
+            pages.extend(doc for doc, _ in page)
+            after = (page[-1][1], page[-1][0])
+        assert pages == ranking
+
+
+def test_search_products_limit(catalog_file) -> None:
+    assert catalog.search_products("white hoodie", limit=1) == catalog.search_products(
+        "white hoodie"
+    )[:1]
+    assert len(catalog.search_products("", limit=1)) == 1
+
+
+def test_bounded_edit_distance_stops_at_bound() -> None:
+    from fuzzy_index import bounded_edit_distance
+
+    assert bounded_edit_distance("stainles", "stainless", 2) == 1
+    assert bounded_edit_distance("hoodie", "hoody", 2) == 2
+    assert bounded_edit_distance("ceramic", "glass", 2) == 3
+
+
+@pytest.mark.parametrize(
+    ("spoken", "expected"),
+    [
+        ("hoodie-001", "hoodie-001"),
+        ("hoody", "hoodie-001"),
+        ("blak hoody", "hoodie-001"),
+        ("ceramik cofee mug", "mug-001"),
+    ],
+)
+def test_resolve_product_tolerates_misheard_names(catalog_file, spoken, expected) -> None:
+    assert catalog.resolve_product(spoken)["id"] == expected
+
+
+def test_resolve_product_does_not_guess_unrelated_names(catalog_file) -> None:
+    assert catalog.resolve_product("laptop") is None
+    assert catalog.fuzzy_match_products("mug-002") == []
+
+
+def test_list_products_filters_with_facets(catalog_file) -> None:
+    assert [p["id"] for p in catalog.list_products({"category": "Hoodies"})] == ["hoodie-001"]
+    assert [p["id"] for p in catalog.list_products({"max_price": 1000})] == ["mug-001"]
+    assert [p["id"] for p in catalog.list_products({"min_price": 300, "color": "BLACK"})] == [
+        "hoodie-001"
+    ]
+    assert catalog.list_products({"category": "mug", "color": "black"}) == []
+
+
+def test_facet_counts(catalog_file) -> None:
+    counts = catalog.facet_counts({"max_price": 1500})
+
+    assert counts["total"] == 2
+    assert counts["category"] == {"mug": 1, "hoodie": 1}
+    assert counts["color"] == {"white": 1, "black": 1}
+    assert (counts["min_price"], counts["max_price"]) == (299, 1299)
+
+
+def test_products_with_null_color_or_category_load(catalog_file) -> None:
+    sticker = {
+        "id": "sticker-001",
+        "name": "Laptop Sticker Pack",
+        "description": "Assorted vinyl stickers",
+        "price": 199,
+        "currency": "INR",
+        "category": None,
+        "attributes": {"color": None},
+    }
+    _write_catalog(catalog_file, [*PRODUCTS, sticker])
+    catalog.reset_catalog_cache()
+
+    assert [p["id"] for p in catalog.list_products({"color": "black"})] == ["hoodie-001"]
+    assert [p["id"] for p in catalog.list_products({"max_price": 250})] == ["sticker-001"]
+    assert catalog.facet_counts()["color"] == {"white": 1, "black": 1}
+    assert [p["id"] for p in catalog.search_products("sticker")] == ["sticker-001"]
+    assert catalog.search_products("none") == []
+
+
+def test_product_records_behave_like_read_only_dicts(catalog_file) -> None:
+    product = catalog.get_product_by_id("hoodie-001")
+
+    assert product == PRODUCTS[1]
+    assert product.to_dict() == PRODUCTS[1]
+    assert product.get("missing", "default") == "default"
+    with pytest.raises(KeyError):
+        product["missing"]
+
+    product["attributes"]["color"] = "red"
+    assert product["attributes"]["color"] == "black"
+    product["attributes"]["sizes"].append("XL")
+    assert catalog.get_product_by_id("hoodie-001")["attributes"]["sizes"] == ["S", "M", "L"]
+
+
+def test_product_records_do_not_share_list_values(catalog_file) -> None:
+    _write_catalog(catalog_file, [{**PRODUCTS[0], "keywords": ["tea", "gift"]}])
+    catalog.reset_catalog_cache()
+
+    catalog.get_product_by_id("mug-001")["keywords"].append("latte")
+    catalog.load_catalog()[0]["keywords"].clear()
+
+    assert catalog.get_product_by_id("mug-001")["keywords"] == ["tea", "gift"]
+
+
+def test_fractional_prices_are_not_truncated(catalog_file) -> None:
+    _write_catalog(catalog_file, [{**PRODUCTS[0], "price": 299.5}, PRODUCTS[1]])
+    catalog.reset_catalog_cache()
+
+    assert catalog.get_product_by_id("mug-001")["price"] == 299.5
+    assert catalog.list_products({"max_price": 299}) == []
+    assert [p["id"] for p in catalog.list_products({"max_price": 300})] == ["mug-001"]
+    counts = catalog.facet_counts()
+    assert (counts["min_price"], counts["max_price"]) == (299.5, 1299)
+    assert isinstance(counts["max_price"], int)
+
+
+def test_shared_catalog_is_served_from_mapped_file(catalog_file) -> None:
+    compiled = catalog_file.with_suffix(".bin")
+
+    snapshot = catalog.enable_shared_catalog(compiled)
+
+    assert compiled.exists()
+    assert catalog.catalog_stats()["shared"] is True
+    assert len(snapshot.products) == 2
+    assert catalog.get_product_by_id("hoodie-001") == PRODUCTS[1]
+    assert catalog.get_product_by_id("missing-001") is None
+    assert catalog.get_products_by_ids(["mug-001", "x"]) == {"mug-001": PRODUCTS[0]}
+    assert [p["id"] for p in catalog.list_products({"max_price": 1000})] == ["mug-001"]
+    assert [p["id"] for p in catalog.search_products("black hoodie")] == ["hoodie-001"]
+
+
+def test_shared_catalog_is_not_recompiled_when_unchanged(catalog_file) -> None:
+    compiled = catalog_file.with_suffix(".bin")
+    catalog.enable_shared_catalog(compiled)
+    compiled_at = compiled.stat().st_mtime_ns
+
+    catalog.reload_catalog(force=True)
+
+    assert compiled.stat().st_mtime_ns == compiled_at
+
+
+def test_prewarm_builds_indexes_before_first_query(catalog_file) -> None:
+    timer = PhaseTimer("prewarm")
+
+    snapshot = catalog.prewarm_catalog(timer)
+
+    assert list(timer.phases) == ["catalog", "indexes"]
+    assert catalog.catalog_stats()["shared"] is True
+    built = vars(snapshot.indexes)
+    assert {"search", "fuzzy", "facets", "semantic"} <= built.keys()
+    assert built["_summaries"]
+    assert catalog.get_catalog_snapshot() is snapshot
+
+
+def test_rendered_listings_are_cached_per_catalog_version(catalog_file) -> None:
+    first = catalog.render_product_list({"category": "Mugs", "color": "White"})
+
+    assert first.text == catalog.format_products_page(catalog.list_products_page({"category": "mug"}))
+    assert catalog.render_product_list({"category": "mug", "color": "white"}) is first
+    assert catalog.render_search("  Coffee MUG") == catalog.render_search("coffee mug")
+    assert catalog.render_cache_stats()["hits"] == 2
+    assert catalog.render_cache_stats()["misses"] == 2
+
+    changed = [{**PRODUCTS[0], "price": 349}, PRODUCTS[1]]
+    _write_catalog(catalog_file, changed)
+    catalog.reload_catalog()
+
+    assert "349 INR" in catalog.render_product_list({"category": "mug", "color": "white"}).text
+    assert catalog.render_cache_stats()["invalidations"] == 1
+
+
+def test_rendering_records_phase_latencies(catalog_file) -> None:
+    latency.clear()
+
+    catalog.render_search("black hoodie")
+    catalog.render_search("black hoodie")
+
+    stats = latency.stats()
+    assert stats["catalog.load"]["count"] == 2
+    assert stats["catalog.search"]["count"] == 1  # second call hit the render cache
+    assert stats["catalog.format"]["count"] == 1
+
+
+def test_render_cache_evicts_least_recently_used() -> None:
+    cache = RenderCache(maxsize=2)
+
+    cache.get_or_render(1, "a", lambda: "A")
+    cache.get_or_render(1, "b", lambda: "B")
+    cache.get_or_render(1, "a", lambda: "stale")
+    cache.get_or_render(1, "c", lambda: "C")
+
+    assert cache.get_or_render(1, "a", lambda: "new") == "A"
+    assert cache.get_or_render(1, "b", lambda: "new") == "new"
+    assert cache.stats()["evictions"] == 2
+
+
+@pytest.fixture
+def large_catalog(catalog_file):
+    products = [
+        {
+            "id": f"mug-{i:03d}",
+            "name": f"Coffee Mug {i}",
+            "description": "Ceramic mug",
+            "price": 100 + i,
+            "currency": "INR",
+            "category": "mug",
+            "attributes": {"color": "black" if i % 2 else "white"},
+        }
+        for i in range(12)
+    ]
+    _write_catalog(catalog_file, products)
+    catalog.reload_catalog(force=True)
+    return products
+
+
+def test_listing_pages_resume_from_cursor(large_catalog) -> None:
+    filters = {"category": "mug", "color": "black"}
+    first = catalog.list_products_page(filters, page_size=4)
+    second = catalog.next_page(first.next_cursor, page_size=4)
+
+    assert [p["id"] for p in first.products] == ["mug-001", "mug-003", "mug-005", "mug-007"]
+    assert [p["id"] for p in second.products] == ["mug-009", "mug-011"]
+    assert second.start == 4
+    assert not second.has_more
+    assert list(first.products + second.products) == catalog.list_products(filters)
+
+
+def test_search_pages_follow_ranking(large_catalog) -> None:
+    pages = [catalog.search_products_page("coffee mug", page_size=5)]
+    while pages[-1].has_more:
+        pages.append(catalog.next_page(pages[-1].next_cursor, page_size=5))
+
+    assert [len(page.products) for page in pages] == [5, 5, 2]
+    assert [p for page in pages for p in page.products] == catalog.search_products("coffee mug")
+
+
+def test_rendered_pages_are_numbered_across_pages(large_catalog) -> None:
+    first = catalog.render_product_list({"category": "mug"})
+    second = catalog.render_next_page(first.next_cursor)
+
+    assert first.text.startswith("I found more than 5 products. Here are the first 5:")
+    assert second.text.startswith("Here are products 6 to 10:")
+    assert "6. Coffee Mug 5 (ID: mug-005)" in second.text
+    assert second.next_cursor is not None
+
+
+def test_search_pages_continue_any_word_matches(large_catalog) -> None:
+    pages = [catalog.search_products_page("black travel mug", page_size=4)]
+    while pages[-1].has_more:
+        pages.append(catalog.next_page(pages[-1].next_cursor, page_size=4))
+
+    assert len(pages) == 3
+    assert [p for page in pages for p in page.products] == catalog.search_products(
+        "black travel mug"
+    )
+
+
+@pytest.mark.parametrize(
+    "first_page",
+    [
+        lambda: catalog.list_products_page({"category": "mug"}, page_size=4),
+        lambda: catalog.search_products_page("coffee mug", page_size=4),
+    ],
+    ids=["list", "search"],
+)
+def test_cursor_from_before_a_reload_is_rejected(large_catalog, first_page) -> None:
+    cursor = first_page().next_cursor
+    _write_catalog(catalog.CATALOG_FILE, large_catalog[1:])
+    catalog.reload_catalog(force=True)
+
+    with pytest.raises(catalog.StaleCursorError):
+        catalog.next_page(cursor)
+
+
+def test_invalid_cursor_is_rejected(catalog_file) -> None:
+    with pytest.raises(ValueError):
+        catalog.next_page("not-a-cursor")
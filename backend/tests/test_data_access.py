@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import catalog
+import data_access
+import orders
+from data_access import LoopLagMonitor
+from timing import latency
+
+# Generous enough for a loaded CI machine; a blocking call on the loop
+# itself takes far longer (see test_monitor_detects_blocking_call)
+LAG_BUDGET = 0.1
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    products = [
+        {
+            "id": f"mug-{i:04d}",
+            "name": f"Ceramic Coffee Mug {i}",
+            "description": "Classic ceramic mug for coffee and tea",
+            "price": 200 + i,
+            "currency": "INR",
+            "category": "mug",
+            "attributes": {"color": "white" if i % 2 else "black"},
+        }
+        for i in range(2000)
+    ]
+    catalog_file = tmp_path / "products.json"
+    catalog_file.write_text(json.dumps({"products": products}), encoding="utf-8")
+    monkeypatch.setattr(catalog, "CATALOG_FILE", catalog_file)
+    monkeypatch.setattr(orders, "ORDERS_FILE", tmp_path / "orders.json")
+    catalog.reset_catalog_cache()
+    yield catalog_file
+    data_access.shutdown_executor()
+    orders.close_order_journal()
+    catalog.reset_catalog_cache()
+
+
+async def _tool_load(catalog_file, rounds: int) -> None:
+    # The calls the agent's tools make
+    for i in range(rounds):
+        # Force the next lookup to re-read, parse and index the catalog
+        catalog.reset_catalog_cache()
+        search, listing, resolved, details, order = await asyncio.gather(
+            data_access.render_search("coffee mug"),
+            data_access.render_product_list({"color": "black", "max_price": 1000}),
+            data_access.resolve_products([f"mug-{i:04d}", "Ceramic Coffee Mug 7"]),
+            data_access.render_product_details([f"mug-{i:04d}"]),
+            data_access.create_order([{"product_id": f"mug-{i:04d}", "quantity": 2}]),
+        )
+        assert search.product_ids and search.next_cursor
+        assert len(listing.product_ids) == catalog.PAGE_SIZE
+        assert (await data_access.render_next_page(listing.next_cursor)).product_ids
+        assert [product["id"] for product in resolved] == [f"mug-{i:04d}", "mug-0007"]
+        assert f"mug-{i:04d}" in details
+        assert order["total"] == 2 * (200 + i)
+
+
+def test_tools_do_not_block_event_loop(store) -> None:
+    async def main() -> LoopLagMonitor:
+        monitor = LoopLagMonitor(interval=0.005, budget=LAG_BUDGET)
+        monitor.start()
+        await _tool_load(store, rounds=5)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(main())
+
+    assert monitor.samples > 0
+    assert monitor.max_lag < LAG_BUDGET, monitor.stats()
+    assert len(orders.list_orders()) == 5
+
+
+def test_monitor_detects_blocking_call() -> None:
+    async def main() -> LoopLagMonitor:
+        monitor = LoopLagMonitor(interval=0.005, budget=0.05)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.15)  # blocks the loop
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(main())
+
+    assert monitor.max_lag >= 0.1
+    assert monitor.over_budget == 1
+    assert latency.stats({"event_loop.lag"})["event_loop.lag"]["max_ms"] >= 100
+
+
+def test_order_commits_do_not_hold_pool_threads(store, monkeypatch) -> None:
+    # One pool thread: batches are only larger than one order if waiting
+    # for a commit leaves the thread free to build the next order
+    monkeypatch.setenv("DATA_ACCESS_WORKERS", "1")
+    monkeypatch.setenv("ORDERS_COMMIT_INTERVAL_MS", "50")
+    session = orders.SessionOrders("room-1")
+    cart = orders.Cart()
+    cart.add(catalog.get_product_by_id("mug-0001"), 2)
+
+    async def main() -> orders.CheckoutResult:
+        created = [
+            data_access.create_order([{"product_id": f"mug-{i:04d}"}], session) for i in range(10)
+        ]
+        *_, result = await asyncio.gather(*created, data_access.checkout(cart, session))
+        return result
+
+    result = asyncio.run(main())
+
+    assert orders.order_writer_stats()["largest_batch"] > 1
+    assert len(session) == 11
+    assert result.order in session.orders
+    assert not cart.lines
+    assert len(orders.load_orders()) == 11
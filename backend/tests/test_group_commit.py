@@ -0,0 +1,79 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from group_commit import GroupCommitQueue
+
+
+def test_concurrent_writes_share_batches() -> None:
+    batches = []
+
+    def commit(batch) -> None:
+        time.sleep(0.01)  # a slow fsync lets later writers pile up
+        batches.append(batch)
+
+    queue = GroupCommitQueue(commit, max_batch=8)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(queue.write, range(64)))
+    queue.close()
+
+    assert sorted(item for batch in batches for item in batch) == list(range(64))
+    assert len(batches) < 64
+    assert max(len(batch) for batch in batches) <= 8
+    assert queue.stats()["items"] == 64
+
+
+def test_interval_waits_for_more_items() -> None:
+    batches = []
+    queue = GroupCommitQueue(batches.append, max_batch=10, interval=0.2)
+
+    futures = [queue.submit(i) for i in range(3)]
+    for future in futures:
+        future.result(timeout=1)
+    queue.close()
+
+    assert batches == [[0, 1, 2]]
+
+
+def test_full_batch_does_not_wait_for_interval() -> None:
+    batches = []
+    queue = GroupCommitQueue(batches.append, max_batch=2, interval=5)
+
+    started = time.monotonic()
+    futures = [queue.submit(i) for i in range(2)]
+    futures[1].result(timeout=1)
+
+    assert time.monotonic() - started < 1
+    queue.close()
+
+
+def test_commit_error_reaches_every_writer_in_batch() -> None:
+    release = threading.Event()
+
+    def commit(batch) -> None:
+        release.wait(1)
+        raise OSError("disk full")
+
+    queue = GroupCommitQueue(commit)
+    futures = [queue.submit(i) for i in range(3)]
+    release.set()
+
+    for future in futures:
+        with pytest.raises(OSError, match="disk full"):
+            future.result(timeout=1)
+    queue.close()
+
+
+def test_close_commits_queued_items_then_rejects_new_ones() -> None:
+    batches = []
+    queue = GroupCommitQueue(batches.append, interval=10)
+    future = queue.submit("order")
+
+    queue.close()
+
+    assert future.done()
+    assert batches == [["order"]]
+    with pytest.raises(RuntimeError):
+        queue.submit("late")
@@ -0,0 +1,158 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import catalog
+import orders
+from order_events import ORDER_EVENTS_TOPIC, SUMMARY_ORDERS, OrderEventPublisher
+
+PRODUCTS = [
+    {
+        "id": "mug-001",
+        "name": "Ceramic Coffee Mug",
+        "description": "Classic white ceramic mug",
+        "price": 299,
+        "currency": "INR",
+        "category": "mug",
+        "attributes": {"color": "white"},
+    },
+    {
+        "id": "hoodie-001",
+        "name": "Black Hoodie",
+        "description": "Comfortable fleece hoodie",
+        "price": 1299,
+        "currency": "INR",
+        "category": "hoodie",
+        "attributes": {"color": "black", "sizes": ["M", "L"]},
+    },
+]
+
+
+class FakeParticipant:
+    """Records what would be sent over the data channel."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.sent: list[tuple[dict, bool, str]] = []
+        self.fail = fail
+
+    async def publish_data(self, payload: bytes, *, reliable: bool = True, topic: str = "") -> None:
+        if self.fail:
+            raise ConnectionError("not connected")
+        self.sent.append((json.loads(payload), reliable, topic))
+
+
+def fake_room(fail: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(local_participant=FakeParticipant(fail))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    catalog_path = tmp_path / "products.json"
+    catalog_path.write_text(json.dumps({"products": PRODUCTS}), encoding="utf-8")
+    monkeypatch.setattr(catalog, "CATALOG_FILE", catalog_path)
+    monkeypatch.setattr(orders, "ORDERS_FILE", tmp_path / "orders.json")
+    catalog.reset_catalog_cache()
+    yield tmp_path
+    orders.close_order_journal()
+    catalog.reset_catalog_cache()
+
+
+def test_cart_and_order_events_are_numbered_in_order(store) -> None:
+    room = fake_room()
+    publisher = OrderEventPublisher(room, "room-1")
+    session = orders.SessionOrders("room-1")
+    cart = orders.Cart()
+
+    async def main() -> None:
+        cart.add(PRODUCTS[0], 2)
+        cart.add(PRODUCTS[1], 1, size="M")
+        await publisher.cart_updated(cart)
+        order = orders.checkout(cart, session).order
+        await publisher.order_placed(order, session)
+        await publisher.cart_updated(cart)
+        await publisher.order_summary(session)
+
+    asyncio.run(main())
+
+    sent = room.local_participant.sent
+    assert all(reliable and topic == ORDER_EVENTS_TOPIC for _, reliable, topic in sent)
+    events = [event for event, _, _ in sent]
+    assert [(e["seq"], e["type"]) for e in events] == [
+        (1, "cart"),
+        (2, "order_placed"),
+        (3, "cart"),
+        (4, "order_summary"),
+    ]
+    assert all(e["v"] == 1 and e["session"] == "room-1" for e in events)
+
+    cart_event = events[0]["cart"]
+    assert cart_event["item_count"] == 3
+    assert cart_event["total"] == 2 * 299 + 1299
+    assert cart_event["items"][1] == {
+        "product_id": "hoodie-001",
+        "name": "Black Hoodie",
+        "quantity": 1,
+        "unit_price": 1299,
+        "line_total": 1299,
+        "size": "M",
+    }
+
+    placed = events[1]
+    assert [item["product_id"] for item in placed["order"]["items"]] == ["mug-001", "hoodie-001"]
+    assert placed["order"]["total"] == 2 * 299 + 1299
+    assert placed["totals"] == {
+        "order_count": 1,
+        "item_count": 3,
+        "total": 2 * 299 + 1299,
+        "currency": "INR",
+    }
+    assert events[2]["cart"] == {"items": [], "item_count": 0, "total": 0, "currency": "INR"}
+    assert [o["id"] for o in events[3]["orders"]] == [placed["order"]["id"]]
+    assert events[3]["totals"] == placed["totals"]
+
+
+def test_order_summary_carries_only_the_latest_orders(store) -> None:
+    room = fake_room()
+    publisher = OrderEventPublisher(room, "room-1")
+    session = orders.SessionOrders("room-1")
+    placed = [
+        orders.create_order([{"product_id": "mug-001"}], session)
+        for _ in range(SUMMARY_ORDERS + 5)
+    ]
+
+    event = asyncio.run(publisher.order_summary(session))
+
+    assert [o["id"] for o in event["orders"]] == [o["id"] for o in placed[-SUMMARY_ORDERS:]]
+    assert event["totals"]["order_count"] == SUMMARY_ORDERS + 5
+    assert event["totals"]["total"] == (SUMMARY_ORDERS + 5) * 299
+
+
+def test_concurrent_events_are_sent_in_sequence_order(store) -> None:
+    room = fake_room()
+    publisher = OrderEventPublisher(room, "room-1")
+    cart = orders.Cart()
+
+    async def main() -> None:
+        await asyncio.gather(*(publisher.cart_updated(cart) for _ in range(20)))
+
+    asyncio.run(main())
+
+    assert [event["seq"] for event, _, _ in room.local_participant.sent] == list(range(1, 21))
+
+
+def test_failed_publish_is_counted_and_leaves_a_gap(store) -> None:
+    room = fake_room(fail=True)
+    publisher = OrderEventPublisher(room, "room-1")
+    cart = orders.Cart()
+
+    async def main() -> None:
+        await publisher.cart_updated(cart)  # must not raise
+        room.local_participant.fail = False
+        await publisher.cart_updated(cart)
+
+    asyncio.run(main())
+
+    assert [event["seq"] for event, _, _ in room.local_participant.sent] == [2]
+    assert publisher.stats() == {"seq": 2, "published": 1, "failed": 1}
@@ -0,0 +1,317 @@
+import json
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+import catalog
+import orders
+from order_journal import OrderJournal
+
+PRODUCTS = [
+    {
+        "id": "mug-001",
+        "name": "Ceramic Coffee Mug",
+        "description": "Classic white ceramic mug",
+        "price": 299,
+        "currency": "INR",
+        "category": "mug",
+        "attributes": {"color": "white"},
+    },
+    {
+        "id": "hoodie-001",
+        "name": "Black Hoodie",
+        "description": "Comfortable fleece hoodie",
+        "price": 1299,
+        "currency": "INR",
+        "category": "hoodie",
+        "attributes": {"color": "black"},
+    },
+]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    catalog_path = tmp_path / "products.json"
+    catalog_path.write_text(json.dumps({"products": PRODUCTS}), encoding="utf-8")
+    monkeypatch.setattr(catalog, "CATALOG_FILE", catalog_path)
+    monkeypatch.setattr(orders, "ORDERS_FILE", tmp_path / "orders.json")
+    catalog.reset_catalog_cache()
+    yield tmp_path
+    orders.close_order_journal()
+    catalog.reset_catalog_cache()
+
+
+def test_create_order_resolves_all_line_items(store) -> None:
+    order = orders.create_order(
+        [
+            {"product_id": "mug-001", "quantity": 2},
+            {"product_id": "missing-001", "quantity": 1},
+            {"product_id": "hoodie-001", "quantity": 1, "size": "M"},
+        ]
+    )
+
+    assert [item["product_id"] for item in order["items"]] == ["mug-001", "hoodie-001"]
+    assert order["items"][1]["size"] == "M"
+    assert order["total"] == 2 * 299 + 1299
+    assert orders.get_last_order()["id"] == order["id"]
+
+
+def test_session_orders_are_scoped_to_their_session(store) -> None:
+    first = orders.SessionOrders("room-a")
+    second = orders.SessionOrders("room-b")
+
+    a1 = orders.create_order([{"product_id": "mug-001"}], first)
+    b1 = orders.create_order([{"product_id": "hoodie-001"}], second)
+    a2 = orders.create_order([{"product_id": "hoodie-001", "quantity": 2}], first)
+    orders.create_order([{"product_id": "mug-001"}])
+
+    assert [o["id"] for o in first.orders] == [a1["id"], a2["id"]]
+    assert first.last is a2
+    assert [o["id"] for o in second.orders] == [b1["id"]]
+    assert orders.SessionOrders("room-c").last is None
+    # Still persisted globally, tagged with the session
+    assert orders.get_order_by_id(a2["id"])["session_id"] == "room-a"
+    assert len(orders.list_orders()) == 4
+
+
+def test_session_ledger_keeps_running_totals(store) -> None:
+    session = orders.SessionOrders("room-a")
+
+    orders.create_order([{"product_id": "mug-001", "quantity": 2}], session)
+    orders.create_order(
+        [
+            {"product_id": "hoodie-001", "size": "M"},
+            {"product_id": "mug-001", "quantity": 1},
+        ],
+        session,
+    )
+    orders.create_order([{"product_id": "hoodie-001", "size": "L"}], session)
+
+    assert session.total == 3 * 299 + 2 * 1299
+    assert session.item_count == 5
+    assert [(line.product_id, line.size, line.quantity, line.total) for line in session.lines] == [
+        ("mug-001", None, 3, 897),
+        ("hoodie-001", "M", 1, 1299),
+        ("hoodie-001", "L", 1, 1299),
+    ]
+
+    summary = orders.format_session_summary(session)
+    assert summary.startswith("Here's your complete order summary. You placed 3 orders.")
+    assert "3 Ceramic Coffee Mug at 299 rupees each for 897 rupees. " in summary
+    assert "1 Black Hoodie for 1299 rupees, size L. " in summary
+    assert summary.endswith("Your grand total is 3495 rupees. Thank you for shopping with us!")
+
+
+def test_cart_merges_updates_and_removes_lines() -> None:
+    cart = orders.Cart()
+    cart.add(PRODUCTS[0], 1)
+    cart.add(PRODUCTS[1], 1, size="M")
+    cart.add(PRODUCTS[0], 2)
+    cart.add(PRODUCTS[1], 1, size="L")
+
+    assert [(line.product_id, line.quantity) for line in cart.lines] == [
+        ("mug-001", 3),
+        ("hoodie-001", 1),
+        ("hoodie-001", 1),
+    ]
+    assert cart.total == 3 * 299 + 2 * 1299
+    assert len(cart.find("black hoodie")) == 2
+
+    cart.update(cart.find("mug-001")[0], 1)
+    cart.remove(cart.find("hoodie-001")[0])
+    assert cart.item_count == 2
+    cart.update(cart.find("mug-001")[0], 0)
+    assert [line.size for line in cart.lines] == ["L"]
+    assert "Cart total: 1299 INR" in orders.format_cart(cart)
+
+
+def test_invalid_quantities_are_rejected(store) -> None:
+    cart = orders.Cart()
+    line = cart.add(PRODUCTS[0], 2)
+
+    with pytest.raises(ValueError):
+        cart.add(PRODUCTS[1], 0)
+    with pytest.raises(ValueError):
+        cart.update(line, -1)
+    with pytest.raises(ValueError):
+        orders.create_order([{"product_id": "mug-001", "quantity": -2}])
+
+    assert cart.lines == [line]
+    assert line.quantity == 2
+    assert orders.load_orders() == []
+
+
+def test_checkout_places_one_order_with_one_write(store, monkeypatch) -> None:
+    appends = []
+    append_many = orders.OrderJournal.append_many
+    monkeypatch.setattr(
+        orders.OrderJournal,
+        "append_many",
+        lambda self, batch: (appends.append(batch), append_many(self, batch)),
+    )
+    session = orders.SessionOrders("room-a")
+    cart = orders.Cart()
+    cart.add(PRODUCTS[0], 2)
+    cart.add(PRODUCTS[1], 1, size="M", color="black")
+
+    order = orders.checkout(cart, session).order
+
+    assert len(appends) == 1
+    assert [(i["product_id"], i["quantity"]) for i in order["items"]] == [("mug-001", 2), ("hoodie-001", 1)]
+    assert order["items"][1]["size"] == "M"
+    assert order["total"] == 2 * 299 + 1299
+    assert session.last is order
+    assert len(cart) == 0
+    assert orders.checkout(cart, session) == orders.CheckoutResult(None)
+    assert len(orders.list_orders()) == 1
+
+
+def test_checkout_orders_nothing_while_a_product_is_unavailable(store) -> None:
+    cart = orders.Cart()
+    cart.add(PRODUCTS[0], 2)
+    gone = cart.add({"id": "gone-001", "name": "Discontinued Mug", "price": 99})
+
+    result = orders.checkout(cart)
+
+    assert result == orders.CheckoutResult(None, (gone,))
+    assert len(cart) == 2
+    assert orders.list_orders() == []
+
+    cart.remove(gone)
+    assert orders.checkout(cart).order["total"] == 2 * 299
+    assert len(cart) == 0
+
+
+def test_concurrent_orders_are_group_committed(store, monkeypatch) -> None:
+    batches = []
+    append_many = orders.OrderJournal.append_many
+
+    def slow_append_many(self, batch) -> None:
+        time.sleep(0.01)
+        batches.append(len(batch))
+        append_many(self, batch)
+
+    monkeypatch.setattr(orders.OrderJournal, "append_many", slow_append_many)
+
+    threads = [
+        threading.Thread(target=orders.create_order, args=([{"product_id": "mug-001"}],))
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Every create_order returned only after its batch was written
+    assert sum(batches) == 20
+    assert len(batches) < 20
+    assert len(orders.list_orders()) == 20
+
+
+def test_group_commit_can_be_disabled(store, monkeypatch) -> None:
+    monkeypatch.setenv("ORDERS_GROUP_COMMIT", "0")
+
+    order = orders.create_order([{"product_id": "mug-001"}])
+
+    assert orders.get_order_writer() is None
+    assert orders.get_last_order()["id"] == order["id"]
+
+
+def test_empty_session_summary() -> None:
+    summary = orders.format_session_summary(orders.SessionOrders("room-a"))
+    assert summary.startswith("You haven't placed any orders yet.")
+
+
+def test_orders_survive_restart_from_journal(store) -> None:
+    first = orders.create_order([{"product_id": "mug-001", "quantity": 1}])
+    orders.close_order_journal()
+
+    assert not (store / "orders.json").exists()
+    assert orders.get_order_by_id(first["id"]) == first
+    assert orders.list_orders() == [first]
+
+
+def test_journal_discards_torn_last_line(tmp_path) -> None:
+    journal = OrderJournal(tmp_path / "orders.json")
+    journal.append({"id": "ORD-1", "items": [], "total": 0})
+    journal.close()
+    with open(journal.journal_path, "ab") as f:
+        f.write(b'{"id": "ORD-2", "ite')
+
+    reopened = OrderJournal(tmp_path / "orders.json")
+
+    assert [order["id"] for order in reopened.orders] == ["ORD-1"]
+    assert journal.journal_path.read_bytes().endswith(b"\n")
+
+
+def test_journal_compacts_into_snapshot(tmp_path) -> None:
+    journal = OrderJournal(tmp_path / "orders.json", fsync="never", compact_every=3)
+    for i in range(4):
+        journal.append({"id": f"ORD-{i}", "items": [], "total": i})
+    journal.close()
+
+    snapshot = json.loads((tmp_path / "orders.json").read_text(encoding="utf-8"))
+    assert [order["id"] for order in snapshot["orders"]] == ["ORD-0", "ORD-1", "ORD-2"]
+    assert len(journal.journal_path.read_bytes().splitlines()) == 1
+    assert len(OrderJournal(tmp_path / "orders.json").orders) == 4
+
+
+def test_replay_skips_orders_already_compacted(tmp_path) -> None:
+    journal = OrderJournal(tmp_path / "orders.json")
+    journal.append({"id": "ORD-1", "items": [], "total": 0})
+    journal.close()
+    # Simulate a crash after the snapshot was written but before the
+    # journal was truncated
+    (tmp_path / "orders.json").write_text(
+        json.dumps({"orders": [{"id": "ORD-1", "items": [], "total": 0}]}), encoding="utf-8"
+    )
+
+    assert len(OrderJournal(tmp_path / "orders.json").orders) == 1
+
+
+def test_order_ids_are_unique_within_a_second() -> None:
+    ids = [orders.generate_order_id() for _ in range(1000)]
+
+    assert len(set(ids)) == len(ids)
+    assert ids[0].startswith("ORD-")
+
+
+def _write_orders(snapshot_path, writer: int, count: int, fsync: str) -> None:
+    journal = OrderJournal(snapshot_path, fsync=fsync, compact_every=150)
+    for i in range(count):
+        order_id = orders.generate_order_id()
+        journal.append({"id": order_id, "items": [], "total": i, "writer": writer})
+    journal.close()
+
+
+# The default policy fsyncs every append, so it gets fewer orders
+@pytest.mark.parametrize(("fsync", "per_process"), [("never", 200), ("always", 50)])
+def test_concurrent_writers_lose_no_orders(tmp_path, fsync: str, per_process: int) -> None:
+    """Stress: several processes, and threads next to them, writing at once."""
+    snapshot_path = tmp_path / "orders.json"
+    processes = 4
+
+    workers = [
+        multiprocessing.Process(
+            target=_write_orders, args=(snapshot_path, writer, per_process, fsync)
+        )
+        for writer in range(processes)
+    ]
+    threads = [
+        threading.Thread(
+            target=_write_orders, args=(snapshot_path, processes + t, per_process, fsync)
+        )
+        for t in range(2)
+    ]
+    for worker in workers + threads:
+        worker.start()
+    for worker in workers + threads:
+        worker.join()
+
+    expected = (processes + len(threads)) * per_process
+    recorded = OrderJournal(snapshot_path).orders
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert len(recorded) == expected
+    assert len({order["id"] for order in recorded}) == expected
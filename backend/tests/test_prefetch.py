@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+import catalog
+import data_access
+from prefetch import DetailPrefetcher
+
+PRODUCTS = [
+    {
+        "id": f"mug-{i:03d}",
+        "name": f"Ceramic Coffee Mug {i}",
+        "description": "Classic white ceramic mug",
+        "price": 299 + i,
+        "currency": "INR",
+        "category": "mug",
+        "attributes": {"color": "white", "capacity": "350ml"},
+    }
+    for i in range(12)
+]
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    path = tmp_path / "products.json"
+    path.write_text(json.dumps({"products": PRODUCTS}), encoding="utf-8")
+    monkeypatch.setattr(catalog, "CATALOG_FILE", path)
+    catalog.reset_catalog_cache()
+    yield path
+    data_access.shutdown_executor()
+    catalog.reset_catalog_cache()
+
+
+def test_listed_products_are_served_from_prefetch(catalog_file) -> None:
+    async def main() -> DetailPrefetcher:
+        prefetcher = DetailPrefetcher(per_listing=3)
+        page = await data_access.render_product_list({"category": "mug"})
+        prefetcher.schedule(page.product_ids)
+
+        details = await prefetcher.get("mug-001")  # waits for the prefetch in flight
+        assert details.text == catalog.format_product_details(PRODUCTS[1])
+        assert details.product["id"] == "mug-001"
+        assert await prefetcher.get("mug-004") is None  # past the per-listing cap
+        await prefetcher.close()
+        return prefetcher
+
+    stats = asyncio.run(main()).stats()
+
+    assert stats["prefetched"] == 3
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cache_is_capped_and_counts_unused_entries(catalog_file) -> None:
+    async def main() -> DetailPrefetcher:
+        prefetcher = DetailPrefetcher(per_listing=5, maxsize=6)
+        for start in (0, 5, 10):
+            prefetcher.schedule([p["id"] for p in PRODUCTS[start : start + 5]])
+            await prefetcher.get(PRODUCTS[start]["id"])
+        return prefetcher
+
+    stats = asyncio.run(main()).stats()
+
+    assert stats["size"] == 6
+    assert stats["hits"] == 3
+    # mug-001..004 and mug-006 were evicted without ever being used
+    assert stats["wasted"] == 5
+
+
+def test_newer_listing_cancels_pending_prefetch(catalog_file) -> None:
+    async def main() -> DetailPrefetcher:
+        prefetcher = DetailPrefetcher()
+        prefetcher.schedule(["mug-000", "mug-001"])
+        prefetcher.schedule(["mug-002"])
+        assert await prefetcher.get("mug-002") is not None
+        return prefetcher
+
+    prefetcher = asyncio.run(main())
+
+    assert prefetcher.cancelled == 1
+
+
+def test_prefetched_details_expire_with_the_catalog(catalog_file) -> None:
+    async def main() -> None:
+        prefetcher = DetailPrefetcher()
+        prefetcher.schedule(["mug-000"])
+        assert await prefetcher.get("mug-000") is not None
+
+        changed = [dict(PRODUCTS[0], price=999)]
+        catalog_file.write_text(json.dumps({"products": changed}), encoding="utf-8")
+        stat = catalog_file.stat()
+        os.utime(catalog_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        catalog.reload_catalog()
+
+        assert await prefetcher.get("mug-000") is None
+
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+import asyncio
+import json
+from dataclasses import dataclass
+
+import pytest
+
+import catalog
+import orders
+from response_budget import (
+    budgeted,
+    compact_context,
+    compact_mode,
+    fit,
+    response_sizes,
+    summarize_tool_output,
+    truncate,
+)
+
+PRODUCT = {
+    "id": "hoodie-001",
+    "name": "Black Hoodie",
+    "description": "Comfortable fleece hoodie with a kangaroo pocket, ribbed cuffs and a "
+    "lined hood that keeps you warm on cold winter evenings and breezy mornings alike",
+    "price": 1299,
+    "currency": "INR",
+    "category": "hoodie",
+    "attributes": {"color": "black", "sizes": ["S", "M", "L"], "material": "cotton fleece"},
+}
+
+
+@pytest.fixture(autouse=True)
+def response_mode():
+    # RESPONSE_MODE is read once; let each test set its own
+    compact_mode.cache_clear()
+    yield
+    compact_mode.cache_clear()
+
+
+@dataclass
+class Item:
+    type: str
+    output: str = ""
+    content: tuple = ()
+
+
+def test_truncate_cuts_at_word_boundary() -> None:
+    assert truncate("short", 10) == "short"
+    assert truncate("Comfortable fleece hoodie", 20) == "Comfortable fleece…"
+    assert len(truncate(PRODUCT["description"], 80)) <= 80
+
+
+def test_fit_drops_trailing_lines_and_says_so() -> None:
+    text = "\n".join(f"{i}. Product number {i} - 299 INR" for i in range(1, 21))
+
+    fitted = fit(text, 200)
+
+    assert len(fitted) <= 200
+    assert fitted.startswith("1. Product number 1")
+    assert fitted.endswith("more lines not shown)")
+    assert fit(text, 10_000) == text
+
+
+def test_compact_product_details_put_name_id_and_price_first() -> None:
+    details = catalog.format_product_details(PRODUCT)
+
+    assert details.splitlines()[0] == "Black Hoodie (ID: hoodie-001) - 1299 INR"
+    assert "sizes: S, M, L" in details
+    assert len(details) < len(PRODUCT["description"]) + 150
+    assert "evenings" not in catalog.format_product_summary(PRODUCT)
+
+
+def test_full_mode_keeps_everything(monkeypatch) -> None:
+    monkeypatch.setenv("RESPONSE_MODE", "full")
+    compact_mode.cache_clear()
+
+    assert PRODUCT["description"] in catalog.format_product_details(PRODUCT)
+    assert PRODUCT["description"] in catalog.format_product_summary(PRODUCT)
+    order = {"id": "ORD-1", "items": [], "total": 0, "status": "CONFIRMED"}
+    assert orders.format_order_summary(order).startswith("Order ORD-1 - Status: CONFIRMED")
+
+
+def test_rendered_pages_are_cached_per_response_mode(tmp_path, monkeypatch) -> None:
+    catalog_path = tmp_path / "products.json"
+    catalog_path.write_text(json.dumps({"products": [PRODUCT]}), encoding="utf-8")
+    monkeypatch.setattr(catalog, "CATALOG_FILE", catalog_path)
+    catalog.reset_catalog_cache()
+    try:
+        compact = catalog.render_search("hoodie")
+        monkeypatch.setenv("RESPONSE_MODE", "full")
+        compact_mode.cache_clear()
+        full = catalog.render_search("hoodie")
+    finally:
+        catalog.reset_catalog_cache()
+
+    assert "evenings" not in compact.text
+    assert PRODUCT["description"] in full.text
+
+
+def test_compact_order_summary_is_one_line_per_item() -> None:
+    order = {
+        "id": "ORD-1",
+        "items": [{"product_name": "Black Hoodie", "quantity": 2, "line_total": 2598, "size": "M"}],
+        "total": 2598,
+        "currency": "INR",
+        "status": "CONFIRMED",
+    }
+
+    assert orders.format_order_summary(order) == (
+        "Order ORD-1 (CONFIRMED), total 2598 INR:\n- Black Hoodie x 2 = 2598 INR (M)"
+    )
+
+
+def test_older_tool_outputs_are_summarized_in_turn_context() -> None:
+    long_output = "\n".join(f"{i}. {catalog.format_product_summary(PRODUCT)}" for i in range(5))
+    items = [
+        Item("message", content=("show me hoodies",)),
+        Item("function_call_output", output=long_output),
+        Item("function_call_output", output=long_output),
+        Item("function_call_output", output=long_output),
+    ]
+    first = items[1]
+
+    chars, saved = compact_context(items, keep_last=2)
+
+    assert items[1].output.startswith("[earlier result, summarized] 0. Black Hoodie")
+    assert len(items[1].output) < 200
+    assert first.output == long_output  # the original item is left alone
+    assert items[2].output == items[3].output == long_output
+    assert saved == len(long_output) - len(items[1].output)
+    assert chars == len("show me hoodies") + len(items[1].output) + 2 * len(long_output)
+
+
+def test_summary_leaves_short_outputs_alone() -> None:
+    assert summarize_tool_output("Your cart is empty.") == "Your cart is empty."
+
+
+def test_budgeted_tool_records_sizes() -> None:
+    response_sizes.clear()
+
+    @budgeted
+    async def get_product_details() -> str:
+        return "x" * 2000
+
+    sent = asyncio.run(get_product_details())
+
+    assert len(sent) <= 500
+    stats = response_sizes.stats()
+    assert stats["tools"]["get_product_details"]["max_chars"] == len(sent)
+    assert stats["trimmed_chars"] == 2000 - len(sent)
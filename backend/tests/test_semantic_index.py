@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import catalog  # noqa: E402
+from semantic_index import SemanticIndex, catalog_hash, vectors_path  # noqa: E402
+
+PRODUCTS = [
+    {
+        "id": "mug-001",
+        "name": "Ceramic Coffee Mug",
+        "description": "Classic white ceramic mug, perfect for your morning coffee",
+        "price": 299,
+        "currency": "INR",
+        "category": "mug",
+        "attributes": {"color": "white"},
+        "keywords": ["espresso", "cup", "gift"],
+    },
+    {
+        "id": "hoodie-001",
+        "name": "Black Hoodie",
+        "description": "Comfortable fleece hoodie in black",
+        "price": 1299,
+        "currency": "INR",
+        "category": "hoodie",
+        "attributes": {"color": "black"},
+        "keywords": ["warm", "winter", "cozy", "jumper"],
+    },
+    {
+        "id": "bottle-001",
+        "name": "Water Bottle",
+        "description": "Stainless steel water bottle 1L",
+        "price": 499,
+        "currency": "INR",
+        "category": "accessory",
+        "attributes": {"color": "silver"},
+        "keywords": ["hydration", "gym", "hiking"],
+    },
+]
+
+
+@pytest.fixture
+def catalog_file(tmp_path, monkeypatch):
+    path = tmp_path / "products.json"
+    path.write_text(json.dumps({"products": PRODUCTS}), encoding="utf-8")
+    monkeypatch.setattr(catalog, "CATALOG_FILE", path)
+    catalog.reset_catalog_cache()
+    yield path
+    catalog.reset_catalog_cache()
+
+
+def test_catalog_keywords_find_products_without_shared_words() -> None:
+    index = SemanticIndex.build(PRODUCTS)
+
+    assert index.search("something cozy for winter")[0] == 1
+    assert index.search("hydration for the gym")[0] == 2
+    assert index.search("qwerty zxcv") == []
+
+
+def test_products_without_keywords_only_match_their_own_words() -> None:
+    products = [{k: v for k, v in p.items() if k != "keywords"} for p in PRODUCTS]
+    index = SemanticIndex.build(products)
+
+    assert index.search("something cozy for winter") == []
+    assert index.search("fleece hoody")[0] == 1
+
+
+def test_batch_matches_single_queries() -> None:
+    index = SemanticIndex.build(PRODUCTS)
+    queries = ["warm jumper", "espresso cup", "hiking"]
+
+    assert index.search_batch(queries, k=2) == [index.search(q, k=2) for q in queries]
+
+
+def test_vectors_are_stored_per_catalog_version(tmp_path) -> None:
+    index = SemanticIndex.build(PRODUCTS)
+    path = vectors_path(tmp_path / "products.json")
+    index.save(path, "abc")
+
+    loaded = SemanticIndex.load(path, "abc")
+
+    assert np.array_equal(loaded.vectors, index.vectors)
+    assert SemanticIndex.load(path, "other") is None
+    assert SemanticIndex.load(tmp_path / "missing.npz", "abc") is None
+
+
+def test_search_products_falls_back_to_semantic_search(catalog_file) -> None:
+    index = SemanticIndex.build(PRODUCTS)
+    index.save(vectors_path(catalog_file), catalog_hash(catalog_file.read_bytes()))
+
+    assert [p["id"] for p in catalog.search_products("something warm and cozy")] == [
+        "hoodie-001"
+    ]
+    assert catalog.get_catalog_snapshot().indexes.semantic.vectors.shape == index.vectors.shape
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+import catalog
+import orders
+import sqlite_store
+
+PRODUCTS = [
+    {
+        "id": "mug-001",
+        "name": "Ceramic Coffee Mug",
+        "description": "Classic white ceramic mug",
+        "price": 299,
+        "currency": "INR",
+        "category": "mug",
+        "attributes": {"color": "white"},
+    },
+    {
+        "id": "tshirt-003",
+        "name": "Graphic T-Shirt",
+        "description": "Cotton t-shirt with a graphic print",
+        "price": 699,
+        "currency": "INR",
+        "category": "tshirt",
+        "attributes": {"color": "navy blue", "sizes": ["M", "L"]},
+    },
+]
+
+EXISTING_ORDER = {
+    "id": "ORD-20251130145615",
+    "items": [],
+    "total": 0,
+    "currency": "INR",
+    "status": "CONFIRMED",
+    "created_at": "2025-11-30T14:56:15",
+}
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    products_file = tmp_path / "products.json"
+    products_file.write_text(json.dumps({"products": PRODUCTS}), encoding="utf-8")
+    orders_file = tmp_path / "orders.json"
+    orders_file.write_text(json.dumps({"orders": [EXISTING_ORDER]}), encoding="utf-8")
+
+    monkeypatch.setenv("STORAGE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "store.db"))
+    sqlite_store.import_json(products_file, orders_file, sqlite_store.get_store())
+    catalog.reset_catalog_cache()
+    yield sqlite_store.get_store()
+    sqlite_store.close_store()
+    catalog.reset_catalog_cache()
+
+
+def test_import_uses_wal_mode(sqlite_backend) -> None:
+    with sqlite_backend.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_commits_are_synced_by_default(sqlite_backend, tmp_path) -> None:
+    # 2 is FULL: every commit syncs the WAL before the order is acknowledged
+    with sqlite_backend.connection() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+
+    store = sqlite_store.SQLiteStore(tmp_path / "fast.db", synchronous="normal")
+    with store.connection() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    store.close()
+
+    with pytest.raises(ValueError):
+        sqlite_store.SQLiteStore(tmp_path / "off.db", synchronous="OFF")
+
+
+def test_catalog_lookups_use_sqlite(sqlite_backend) -> None:
+    assert catalog.get_product_by_id("tshirt-003")["attributes"]["sizes"] == ["M", "L"]
+    assert catalog.get_product_by_id("missing-001") is None
+    assert set(catalog.get_products_by_ids(["mug-001", "x"])) == {"mug-001"}
+    assert [p["id"] for p in catalog.list_products({"category": "T-Shirts"})] == ["tshirt-003"]
+    assert [p["id"] for p in catalog.list_products({"color": "blue", "max_price": 700})] == [
+        "tshirt-003"
+    ]
+    assert [p["id"] for p in catalog.search_products("coffee mug")] == ["mug-001"]
+
+
+def test_products_with_null_color_import(sqlite_backend) -> None:
+    sticker = {"id": "sticker-001", "name": "Sticker Pack", "price": 199, "attributes": {"color": None}}
+
+    sqlite_backend.replace_products([*PRODUCTS, sticker])
+    catalog.reset_catalog_cache()
+
+    assert [p["id"] for p in catalog.list_products({"max_price": 250})] == ["sticker-001"]
+    assert [p["id"] for p in catalog.list_products({"color": "white"})] == ["mug-001"]
+
+
+def test_catalog_snapshot_follows_reimport(sqlite_backend) -> None:
+    first = catalog.get_catalog_snapshot()
+
+    sqlite_backend.replace_products(PRODUCTS[:1])
+    second = catalog.reload_catalog()
+
+    assert second.version == first.version + 1
+    assert len(second.products) == 1
+
+
+def test_orders_use_sqlite(sqlite_backend) -> None:
+    assert orders.get_last_order() == EXISTING_ORDER
+
+    order = orders.create_order([{"product_id": "mug-001", "quantity": 3}])
+
+    assert order["total"] == 897
+    assert orders.get_last_order() == order
+    assert orders.get_order_by_id(order["id"]) == order
+    assert [o["id"] for o in orders.list_orders()] == [EXISTING_ORDER["id"], order["id"]]
+
+
+def test_listing_pages_use_sqlite(sqlite_backend) -> None:
+    first = catalog.list_products_page({"max_price": 1000}, page_size=1)
+    second = catalog.next_page(first.next_cursor, page_size=1)
+
+    assert [p["id"] for p in first.products] == ["mug-001"]
+    assert [p["id"] for p in second.products] == ["tshirt-003"]
+    assert not second.has_more
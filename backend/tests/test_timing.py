@@ -0,0 +1,57 @@
+import asyncio
+import inspect
+import logging
+
+import pytest
+
+from timing import BUCKET_GROWTH, LatencyHistogram, LatencyRecorder
+
+
+def test_histogram_percentiles_within_bucket_error() -> None:
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.record(float(ms))
+
+    for p in (50, 95, 99):
+        assert p * 10 <= histogram.percentile(p) <= p * 10 * BUCKET_GROWTH
+    assert histogram.percentile(100) == 1000
+    stats = histogram.stats()
+    assert stats["count"] == 1000
+    assert stats["mean_ms"] == pytest.approx(500.5)
+
+
+def test_empty_histogram_reports_zero() -> None:
+    assert LatencyHistogram().stats()["p99_ms"] == 0.0
+
+
+def test_time_async_keeps_tool_signature_and_records_calls() -> None:
+    recorder = LatencyRecorder()
+
+    @recorder.time_async("tool.lookup")
+    async def lookup(product_id: str, quantity: int = 1) -> str:
+        """Look up a product."""
+        await asyncio.sleep(0.01)
+        return product_id * quantity
+
+    assert asyncio.run(lookup("a", quantity=2)) == "aa"
+    assert list(inspect.signature(lookup).parameters) == ["product_id", "quantity"]
+    assert lookup.__doc__ == "Look up a product."
+    stats = recorder.stats()["tool.lookup"]
+    assert stats["count"] == 1
+    assert stats["p50_ms"] >= 10 / BUCKET_GROWTH
+
+
+def test_log_updated_only_skips_idle_histograms(caplog) -> None:
+    recorder = LatencyRecorder()
+    recorder.record("catalog.format", 1.0)
+    recorder.record("orders.persist", 2.0)
+    logger = logging.getLogger("test_timing")
+
+    with caplog.at_level(logging.INFO, logger="test_timing"):
+        recorder.log(logger, updated_only=True)
+        recorder.record("orders.persist", 3.0)
+        recorder.log(logger, updated_only=True)
+
+    lines = [r.getMessage() for r in caplog.records]
+    assert len(lines) == 3
+    assert lines[2].startswith("Latency orders.persist: {'count': 2")
@@ -0,0 +1,136 @@
+'use client';
+
+import { createContext, useCallback, useContext, useReducer } from 'react';
+import { type ReceivedDataMessage, useDataChannel } from '@livekit/components-react';
+
+// Must match ORDER_EVENTS_TOPIC in backend/src/order_events.py
+export const ORDER_EVENTS_TOPIC = 'order-events';
+
+export interface OrderEventItem {
+  product_id: string;
+  name: string;
+  quantity: number;
+  unit_price: number;
+  line_total: number;
+  size?: string;
+  color?: string;
+}
+
+export interface OrderEventOrder {
+  id: string;
+  status: string;
+  items: OrderEventItem[];
+  total: number;
+  currency: string;
+  created_at?: string;
+}
+
+export interface OrderEventCart {
+  items: OrderEventItem[];
+  item_count: number;
+  total: number;
+  currency: string;
+}
+
+export interface OrderEventTotals {
+  order_count: number;
+  item_count: number;
+  total: number;
+  currency: string;
+}
+
+type OrderEvent = { v: number; seq: number; session: string } & (
+  | { type: 'cart'; cart: OrderEventCart }
+  | { type: 'order_placed'; order: OrderEventOrder; totals: OrderEventTotals }
+  | { type: 'order_summary'; orders: OrderEventOrder[]; totals: OrderEventTotals }
+);
+
+export interface OrderEventsState {
+  lastSeq: number;
+  cart: OrderEventCart;
+  orders: OrderEventOrder[];
+  totals: OrderEventTotals;
+  // Bumped on every order_summary event, so a component can react to each request
+  summaryRequests: number;
+}
+
+const initialState: OrderEventsState = {
+  lastSeq: 0,
+  cart: { items: [], item_count: 0, total: 0, currency: 'INR' },
+  orders: [],
+  totals: { order_count: 0, item_count: 0, total: 0, currency: 'INR' },
+  summaryRequests: 0,
+};
+
+function applyEvent(state: OrderEventsState, event: OrderEvent): OrderEventsState {
+  // Reliable delivery is ordered, but a reconnect can replay or skip events:
+  // drop anything already applied, and let the next snapshot repair a gap.
+  if (event.seq <= state.lastSeq) {
+    return state;
+  }
+  if (event.seq > state.lastSeq + 1) {
+    console.warn(`Order events ${state.lastSeq + 1}-${event.seq - 1} missed`);
+  }
+  const lastSeq = event.seq;
+
+  switch (event.type) {
+    case 'cart':
+      return { ...state, lastSeq, cart: event.cart };
+    case 'order_placed':
+      if (state.orders.some((order) => order.id === event.order.id)) {
+        return { ...state, lastSeq, totals: event.totals };
+      }
+      return { ...state, lastSeq, orders: [...state.orders, event.order], totals: event.totals };
+    case 'order_summary': {
+      // Carries only the latest orders (SUMMARY_ORDERS in order_events.py):
+      // keep the earlier ones from their order_placed events
+      const orders = new Map(state.orders.map((order) => [order.id, order]));
+      for (const order of event.orders) {
+        orders.set(order.id, order);
+      }
+      return {
+        ...state,
+        lastSeq,
+        orders: [...orders.values()],
+        totals: event.totals,
+        summaryRequests: state.summaryRequests + 1,
+      };
+    }
+    default:
+      return { ...state, lastSeq };
+  }
+}
+
+const decoder = new TextDecoder();
+
+const OrderEventsContext = createContext<OrderEventsState>(initialState);
+
+interface OrderEventsProviderProps {
+  children: React.ReactNode;
+}
+
+/**
+ * Subscribes once to the order-events data channel topic and shares the
+ * session's cart and order state with every component below it, so one
+ * that mounts later still sees the events published before.
+ */
+export const OrderEventsProvider = ({ children }: OrderEventsProviderProps) => {
+  const [state, dispatch] = useReducer(applyEvent, initialState);
+
+  const onMessage = useCallback((message: ReceivedDataMessage<typeof ORDER_EVENTS_TOPIC>) => {
+    try {
+      dispatch(JSON.parse(decoder.decode(message.payload)) as OrderEvent);
+    } catch (error) {
+      console.error('Invalid order event:', error);
+    }
+  }, []);
+
+  useDataChannel(ORDER_EVENTS_TOPIC, onMessage);
+
+  return <OrderEventsContext.Provider value={state}>{children}</OrderEventsContext.Provider>;
+};
+
+/** Cart and order state of this session, from the nearest OrderEventsProvider. */
+export function useOrderEvents() {
+  return useContext(OrderEventsContext);
+}
@@ -2,131 +2,23 @@
 
 import React, { useEffect, useState } from 'react';
 import { motion, AnimatePresence } from 'motion/react';
+import { useOrderEvents } from '@/components/app/order-events-provider';
 
-interface OrderItem {
-  productName: string;
-  quantity: number;
-  price: number;
-  size?: string;
-  color?: string;
-}
-
-interface Order {
-  orderId: string;
-  items: OrderItem[];
-  total: number;
-  timestamp: string;
-}
-
-interface OrderSummaryPopupProps {
-  messages: any[];
-}
-
-export function OrderSummaryPopup({ messages }: OrderSummaryPopupProps) {
-  const [orders, setOrders] = useState<Order[]>([]);
+export function OrderSummaryPopup() {
+  const { orders, totals, summaryRequests } = useOrderEvents();
   const [showPopup, setShowPopup] = useState(false);
-  const [processedOrderIds, setProcessedOrderIds] = useState<Set<string>>(new Set());
 
+  // The agent publishes an order_summary event when it reads out the summary
   useEffect(() => {
-    console.log('📦 OrderSummaryPopup: Processing', messages.length, 'messages');
-    console.log('📦 Current orders:', orders.length);
-    
-    const agentMessages = messages.filter((msg) => !msg.from?.isLocal);
-    
-    for (const message of agentMessages) {
-      const text = message.message || '';
-      
-      // Track orders from "Order placed successfully" messages
-      const hasOrderConfirmation = text.includes('Order placed successfully');
-      
-      if (hasOrderConfirmation) {
-        // Extract order details from the confirmation message
-        // Format: "Order ORD-XXX - Status: CONFIRMED\n\nItems:\n- ProductName x Qty = Total INR\n\nTotal: XXX INR"
-        const orderIdMatch = text.match(/Order (ORD-\d+)/);
-        if (orderIdMatch && !processedOrderIds.has(orderIdMatch[1])) {
-          const orderId = orderIdMatch[1];
-          
-          // Extract items
-          const itemMatches = text.matchAll(/-\s*([^x]+?)\s*x\s*(\d+)\s*=\s*(\d+)\s*INR/g);
-          const items: OrderItem[] = [];
-          let orderTotal = 0;
-          
-          for (const match of itemMatches) {
-            const productName = match[1].trim();
-            const quantity = parseInt(match[2]);
-            const itemTotal = parseInt(match[3]);
-            const unitPrice = itemTotal / quantity;
-            
-            items.push({
-              productName,
-              quantity,
-              price: unitPrice,
-            });
-            
-            orderTotal += itemTotal;
-          }
-          
-          if (items.length > 0) {
-            const newOrder: Order = {
-              orderId,
-              items,
-              total: orderTotal,
-              timestamp: new Date().toLocaleTimeString(),
-            };
-            
-            console.log('📦 Order tracked:', newOrder);
-            setOrders((prev) => [...prev, newOrder]);
-            setProcessedOrderIds((prev) => new Set([...prev, orderId]));
-          }
-        }
-      }
-      
-      // Show popup when agent gives complete order summary
-      const hasCompleteSummary = 
-        text.toLowerCase().includes("here's your complete order summary") ||
-        text.toLowerCase().includes("here is your complete order summary") ||
-        text.toLowerCase().includes("your grand total is") ||
-        text.toLowerCase().includes("thank you for shopping with us") ||
-        (text.toLowerCase().includes("glass coffee mug") && text.toLowerCase().includes("rupees") && text.toLowerCase().includes("total"));
-      
-      if (hasCompleteSummary) {
-        console.log('📦 Agent giving complete summary! Orders tracked:', orders.length);
-        if (orders.length > 0) {
-          console.log('📦 Showing popup now!');
-          setShowPopup(true);
-        } else {
-          console.log('📦 No orders tracked yet');
-        }
-      }
-    }
-    
-    // Also check user messages for manual trigger
-    const userMessages = messages.filter((msg) => msg.from?.isLocal);
-    const lastUserMessage = userMessages[userMessages.length - 1];
-    if (lastUserMessage) {
-      const userText = lastUserMessage.message || '';
-      const userWantsSummary = 
-        userText.toLowerCase().includes("show summary") ||
-        userText.toLowerCase().includes("show my order") ||
-        userText.toLowerCase().includes("view order") ||
-        userText.toLowerCase().includes("checkout");
-      
-      if (userWantsSummary && orders.length > 0) {
-        console.log('📦 User requested summary!');
-        setShowPopup(true);
-      }
+    if (summaryRequests > 0) {
+      setShowPopup(true);
     }
-  }, [messages, processedOrderIds, orders.length]);
+  }, [summaryRequests]);
 
-  const totalItems = orders.reduce((sum, order) => 
-    sum + order.items.reduce((itemSum, item) => itemSum + item.quantity, 0), 0
-  );
-  
-  const grandTotal = orders.reduce((sum, order) => sum + order.total, 0);
-
-  // Debug: Log button visibility
-  console.log('📦 Button should be visible:', orders.length > 0 && !showPopup);
-  console.log('📦 Orders count:', orders.length, 'Popup open:', showPopup);
+  const grandTotal = totals.total;
+  // When the agent placed the latest order, as recorded with it
+  const lastOrder = orders[orders.length - 1];
+  const placedAt = lastOrder?.created_at;
 
   return (
     <>
@@ -135,10 +27,7 @@ export function OrderSummaryPopup({ messages }: OrderSummaryPopupProps) {
         <motion.button
           initial={{ scale: 0, opacity: 0 }}
           animate={{ scale: 1, opacity: 1 }}
-          onClick={() => {
-            console.log('📦 Manual button click - showing summary!');
-            setShowPopup(true);
-          }}
+          onClick={() => setShowPopup(true)}
           className="fixed bottom-24 right-4 z-[60] flex items-center gap-2 rounded-full bg-emerald-600 px-5 py-3 text-white shadow-lg hover:bg-emerald-700 transition-colors pointer-events-auto"
           whileHover={{ scale: 1.05 }}
           whileTap={{ scale: 0.95 }}
@@ -203,25 +92,27 @@ export function OrderSummaryPopup({ messages }: OrderSummaryPopupProps) {
               <div className="mb-6 space-y-2">
                 <div className="flex justify-between text-sm">
                   <span className="text-slate-400">Order ID:</span>
-                  <span className="font-mono text-slate-200">{orders[orders.length - 1]?.orderId}</span>
-                </div>
-                <div className="flex justify-between text-sm">
-                  <span className="text-slate-400">Time:</span>
-                  <span className="text-slate-200">{new Date().toLocaleString()}</span>
+                  <span className="font-mono text-slate-200">{lastOrder?.id}</span>
                 </div>
+                {placedAt && (
+                  <div className="flex justify-between text-sm">
+                    <span className="text-slate-400">Time:</span>
+                    <span className="text-slate-200">{new Date(placedAt).toLocaleString()}</span>
+                  </div>
+                )}
               </div>
 
               {/* Items List */}
               <div className="mb-6">
                 <h3 className="text-sm font-semibold text-slate-300 mb-3">Items</h3>
                 <div className="bg-slate-900/50 rounded-lg p-4 space-y-3">
-                  {orders.map((order, orderIndex) => (
-                    <div key={order.orderId}>
+                  {orders.map((order) => (
+                    <div key={order.id}>
                       {order.items.map((item, itemIndex) => (
                         <div key={itemIndex} className="flex justify-between items-center">
                           <div className="flex-1">
                             <p className="text-slate-200">
-                              {item.productName} × {item.quantity}
+                              {item.name} × {item.quantity}
                             </p>
                             {(item.size || item.color) && (
                               <p className="text-xs text-slate-400 mt-1">
@@ -231,7 +122,7 @@ export function OrderSummaryPopup({ messages }: OrderSummaryPopupProps) {
                               </p>
                             )}
                           </div>
-                          <p className="text-blue-400 font-semibold">₹{(item.price * item.quantity).toFixed(2)}</p>
+                          <p className="text-blue-400 font-semibold">₹{item.line_total.toFixed(2)}</p>
                         </div>
                       ))}
                     </div>
@@ -255,13 +146,13 @@ export function OrderSummaryPopup({ messages }: OrderSummaryPopupProps) {
                     const orderData = {
                       orders,
                       total: grandTotal,
-                      timestamp: new Date().toISOString()
+                      timestamp: placedAt ?? null,
                     };
                     const blob = new Blob([JSON.stringify(orderData, null, 2)], { type: 'application/json' });
                     const url = URL.createObjectURL(blob);
                     const a = document.createElement('a');
                     a.href = url;
-                    a.download = `order-${orders[orders.length - 1]?.orderId}.json`;
+                    a.download = `order-${lastOrder?.id}.json`;
                     a.click();
                     URL.revokeObjectURL(url);
                   }}
@@ -7,7 +7,9 @@ import { ChatTranscript } from '@/components/app/chat-transcript';
 import { PreConnectMessage } from '@/components/app/preconnect-message';
 import { TileLayout } from '@/components/app/tile-layout';
 import { ShoppingOverlay } from '@/components/app/shopping-overlay';
+import { ShoppingCartComponent } from '@/components/app/shopping-cart';
 import { OrderSummaryPopup } from '@/components/app/order-summary-popup';
+import { OrderEventsProvider } from '@/components/app/order-events-provider';
 import {
   AgentControlBar,
   type ControlBarControls,
@@ -94,11 +96,14 @@ export const SessionView = ({
 
   return (
     <section className="bg-background relative z-10 h-full w-full overflow-hidden" {...props}>
-      {/* Shopping Overlay - Interaction Counter & Status */}
-      <ShoppingOverlay messages={messages} />
+      {/* Shopping Overlay - Agent Status */}
+      <ShoppingOverlay />
 
-      {/* Order Summary Popup */}
-      <OrderSummaryPopup messages={messages} />
+      {/* Cart and Order Summary, both fed by the agent's order events */}
+      <OrderEventsProvider>
+        <ShoppingCartComponent />
+        <OrderSummaryPopup />
+      </OrderEventsProvider>
 
       {/* Chat Transcript */}
       <div
@@ -1,89 +1,36 @@
 'use client';
 
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { motion, AnimatePresence } from 'motion/react';
+import { useOrderEvents } from '@/components/app/order-events-provider';
 
-interface CartItem {
-  productName: string;
-  quantity: number;
-  price: number;
-  size?: string;
-  color?: string;
-}
-
-interface ShoppingCartProps {
-  messages: any[];
-}
-
-export function ShoppingCartComponent({ messages }: ShoppingCartProps) {
-  const [cartItems, setCartItems] = useState<CartItem[]>([]);
+export function ShoppingCartComponent() {
+  const { cart, orders, totals } = useOrderEvents();
   const [isOpen, setIsOpen] = useState(false);
-  const [lastOrderId, setLastOrderId] = useState<string>('');
+  const previousCount = useRef(0);
+
+  // Items waiting in the cart and items already ordered (through checkout or
+  // place_order) are both shown
+  const cartItems = cart.items;
+  const orderedItems = orders.flatMap((order) =>
+    order.items.map((item, index) => ({ ...item, key: `${order.id}-${index}` }))
+  );
+  const totalItems = cart.item_count + totals.item_count;
 
+  // Auto-open the cart when the agent adds or orders something
   useEffect(() => {
-    // Parse messages for order confirmations
-    const agentMessages = messages.filter((msg) => !msg.from?.isLocal);
-    
-    // Check all messages for new orders
-    for (const message of agentMessages) {
-      const text = message.message || '';
-      
-      // Look for "Order placed successfully" messages
-      if (text.includes('Order placed successfully')) {
-        // Extract order ID
-        const orderIdMatch = text.match(/ORD-\d+/);
-        if (orderIdMatch && orderIdMatch[0] !== lastOrderId) {
-          const orderId = orderIdMatch[0];
-          setLastOrderId(orderId);
-          
-          console.log('🛒 Cart: New order detected!', orderId);
-          console.log('🛒 Cart: Full message:', text);
-          
-          // Extract product details - match format: "- Product Name x Quantity = Total INR"
-          const productMatch = text.match(/-\s*([^x\n]+?)\s*x\s*(\d+)\s*=\s*(\d+)\s*INR/);
-          if (productMatch) {
-            const productName = productMatch[1].trim();
-            const quantity = parseInt(productMatch[2]);
-            const totalPrice = parseInt(productMatch[3]);
-            const unitPrice = totalPrice / quantity;
-            
-            // Extract size if present
-            const sizeMatch = text.match(/\(Size:\s*([A-Z]+)\)/i);
-            const size = sizeMatch ? sizeMatch[1] : undefined;
-            
-            // Extract color if present
-            const colorMatch = text.match(/\(Color:\s*(\w+)\)/i);
-            const color = colorMatch ? colorMatch[1] : undefined;
-            
-            const newItem: CartItem = {
-              productName,
-              quantity,
-              price: unitPrice,
-              size,
-              color,
-            };
-            
-            console.log('🛒 Cart: Adding item:', newItem);
-            setCartItems((prev) => [...prev, newItem]);
-            setIsOpen(true); // Auto-open cart when item added
-          } else {
-            console.error('🛒 Cart: Failed to parse product from message');
-            console.log('🛒 Cart: Trying to match:', text);
-          }
-        }
-      }
+    if (totalItems > previousCount.current) {
+      setIsOpen(true);
     }
-  }, [messages, lastOrderId]);
-
-  const totalItems = cartItems.reduce((sum, item) => sum + item.quantity, 0);
-  const totalPrice = cartItems.reduce((sum, item) => sum + item.price * item.quantity, 0);
+    previousCount.current = totalItems;
+  }, [totalItems]);
 
   return (
     <>
       {/* Cart Button */}
       <motion.button
         onClick={() => setIsOpen(!isOpen)}
-        className="fixed top-24 right-4 z-[60] flex items-center gap-2 rounded-full bg-emerald-600 px-4 py-3 text-white shadow-lg hover:bg-emerald-700 transition-colors pointer-events-auto"
+        className="fixed top-32 right-4 z-[60] flex items-center gap-2 rounded-full bg-emerald-600 px-4 py-3 text-white shadow-lg hover:bg-emerald-700 transition-colors pointer-events-auto"
         whileHover={{ scale: 1.05 }}
         whileTap={{ scale: 0.95 }}
       >
@@ -142,7 +89,7 @@ export function ShoppingCartComponent({ messages }: ShoppingCartProps) {
 
               {/* Cart Items */}
               <div className="flex-1 overflow-y-auto p-4" style={{ maxHeight: 'calc(100vh - 200px)' }}>
-                {cartItems.length === 0 ? (
+                {cartItems.length === 0 && orderedItems.length === 0 ? (
                   <div className="flex flex-col items-center justify-center py-12 text-center">
                     <svg className="h-16 w-16 text-gray-300 mb-4" fill="none" viewBox="0 0 24 24" stroke="currentColor">
                       <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M20 7l-8-4-8 4m16 0l-8 4m8-4v10l-8 4m0-10L4 7m8 4v10M4 7v10l8 4" />
@@ -154,18 +101,21 @@ export function ShoppingCartComponent({ messages }: ShoppingCartProps) {
                   </div>
                 ) : (
                   <div className="space-y-4">
+                    {cartItems.length > 0 && orderedItems.length > 0 && (
+                      <h3 className="text-sm font-semibold text-gray-500">In your cart</h3>
+                    )}
                     {cartItems.map((item, index) => (
                       <motion.div
-                        key={index}
+                        key={`${item.product_id}-${item.size ?? ''}-${item.color ?? ''}`}
                         initial={{ opacity: 0, y: 20 }}
                         animate={{ opacity: 1, y: 0 }}
                         transition={{ delay: index * 0.1 }}
                         className="rounded-lg border border-gray-200 bg-gray-50 p-4"
                       >
                         <div className="flex justify-between items-start mb-2">
-                          <h3 className="font-semibold text-gray-900">{item.productName}</h3>
+                          <h3 className="font-semibold text-gray-900">{item.name}</h3>
                           <span className="font-bold text-emerald-600">
-                            ₹{item.price * item.quantity}
+                            ₹{item.line_total}
                           </span>
                         </div>
                         <div className="flex items-center gap-4 text-sm text-gray-600">
@@ -174,25 +124,54 @@ export function ShoppingCartComponent({ messages }: ShoppingCartProps) {
                           {item.color && <span>Color: {item.color}</span>}
                         </div>
                         <div className="mt-2 text-xs text-gray-500">
-                          ₹{item.price} × {item.quantity}
+                          ₹{item.unit_price} × {item.quantity}
                         </div>
                       </motion.div>
                     ))}
+                    {orderedItems.length > 0 && (
+                      <h3 className="text-sm font-semibold text-gray-500">Ordered</h3>
+                    )}
+                    {orderedItems.map((item) => (
+                      <div
+                        key={item.key}
+                        className="rounded-lg border border-emerald-200 bg-emerald-50 p-4"
+                      >
+                        <div className="flex justify-between items-start mb-2">
+                          <h3 className="font-semibold text-gray-900">{item.name}</h3>
+                          <span className="font-bold text-emerald-600">
+                            ₹{item.line_total}
+                          </span>
+                        </div>
+                        <div className="flex items-center gap-4 text-sm text-gray-600">
+                          <span>Qty: {item.quantity}</span>
+                          {item.size && <span>Size: {item.size}</span>}
+                          {item.color && <span>Color: {item.color}</span>}
+                        </div>
+                      </div>
+                    ))}
                   </div>
                 )}
               </div>
 
               {/* Footer */}
-              {cartItems.length > 0 && (
+              {totalItems > 0 && (
                 <div className="border-t border-gray-200 bg-gray-50 p-4">
                   <div className="mb-4 space-y-2">
-                    <div className="flex justify-between text-sm text-gray-600">
-                      <span>Items ({totalItems})</span>
-                      <span>₹{totalPrice}</span>
-                    </div>
+                    {cart.item_count > 0 && (
+                      <div className="flex justify-between text-sm text-gray-600">
+                        <span>In cart ({cart.item_count})</span>
+                        <span>₹{cart.total}</span>
+                      </div>
+                    )}
+                    {totals.item_count > 0 && (
+                      <div className="flex justify-between text-sm text-gray-600">
+                        <span>Ordered ({totals.item_count})</span>
+                        <span>₹{totals.total}</span>
+                      </div>
+                    )}
                     <div className="flex justify-between text-lg font-bold text-gray-900">
                       <span>Total</span>
-                      <span className="text-emerald-600">₹{totalPrice}</span>
+                      <span className="text-emerald-600">₹{cart.total + totals.total}</span>
                     </div>
                   </div>
                   <div className="text-center text-xs text-gray-500">
@@ -1,21 +1,10 @@
 'use client';
 
-import React, { useEffect, useState } from 'react';
+import React from 'react';
 import { useVoiceAssistant } from '@livekit/components-react';
 
-interface ShoppingOverlayProps {
-  messages: any[];
-}
-
-export function ShoppingOverlay({ messages }: ShoppingOverlayProps) {
+export function ShoppingOverlay() {
   const { state: agentState } = useVoiceAssistant();
-  const [interactionCount, setInteractionCount] = useState(0);
-
-  useEffect(() => {
-    // Count user interactions
-    const userMessages = messages.filter(m => m.from?.isLocal === true);
-    setInteractionCount(userMessages.length);
-  }, [messages]);
 
   const getStateText = () => {
     switch (agentState) {